@@ -1,33 +1,39 @@
-from datetime import timedelta
-from fastapi import APIRouter, Depends, HTTPException, status
+import io
+import anyio
+from fastapi import APIRouter, Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from ..core.database import get_db
 from ..models.models import User
-from ..schemas.schemas import UserCreate, UserResponse, Token
-from ..services.auth import get_password_hash, authenticate_user, create_access_token
-from ..core.config import settings
+from ..schemas.schemas import UserCreate, UserResponse, Token, TokenData, RefreshRequest, UserImportResult
+from ..services.auth import authenticate_user, create_user_access_token, revoke_user_tokens
+from ..services.deps import get_admin_user
+from ..services.password_pool import password_pool
+from ..services.throttle import login_throttle
+from ..services.user_import import ChunkReader, import_users
+from ..services.refresh_tokens import issue_refresh_token, rotate_refresh_token, revoke_refresh_token
 
 router = APIRouter(prefix="/api/auth", tags=["authentication"])
 
 
-@router.post("/register", response_model=UserResponse)
-def register_user(user: UserCreate, db: Session = Depends(get_db)):
+def _check_user_available(db: Session, user: UserCreate):
     db_user = db.query(User).filter(User.email == user.email).first()
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
-    
+
     db_user = db.query(User).filter(User.username == user.username).first()
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Username already taken"
         )
-    
-    hashed_password = get_password_hash(user.password)
+
+
+def _create_user(db: Session, user: UserCreate, hashed_password: str) -> User:
     db_user = User(
         email=user.email,
         username=user.username,
@@ -36,21 +42,110 @@ def register_user(user: UserCreate, db: Session = Depends(get_db)):
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
-    
     return db_user
 
 
+def _issue_tokens(db: Session, user: User) -> dict:
+    access_token = create_user_access_token(user)
+    refresh_token = issue_refresh_token(db, user.id)
+    db.commit()
+    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
+
+
+@router.post("/register", response_model=UserResponse)
+async def register_user(user: UserCreate, db: Session = Depends(get_db)):
+    await run_in_threadpool(_check_user_available, db, user)
+    hashed_password = await password_pool.hash(user.password)
+    return await run_in_threadpool(_create_user, db, user, hashed_password)
+
+
 @router.post("/login", response_model=Token)
-def login_user(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
-    user = authenticate_user(db, form_data.username, form_data.password)
+async def login_user(
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: Session = Depends(get_db)
+):
+    client_ip = request.client.host if request.client else "unknown"
+    retry_after = login_throttle.check(client_ip, form_data.username)
+    if retry_after:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts, please try again later",
+            headers={"Retry-After": str(retry_after)},
+        )
+
+    user = await authenticate_user(db, form_data.username, form_data.password)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    access_token_expires = timedelta(minutes=settings.access_token_expire_minutes)
-    access_token = create_access_token(
-        data={"sub": user.email}, expires_delta=access_token_expires
-    )
-    return {"access_token": access_token, "token_type": "bearer"}
+    return await run_in_threadpool(_issue_tokens, db, user)
+
+
+@router.post("/refresh", response_model=Token)
+def refresh_access_token(request: RefreshRequest, db: Session = Depends(get_db)):
+    """Issue a new access token from a refresh token, without password verification"""
+    user, refresh_token = rotate_refresh_token(db, request.refresh_token)
+    access_token = create_user_access_token(user)
+    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
+
+
+@router.post("/logout")
+def logout_user(request: RefreshRequest, db: Session = Depends(get_db)):
+    revoke_refresh_token(db, request.refresh_token)
+    return {"message": "Logged out successfully"}
+
+
+@router.post("/users/{user_id}/revoke-tokens")
+def revoke_tokens(
+    user_id: int,
+    db: Session = Depends(get_db),
+    current_user: TokenData = Depends(get_admin_user)
+):
+    """Revoke every access token issued to a user (admin only)"""
+    user = db.query(User).filter(User.id == user_id).first()
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    revoke_user_tokens(db, user)
+    return {"message": "Tokens revoked successfully"}
+
+
+IMPORT_FORMATS = {
+    "application/x-ndjson": "ndjson",
+    "application/jsonl": "ndjson",
+    "text/csv": "csv",
+}
+
+
+@router.post("/users/import", response_model=UserImportResult)
+async def bulk_import_users(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: TokenData = Depends(get_admin_user)
+):
+    """Bulk-import users from an NDJSON or CSV body (admin only)"""
+    content_type = request.headers.get("content-type", "").split(";")[0].strip()
+    fmt = IMPORT_FORMATS.get(content_type)
+    if fmt is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail="Send application/x-ndjson or text/csv"
+        )
+
+    # Rows are parsed as the body arrives: the import thread pulls each chunk
+    # from the event loop, so neither memory nor disk holds the whole upload
+    body = request.stream()
+
+    async def next_chunk():
+        return await anext(body, None)
+
+    def chunks():
+        while (chunk := anyio.from_thread.run(next_chunk)) is not None:
+            yield chunk
+
+    return await run_in_threadpool(import_users, db, io.BufferedReader(ChunkReader(chunks())), fmt)
@@ -1,23 +1,46 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from typing import List
+from datetime import datetime
+from fastapi import APIRouter, Depends, Header, HTTPException, status, Query
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import iterate_in_threadpool
+from sqlalchemy.orm import Session, joinedload
+from typing import List, Optional
 from ..core.database import get_db
-from ..models.models import Order, OrderItem, User, Sweet
+from ..models.models import Order, User
 from ..schemas.orders import OrderCreate, OrderResponse, OrderUpdate, OrderItemResponse
-from ..services.deps import get_current_user, get_admin_user
+from ..schemas.schemas import TokenData
+from ..services.deps import get_current_user, get_token_claims, get_admin_user
+from ..services.principals import Principal
+from ..services.catalog import catalog
+from ..services.serialization import json_bytes_response, order_page_json, orders_json
+from ..services.pagination import keyset_page
+from ..services.inventory import restore_stock
+from ..services.orders import add_order_items, cached_order_count, order_filters
+from ..services.order_export import EXPORT_MEDIA_TYPES, export_orders
+from ..services import idempotency
 from ..services.email_service import EmailService
 
 router = APIRouter(prefix="/api/orders", tags=["orders"])
 
+# Admin listing keyset, tie-broken by id and backed by the (x, created_at, id) indexes
+ORDER_SORT = (Order.created_at, Order.id)
+
 
 @router.post("/", response_model=OrderResponse)
 def create_order(
     order_data: OrderCreate,
+    idempotency_key: Optional[str] = Header(None, max_length=255, description="Client-generated key; retries with it replay the first response"),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     """Create a new order"""
     
+    idempotency_record = None
+    if idempotency_key:
+        # A retry gets the stored response back without touching stock again
+        idempotency_record, replay = idempotency.begin(db, current_user.id, idempotency_key, order_data)
+        if replay is not None:
+            return replay
+    
     # Create the order
     order = Order(
         user_id=current_user.id,
@@ -32,40 +55,17 @@ def create_order(
     db.add(order)
     db.flush()  # Get the order ID
     
-    # Create order items
-    for item_data in order_data.order_items:
-        # Verify sweet exists
-        sweet = db.query(Sweet).filter(Sweet.id == item_data.sweet_id).first()
-        if not sweet:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail=f"Sweet with id {item_data.sweet_id} not found"
-            )
-        
-        # Check if enough quantity is available
-        if sweet.quantity < item_data.quantity:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Insufficient quantity for {sweet.name}. Available: {sweet.quantity}, Requested: {item_data.quantity}"
-            )
-        
-        # Create order item
-        order_item = OrderItem(
-            order_id=order.id,
-            sweet_id=item_data.sweet_id,
-            sweet_name=item_data.sweet_name,
-            selected_quantity=item_data.selected_quantity,
-            quantity=item_data.quantity,
-            price=item_data.price
-        )
-        
-        db.add(order_item)
-        
-        # Update sweet quantity
-        sweet.quantity -= item_data.quantity
+    # Lock the referenced sweets, take their stock and insert the items in bulk
+    add_order_items(db, order.id, current_user.id, order_data.order_items)
     
-    db.commit()
+    # Serialized before commit so a stored replay is byte-identical
     db.refresh(order)
+    body = OrderResponse.model_validate(order).model_dump_json().encode()
+    if idempotency_record is not None:
+        idempotency.complete(idempotency_record, status.HTTP_200_OK, body)
+    
+    db.commit()
+    catalog.bump()
     
     # Send order confirmation email
     try:
@@ -123,37 +123,78 @@ def create_order(
         traceback.print_exc()
         # Don't fail the order creation if email fails
     
-    return order
+    return json_bytes_response(body)
 
 
 @router.get("/", response_model=List[OrderResponse])
 def get_user_orders(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: TokenData = Depends(get_token_claims)
 ):
     """Get all orders for the current user"""
-    orders = db.query(Order).filter(Order.user_id == current_user.id).order_by(Order.created_at.desc()).all()
-    return orders
+    return json_bytes_response(orders_json(db, Order.user_id == current_user.user_id))
+
+
+def admin_order_filters(
+    status_filter: Optional[str] = Query(None, alias="status", description="pending, confirmed, shipped, delivered or cancelled"),
+    created_from: Optional[datetime] = Query(None, description="Orders placed at or after this time"),
+    created_to: Optional[datetime] = Query(None, description="Orders placed before this time"),
+    email: Optional[str] = Query(None, description="Exact customer email on the order"),
+    phone: Optional[str] = Query(None, description="Exact phone number on the order"),
+    min_total: Optional[float] = Query(None, description="Minimum order total"),
+    user_id: Optional[int] = Query(None, description="Orders of one user"),
+) -> tuple:
+    return (status_filter, created_from, created_to, email, phone, min_total, user_id)
 
 
 @router.get("/admin", response_model=List[OrderResponse])
 def get_all_orders(
+    filters: tuple = Depends(admin_order_filters),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor or X-Prev-Cursor of a previous page"),
+    limit: int = Query(50, ge=1, le=500),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_admin_user)
+    current_user: TokenData = Depends(get_admin_user)
 ):
-    """Get all orders (admin only)"""
-    orders = db.query(Order).order_by(Order.created_at.desc()).all()
-    return orders
+    """Get all orders (admin only), newest first, one page at a time"""
+    criteria = order_filters(*filters)
+    rows, next_cursor, prev_cursor = keyset_page(
+        db.query(*Order.__table__.c).filter(*criteria), "created_at", ORDER_SORT, cursor, limit, descending=True
+    )
+    response = json_bytes_response(order_page_json(db, [row._mapping for row in rows]))
+    response.headers["X-Total-Count"] = str(cached_order_count(db, filters, criteria))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if prev_cursor:
+        response.headers["X-Prev-Cursor"] = prev_cursor
+    return response
+
+
+@router.get("/admin/export")
+def export_all_orders(
+    export_format: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$", description="ndjson (one order per line) or csv (one row per item)"),
+    filters: tuple = Depends(admin_order_filters),
+    db: Session = Depends(get_db),
+    current_user: TokenData = Depends(get_admin_user)
+):
+    """Stream every matching order with its items, oldest first (admin only)"""
+    # The export opens its own session: it outlives this request's dependencies
+    chunks = export_orders(db.get_bind(), order_filters(*filters), export_format)
+    return StreamingResponse(
+        iterate_in_threadpool(chunks),
+        media_type=EXPORT_MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f'attachment; filename="orders.{export_format}"'},
+    )
 
 
 @router.get("/{order_id}", response_model=OrderResponse)
 def get_order(
     order_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: TokenData = Depends(get_token_claims)
 ):
     """Get a specific order"""
-    order = db.query(Order).filter(Order.id == order_id).first()
+    # Items joined into the same query, not lazily loaded while the response is serialized
+    order = db.query(Order).options(joinedload(Order.order_items)).filter(Order.id == order_id).first()
     
     if not order:
         raise HTTPException(
@@ -162,7 +203,7 @@ def get_order(
         )
     
     # Check if user owns the order or is admin
-    if order.user_id != current_user.id and not current_user.is_admin:
+    if order.user_id != current_user.user_id and not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to view this order"
@@ -176,10 +217,10 @@ def update_order(
     order_id: int,
     order_update: OrderUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_admin_user)
+    current_user: TokenData = Depends(get_admin_user)
 ):
     """Update an order (admin only)"""
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = db.query(Order).options(joinedload(Order.order_items)).filter(Order.id == order_id).first()
     
     if not order:
         raise HTTPException(
@@ -226,10 +267,10 @@ def update_order(
 def cancel_order(
     order_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: TokenData = Depends(get_token_claims)
 ):
     """Cancel an order"""
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = db.query(Order).options(joinedload(Order.order_items)).filter(Order.id == order_id).first()
     
     if not order:
         raise HTTPException(
@@ -238,7 +279,7 @@ def cancel_order(
         )
     
     # Check if user owns the order or is admin
-    if order.user_id != current_user.id and not current_user.is_admin:
+    if order.user_id != current_user.user_id and not current_user.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not authorized to cancel this order"
@@ -251,15 +292,16 @@ def cancel_order(
             detail="Cannot cancel order with status: " + order.status
         )
     
-    # Restore sweet quantities
+    # Restore sweet quantities (sharded sweets get theirs back on a shard)
+    amounts = {}
     for item in order.order_items:
-        sweet = db.query(Sweet).filter(Sweet.id == item.sweet_id).first()
-        if sweet:
-            sweet.quantity += item.quantity
+        amounts[item.sweet_id] = amounts.get(item.sweet_id, 0) + item.quantity
+    restore_stock(db, amounts)
     
     # Update order status
     order.status = "cancelled"
     
     db.commit()
+    catalog.bump()
     
     return {"message": "Order cancelled successfully"}
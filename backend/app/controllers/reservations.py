@@ -0,0 +1,58 @@
+from typing import List
+from fastapi import APIRouter, Depends, status
+from sqlalchemy.orm import Session
+from ..core.database import get_db
+from ..schemas.orders import ReservationCreate, ReservationResponse
+from ..schemas.schemas import TokenData
+from ..services.deps import get_token_claims
+from ..services.catalog import catalog
+from ..services import reservations as reservation_service
+
+router = APIRouter(prefix="/api/reservations", tags=["reservations"])
+
+
+@router.post("/", response_model=ReservationResponse, status_code=status.HTTP_201_CREATED)
+def reserve(
+    reservation: ReservationCreate,
+    db: Session = Depends(get_db),
+    current_user: TokenData = Depends(get_token_claims)
+):
+    """Hold stock for the cart until checkout or expiry"""
+    hold = reservation_service.reserve_stock(db, current_user.user_id, reservation.sweet_id, reservation.quantity)
+    db.commit()
+    catalog.bump()
+    return hold
+
+
+@router.get("/", response_model=List[ReservationResponse])
+def list_reservations(
+    db: Session = Depends(get_db),
+    current_user: TokenData = Depends(get_token_claims)
+):
+    """Active holds of the current user"""
+    return reservation_service.active_holds(db, current_user.user_id)
+
+
+@router.post("/{hold_id}/extend", response_model=ReservationResponse)
+def extend_reservation(
+    hold_id: int,
+    db: Session = Depends(get_db),
+    current_user: TokenData = Depends(get_token_claims)
+):
+    """Keep a hold alive while the user is still checking out"""
+    hold = reservation_service.extend_hold(db, current_user.user_id, hold_id)
+    db.commit()
+    return hold
+
+
+@router.delete("/{hold_id}")
+def release_reservation(
+    hold_id: int,
+    db: Session = Depends(get_db),
+    current_user: TokenData = Depends(get_token_claims)
+):
+    """Drop a hold (item removed from the cart) and return its stock"""
+    reservation_service.release_hold(db, current_user.user_id, hold_id)
+    db.commit()
+    catalog.bump()
+    return {"message": "Reservation released"}
@@ -1,77 +1,130 @@
 from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request
 from sqlalchemy.orm import Session
 from ..core.database import get_db
-from ..models.models import Sweet, User
-from ..schemas.schemas import SweetCreate, SweetUpdate, SweetResponse, PurchaseRequest, RestockRequest
-from ..services.deps import get_current_user, get_admin_user
+from ..models.models import Sweet
+from ..schemas.schemas import SweetCreate, SweetUpdate, SweetResponse, SweetFacets, Suggestion, PurchaseRequest, RestockRequest, StockShardsUpdate, StockShardsResponse, TokenData
+from ..services.deps import get_token_claims, get_admin_user
+from ..services.catalog import catalog
+from ..services.http_cache import dump_list, public_json_response
+from ..services.serialization import rows_json
+from ..services.pagination import cursor_sort, keyset_page
+from ..services import search as search_service
+from ..services.facets import facets_json
+from ..services.suggest import MAX_SUGGESTIONS, suggest
+from ..services.inventory import decrement_stock, increment_stock
+from ..services.stock_shards import configure_shards, shard_layout, sweet_columns, sweet_row
 
 router = APIRouter(prefix="/api/sweets", tags=["sweets"])
 
+# Keyset sort keys; each is tie-broken by id and backed by a composite index
+SWEET_SORTS = {
+    "name": (Sweet.name, Sweet.id),
+    "price": (Sweet.price, Sweet.id),
+    "created_at": (Sweet.created_at, Sweet.id),
+}
+
 
 @router.post("/", response_model=SweetResponse)
 def create_sweet(
     sweet: SweetCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_admin_user)
+    current_user: TokenData = Depends(get_admin_user)
 ):
     db_sweet = Sweet(**sweet.dict())
     db.add(db_sweet)
     db.commit()
+    catalog.bump()
     db.refresh(db_sweet)
     return db_sweet
 
 
 @router.get("/", response_model=List[SweetResponse])
 def get_sweets(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    sort: Optional[str] = Query(None, description="Keyset sort: name, price or created_at"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor or X-Prev-Cursor of a previous page"),
+    db: Session = Depends(get_db)
 ):
-    sweets = db.query(Sweet).offset(skip).limit(limit).all()
-    return sweets
+    if sort is None and cursor is None:
+        # Offset mode, served from the in-process snapshot
+        return public_json_response(request, catalog.snapshot(db).page(skip, limit))
+    
+    sort = sort or cursor_sort(cursor)
+    if sort not in SWEET_SORTS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"sort must be one of: {', '.join(SWEET_SORTS)}"
+        )
+    
+    limit = min(max(limit, 1), 1000)
+    rows, next_cursor, prev_cursor = keyset_page(db.query(*sweet_columns()), sort, SWEET_SORTS[sort], cursor, limit)
+    response = public_json_response(request, rows_json(SweetResponse, (row._mapping for row in rows)))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    if prev_cursor:
+        response.headers["X-Prev-Cursor"] = prev_cursor
+    return response
 
 
 @router.get("/search", response_model=List[SweetResponse])
 def search_sweets(
+    request: Request,
     name: Optional[str] = Query(None, description="Search by name"),
     category: Optional[str] = Query(None, description="Filter by category"),
     min_price: Optional[float] = Query(None, description="Minimum price"),
     max_price: Optional[float] = Query(None, description="Maximum price"),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    limit: int = Query(50, ge=1, le=500, description="Maximum results, best matches first"),
+    db: Session = Depends(get_db)
 ):
-    query = db.query(Sweet)
-    
-    if name:
-        query = query.filter(Sweet.name.ilike(f"%{name}%"))
-    
-    if category:
-        query = query.filter(Sweet.category.ilike(f"%{category}%"))
-    
-    if min_price is not None:
-        query = query.filter(Sweet.price >= min_price)
-    
-    if max_price is not None:
-        query = query.filter(Sweet.price <= max_price)
-    
-    return query.all()
+    sweets = search_service.search_sweets(db, name, category, min_price, max_price, limit)
+    return public_json_response(request, dump_list(SweetResponse.model_validate(sweet) for sweet in sweets))
+
+
+@router.get("/facets", response_model=SweetFacets)
+def get_sweet_facets(
+    request: Request,
+    name: Optional[str] = Query(None, description="Search by name"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    min_price: Optional[float] = Query(None, description="Minimum price"),
+    max_price: Optional[float] = Query(None, description="Maximum price"),
+    buckets: int = Query(10, ge=1, le=50, description="Price histogram buckets"),
+    db: Session = Depends(get_db)
+):
+    # Category chips and price slider data without downloading the catalog
+    snapshot = catalog.snapshot(db)
+    return public_json_response(request, facets_json(snapshot, name, category, min_price, max_price, buckets))
+
+
+@router.get("/suggest", response_model=List[Suggestion])
+def suggest_sweets(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=100, description="Prefix typed so far"),
+    limit: int = Query(8, ge=1, le=MAX_SUGGESTIONS),
+    db: Session = Depends(get_db)
+):
+    return public_json_response(request, dump_list(suggest(db, catalog.snapshot(db), q, limit)))
 
 
 @router.get("/{sweet_id}", response_model=SweetResponse)
 def get_sweet(
+    request: Request,
     sweet_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: Session = Depends(get_db)
 ):
-    sweet = db.query(Sweet).filter(Sweet.id == sweet_id).first()
-    if not sweet:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Sweet not found"
-        )
-    return sweet
+    body = catalog.snapshot(db).item(sweet_id)
+    if body is None:
+        # Possibly created by another worker since this snapshot was built
+        sweet = sweet_row(db, sweet_id)
+        if not sweet:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Sweet not found"
+            )
+        body = SweetResponse.model_validate(sweet).model_dump_json().encode()
+    return public_json_response(request, body)
 
 
 @router.put("/{sweet_id}", response_model=SweetResponse)
@@ -79,7 +132,7 @@ def update_sweet(
     sweet_id: int,
     sweet_update: SweetUpdate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_admin_user)
+    current_user: TokenData = Depends(get_admin_user)
 ):
     sweet = db.query(Sweet).filter(Sweet.id == sweet_id).first()
     if not sweet:
@@ -92,16 +145,22 @@ def update_sweet(
     for field, value in update_data.items():
         setattr(sweet, field, value)
     
+    if sweet.stock_shards > 1 and "quantity" in update_data:
+        # A sharded sweet's stock lives in its shards; split the new level over them
+        db.flush()
+        configure_shards(db, sweet_id, sweet.stock_shards, quantity=sweet.quantity)
+    
     db.commit()
-    db.refresh(sweet)
-    return sweet
+    catalog.bump()
+    # Read back through the shards: sweets.quantity is only their cached total
+    return sweet_row(db, sweet_id)
 
 
 @router.delete("/{sweet_id}")
 def delete_sweet(
     sweet_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_admin_user)
+    current_user: TokenData = Depends(get_admin_user)
 ):
     sweet = db.query(Sweet).filter(Sweet.id == sweet_id).first()
     if not sweet:
@@ -112,6 +171,7 @@ def delete_sweet(
     
     db.delete(sweet)
     db.commit()
+    catalog.bump()
     return {"message": "Sweet deleted successfully"}
 
 
@@ -120,24 +180,12 @@ def purchase_sweet(
     sweet_id: int,
     purchase: PurchaseRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: TokenData = Depends(get_token_claims)
 ):
-    sweet = db.query(Sweet).filter(Sweet.id == sweet_id).first()
-    if not sweet:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Sweet not found"
-        )
-    
-    if sweet.quantity < purchase.quantity:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Insufficient quantity in stock"
-        )
-    
-    sweet.quantity -= purchase.quantity
+    # Single conditional UPDATE, so concurrent purchases cannot oversell
+    sweet = decrement_stock(db, sweet_id, purchase.quantity)
     db.commit()
-    db.refresh(sweet)
+    catalog.bump()
     return sweet
 
 
@@ -146,16 +194,48 @@ def restock_sweet(
     sweet_id: int,
     restock: RestockRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_admin_user)
+    current_user: TokenData = Depends(get_admin_user)
 ):
-    sweet = db.query(Sweet).filter(Sweet.id == sweet_id).first()
+    sweet = increment_stock(db, sweet_id, restock.quantity)
+    db.commit()
+    catalog.bump()
+    return sweet
+
+
+
+def _stock_shards_response(db: Session, sweet_id: int) -> StockShardsResponse:
+    sweet = sweet_row(db, sweet_id)
     if not sweet:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Sweet not found"
         )
-    
-    sweet.quantity += restock.quantity
+    return StockShardsResponse(
+        sweet_id=sweet_id,
+        shards=sweet["stock_shards"],
+        quantity=sweet["quantity"],
+        shard_quantities=shard_layout(db, sweet_id),
+    )
+
+
+@router.get("/{sweet_id}/stock-shards", response_model=StockShardsResponse)
+def get_stock_shards(
+    sweet_id: int,
+    db: Session = Depends(get_db),
+    current_user: TokenData = Depends(get_admin_user)
+):
+    return _stock_shards_response(db, sweet_id)
+
+
+@router.put("/{sweet_id}/stock-shards", response_model=StockShardsResponse)
+def set_stock_shards(
+    sweet_id: int,
+    shards_update: StockShardsUpdate,
+    db: Session = Depends(get_db),
+    current_user: TokenData = Depends(get_admin_user)
+):
+    # Split a hot SKU's stock over several counter rows, e.g. before a flash sale
+    configure_shards(db, sweet_id, shards_update.shards)
     db.commit()
-    db.refresh(sweet)
-    return sweet
+    catalog.bump()
+    return _stock_shards_response(db, sweet_id)
@@ -7,6 +7,80 @@ class Settings(BaseSettings):
     secret_key: str = "your-secret-key-here"
     algorithm: str = "HS256"
     access_token_expire_minutes: int = 30
+    refresh_token_expire_days: int = 14
+    # Expired refresh tokens are purged in batches. Revoked ones are kept for a
+    # retention window first, because replaying one is how token theft is detected
+    refresh_token_purge_interval_seconds: float = 3600.0
+    refresh_token_purge_batch_size: int = 1000
+    refresh_token_revoked_retention_seconds: int = 86400
+
+    # Startup schema handling (see core/schema.py): auto | check | skip.
+    # Multi-worker deployments should run `python migrate.py` once and use "check".
+    schema_startup_mode: str = "auto"
+
+    # In-process auth caches (see services/principals.py and services/auth.py).
+    # Token revocation and admin flag changes clear the principal cache only in
+    # the worker that made them; other workers keep accepting the old tokens
+    # for up to principal_cache_ttl_seconds, so keep it short
+    principal_cache_ttl_seconds: float = 5.0
+    principal_cache_max_entries: int = 10000
+    token_claims_cache_max_entries: int = 10000
+
+    # Password hash policy; tune per deployment with calibrate_password_hash.py
+    password_hash_scheme: str = "bcrypt"
+    password_hash_rounds: int = 12
+    login_latency_budget_ms: int = 250
+
+    # Login throttle (see services/throttle.py); set a Redis URL to share limits across workers
+    login_throttle_ip_per_minute: int = 30
+    login_throttle_ip_burst: int = 10
+    login_throttle_account_per_minute: int = 6
+    login_throttle_account_burst: int = 5
+    login_throttle_redis_url: Optional[str] = None
+
+    # Password hashing executor (see services/password_pool.py); 0 workers uses threads
+    password_pool_workers: int = 2
+    password_pool_max_pending: int = 32
+
+    # Bulk user import; 0 workers means one hashing process per CPU. The
+    # hashing pool is shared by concurrent imports and holds at most
+    # max_pending queued passwords; further batches wait for room
+    user_import_batch_size: int = 1000
+    user_import_workers: int = 0
+    user_import_max_pending: int = 4000
+
+    # Catalog snapshot (see services/catalog.py); bounds staleness across workers
+    catalog_snapshot_ttl_seconds: float = 5.0
+    facet_cache_max_entries: int = 1024
+    # Sent on public catalog reads; writes are visible after at most max-age
+    # (clients and proxies revalidate cheaply with If-None-Match)
+    catalog_cache_control: str = "public, max-age=30, stale-while-revalidate=60"
+    # Units ordered per sweet, used to rank suggestions; recounted at most this often
+    suggest_popularity_ttl_seconds: float = 300.0
+
+    # Sweet search: "database" (pg_trgm / ILIKE) or "memory" (services/search_index.py)
+    search_backend: str = "database"
+
+    # Cart reservations (see services/reservations.py); holds can be extended up to the max lifetime
+    reservation_ttl_seconds: int = 900
+    reservation_max_seconds: int = 3600
+    reservation_sweep_interval_seconds: float = 30.0
+    reservation_sweep_batch_size: int = 500
+
+    # Sharded stock counters for hot SKUs (see services/stock_shards.py)
+    stock_shards_max: int = 64
+    stock_rebalance_interval_seconds: float = 10.0
+
+    # Admin order listing totals (X-Total-Count) are cached per filter combination
+    order_count_cache_ttl_seconds: float = 30.0
+    order_count_cache_max_entries: int = 1024
+    # Orders per chunk (and per server-side cursor fetch) in the streaming export
+    order_export_batch_size: int = 1000
+
+    # Idempotency-Key on POST /api/orders/ (see services/idempotency.py)
+    idempotency_key_ttl_seconds: int = 86400
+    idempotency_purge_interval_seconds: float = 300.0
+    idempotency_purge_batch_size: int = 1000
 
     # Pydantic v2 settings config
     model_config = SettingsConfigDict(
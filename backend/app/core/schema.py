@@ -0,0 +1,118 @@
+import hashlib
+from typing import Optional
+from sqlalchemy import delete, inspect, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateIndex, CreateTable
+from .database import Base
+from ..models.models import SchemaState
+from ..services.utils import seed_defaults
+
+
+def schema_fingerprint(engine: Engine) -> str:
+    """Hash the DDL the models would emit, so any model change alters it"""
+    digest = hashlib.sha256()
+    for table in sorted(Base.metadata.tables.values(), key=lambda t: t.name):
+        digest.update(str(CreateTable(table).compile(dialect=engine.dialect)).encode())
+        for index in sorted(table.indexes, key=lambda i: i.name or ""):
+            digest.update(str(CreateIndex(index).compile(dialect=engine.dialect)).encode())
+    return digest.hexdigest()
+
+
+def recorded_fingerprint(engine: Engine) -> Optional[str]:
+    """Return the fingerprint stored by the last migration, or None if never migrated"""
+    try:
+        with Session(engine) as db:
+            return db.execute(select(SchemaState.fingerprint)).scalars().first()
+    except DBAPIError:
+        # schema_state does not exist yet
+        return None
+
+
+def missing_columns(engine: Engine) -> list:
+    """Model columns absent from tables that already exist in the database"""
+    inspector = inspect(engine)
+    existing_tables = set(inspector.get_table_names())
+    missing = []
+    for table in Base.metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        present = {column["name"] for column in inspector.get_columns(table.name)}
+        missing.extend(column for column in table.columns if column.name not in present)
+    return missing
+
+
+def add_missing_columns(engine: Engine) -> list:
+    """ALTER existing tables to add new model columns; returns the names added.
+
+    Only columns the database can fill for existing rows are added: nullable
+    ones or those with a server default. Anything else raises before any
+    change, so the fingerprint is never recorded over a half-migrated schema.
+    """
+    missing = missing_columns(engine)
+    unfillable = [
+        f"{column.table.name}.{column.name}"
+        for column in missing
+        if column.primary_key or (not column.nullable and column.server_default is None)
+    ]
+    if unfillable:
+        raise RuntimeError(
+            f"Cannot add NOT NULL columns without a server default: {', '.join(unfillable)}; "
+            "apply an explicit ALTER first"
+        )
+
+    compiler = engine.dialect.ddl_compiler(engine.dialect, None)
+    preparer = engine.dialect.identifier_preparer
+    with engine.begin() as conn:
+        for column in missing:
+            conn.exec_driver_sql(
+                f"ALTER TABLE {preparer.format_table(column.table)} "
+                f"ADD COLUMN {compiler.get_column_specification(column)}"
+            )
+    return [f"{column.table.name}.{column.name}" for column in missing]
+
+
+def migrate(engine: Engine, seed: bool = True) -> str:
+    """Create missing tables, columns and indexes, seed defaults and record the schema fingerprint.
+
+    Renamed, retyped or dropped columns still need an explicit ALTER before
+    running this.
+    """
+    fingerprint = schema_fingerprint(engine)
+    Base.metadata.create_all(bind=engine)
+    # create_all leaves existing tables alone, so new columns are added here
+    add_missing_columns(engine)
+    # create_all only emits indexes together with new tables
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    with Session(engine) as db:
+        if seed:
+            seed_defaults(db)
+        db.execute(delete(SchemaState))
+        db.add(SchemaState(fingerprint=fingerprint))
+        db.commit()
+    return fingerprint
+
+
+def prepare_database(engine: Engine, mode: str) -> str:
+    """Startup hook; returns what was done.
+
+    ``auto``  migrate and seed only when the recorded fingerprint differs
+    ``check`` refuse to start on a fingerprint mismatch (run migrate.py first)
+    ``skip``  touch nothing
+    """
+    if mode == "skip":
+        return "skipped"
+
+    if recorded_fingerprint(engine) == schema_fingerprint(engine):
+        return "up-to-date"
+
+    if mode == "check":
+        missing = [f"{column.table.name}.{column.name}" for column in missing_columns(engine)]
+        detail = f" (missing columns: {', '.join(missing)})" if missing else ""
+        raise RuntimeError(f"Database schema is out of date{detail}; run `python migrate.py` before starting")
+
+    migrate(engine)
+    return "migrated"
@@ -1,15 +1,28 @@
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+from .core.config import settings
 from .core.database import engine
-from .core.database import Base
+from .core.schema import prepare_database
 from .controllers import auth as auth_controller
 from .controllers import sweets as sweets_controller
 from .controllers import orders as orders_controller
 from .controllers import contact as contact_controller
-from .services.utils import create_admin_user, seed_initial_sweets
-from .core.database import get_db
-
-Base.metadata.create_all(bind=engine)
+from .controllers import reservations as reservations_controller
+from .services.principals import principal_cache
+from .services.auth import token_claims_cache
+from .services.password_pool import import_pool, password_pool
+from .services.throttle import login_throttle
+from .services.catalog import catalog
+from .services.search_index import search_index
+from .services.facets import facet_cache
+from .services.orders import order_count_cache
+from .services.suggest import popularity_cache
+from .services.background import periodic_jobs
+from .services.reservations import run_hold_sweeper
+from .services.stock_shards import run_shard_rebalancer
+from .services.idempotency import run_idempotency_purge
+from .services.refresh_tokens import run_refresh_token_purge
 
 app = FastAPI(
     title="Sweet Shop Management System",
@@ -23,27 +36,33 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "X-Prev-Cursor", "X-Total-Count", "Idempotent-Replayed"],
 )
 
 app.include_router(auth_controller.router)
 app.include_router(sweets_controller.router)
 app.include_router(orders_controller.router)
 app.include_router(contact_controller.router)
+app.include_router(reservations_controller.router)
+
+periodic_jobs.add("reservation sweeper", settings.reservation_sweep_interval_seconds, run_hold_sweeper)
+periodic_jobs.add("stock shard rebalancer", settings.stock_rebalance_interval_seconds, run_shard_rebalancer)
+periodic_jobs.add("idempotency key purge", settings.idempotency_purge_interval_seconds, run_idempotency_purge)
+periodic_jobs.add("refresh token purge", settings.refresh_token_purge_interval_seconds, run_refresh_token_purge)
 
 
 @app.on_event("startup")
 async def startup_event():
-    db = next(get_db())
-    try:
-        create_admin_user(
-            db=db,
-            email="admin@sweetshop.com",
-            username="admin",
-            password="admin123"
-        )
-        seed_initial_sweets(db)
-    finally:
-        db.close()
+    # Schema creation and seeding run here (or via migrate.py), never at import time
+    await run_in_threadpool(prepare_database, engine, settings.schema_startup_mode)
+    periodic_jobs.start()
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await periodic_jobs.stop()
+    password_pool.shutdown()
+    import_pool.shutdown()
 
 
 @app.get("/")
@@ -54,3 +73,19 @@ def read_root():
 @app.get("/health")
 def health_check():
     return {"status": "healthy"}
+
+
+@app.get("/metrics")
+def metrics():
+    return {
+        "principal_cache": principal_cache.stats(),
+        "token_claims_cache": token_claims_cache.stats(),
+        "password_pool": password_pool.stats(),
+        "import_pool": import_pool.stats(),
+        "login_throttle": login_throttle.stats(),
+        "catalog": catalog.stats(),
+        "search_index": search_index.stats(),
+        "facet_cache": facet_cache.stats(),
+        "order_count_cache": order_count_cache.stats(),
+        "popularity_cache": popularity_cache.stats(),
+    }
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey
+from sqlalchemy import Column, Integer, String, Float, Boolean, DateTime, Text, ForeignKey, Index, DDL, event
 from sqlalchemy.sql import func
 from sqlalchemy.orm import relationship
 from ..core.database import Base
@@ -12,6 +12,7 @@ class User(Base):
     username = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     is_admin = Column(Boolean, default=False)
+    token_version = Column(Integer, nullable=False, default=0, server_default="0")  # bump to revoke issued tokens
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
     
@@ -19,6 +20,21 @@ class User(Base):
     orders = relationship("Order", back_populates="user")
 
 
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    token_hash = Column(String(64), unique=True, index=True, nullable=False)  # sha256 of the opaque token
+    family_id = Column(String(32), nullable=False, index=True)  # shared by every rotation of one login
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)  # purged in batches after this
+    revoked_at = Column(DateTime(timezone=True), nullable=True, index=True)  # kept a while for reuse detection, then purged
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    
+    # Relationship
+    user = relationship("User")
+
+
 class Sweet(Base):
     __tablename__ = "sweets"
     
@@ -26,11 +42,43 @@ class Sweet(Base):
     name = Column(String, nullable=False, index=True)
     category = Column(String, nullable=False, index=True)
     price = Column(Float, nullable=False)
-    quantity = Column(Integer, nullable=False, default=0)
+    quantity = Column(Integer, nullable=False, default=0)  # cached total when stock_shards > 1
+    stock_shards = Column(Integer, nullable=False, default=1, server_default="1")  # >1: stock lives in sweet_stock_shards
     description = Column(String, nullable=True)
     image = Column(String, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    # Keyset pagination orders by (sort key, id); see services/pagination.py
+    __table_args__ = (
+        Index("ix_sweets_name_id", "name", "id"),
+        Index("ix_sweets_price_id", "price", "id"),
+        Index("ix_sweets_created_at_id", "created_at", "id"),
+        # Trigram GIN indexes serve substring ILIKE and similarity search (Postgres only)
+        Index(
+            "ix_sweets_name_trgm", "name",
+            postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_sweets_category_trgm", "category",
+            postgresql_using="gin", postgresql_ops={"category": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
+
+
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+
+class StockShard(Base):
+    __tablename__ = "sweet_stock_shards"
+    
+    sweet_id = Column(Integer, ForeignKey("sweets.id", ondelete="CASCADE"), primary_key=True)
+    shard = Column(Integer, primary_key=True)  # 0 .. stock_shards - 1
+    quantity = Column(Integer, nullable=False, default=0)
 
 
 class Order(Base):
@@ -51,13 +99,22 @@ class Order(Base):
     # Relationship
     user = relationship("User", back_populates="orders")
     order_items = relationship("OrderItem", back_populates="order", cascade="all, delete-orphan")
+    
+    # Admin listing pages newest first by (created_at, id), optionally within one filter value
+    __table_args__ = (
+        Index("ix_orders_created_at_id", "created_at", "id"),
+        Index("ix_orders_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_orders_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_orders_email_created_at_id", "email", "created_at", "id"),
+        Index("ix_orders_phone_number_created_at_id", "phone_number", "created_at", "id"),
+    )
 
 
 class OrderItem(Base):
     __tablename__ = "order_items"
     
     id = Column(Integer, primary_key=True, index=True)
-    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
+    order_id = Column(Integer, ForeignKey("orders.id"), nullable=False, index=True)
     sweet_id = Column(Integer, ForeignKey("sweets.id"), nullable=False)
     sweet_name = Column(String, nullable=False)
     selected_quantity = Column(String, nullable=False)  # 250g, 500g, 1kg
@@ -68,3 +125,39 @@ class OrderItem(Base):
     # Relationships
     order = relationship("Order", back_populates="order_items")
     sweet = relationship("Sweet")
+
+
+class StockHold(Base):
+    __tablename__ = "stock_holds"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    sweet_id = Column(Integer, ForeignKey("sweets.id"), nullable=False)
+    quantity = Column(Integer, nullable=False)  # already taken from sweets.quantity
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)  # swept back into stock after this
+    created_at = Column(DateTime(timezone=True), nullable=False)
+
+
+class IdempotencyKey(Base):
+    __tablename__ = "idempotency_keys"
+    
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    key = Column(String(255), nullable=False)  # Idempotency-Key header sent by the client
+    request_hash = Column(String(64), nullable=False)  # sha256 of the request body the key was first used with
+    status_code = Column(Integer, nullable=True)  # set with the response, in the transaction that claimed the key
+    response_body = Column(Text, nullable=True)  # replayed verbatim on retries
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)  # purged in batches after this
+    
+    # Keys are scoped per user; the unique index is also the replay lookup
+    __table_args__ = (
+        Index("ix_idempotency_keys_user_id_key", "user_id", "key", unique=True),
+    )
+
+
+class SchemaState(Base):
+    __tablename__ = "schema_state"
+    
+    id = Column(Integer, primary_key=True)
+    fingerprint = Column(String(64), nullable=False)  # sha256 of the DDL for all tables
+    applied_at = Column(DateTime(timezone=True), server_default=func.now())
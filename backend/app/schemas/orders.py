@@ -9,6 +9,7 @@ class OrderItemCreate(BaseModel):
     selected_quantity: str
     quantity: int
     price: float
+    hold_id: Optional[int] = None  # reservation from /api/reservations to convert
 
 
 class OrderCreate(BaseModel):
@@ -57,3 +58,18 @@ class OrderUpdate(BaseModel):
     delivery_address: Optional[str] = None
     phone_number: Optional[str] = None
     notes: Optional[str] = None
+
+
+class ReservationCreate(BaseModel):
+    sweet_id: int
+    quantity: int = 1
+
+
+class ReservationResponse(BaseModel):
+    id: int
+    sweet_id: int
+    quantity: int
+    expires_at: datetime
+
+    class Config:
+        from_attributes = True
@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional
+from pydantic import BaseModel, EmailStr, model_validator
+from typing import List, Optional
 from datetime import datetime
 
 
@@ -22,6 +22,29 @@ class UserResponse(UserBase):
         from_attributes = True
 
 
+class UserImportRow(UserBase):
+    password: Optional[str] = None
+    hashed_password: Optional[str] = None  # pre-hashed credentials migrated as-is
+
+    @model_validator(mode="after")
+    def check_credentials(self):
+        if not self.password and not self.hashed_password:
+            raise ValueError("password or hashed_password is required")
+        return self
+
+
+class UserImportError(BaseModel):
+    line: int
+    email: Optional[str] = None
+    error: str
+
+
+class UserImportResult(BaseModel):
+    imported: int
+    failed: int
+    errors: List[UserImportError]
+
+
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
@@ -59,6 +82,31 @@ class SweetResponse(SweetBase):
         from_attributes = True
 
 
+class CategoryFacet(BaseModel):
+    category: str
+    count: int
+    in_stock: int
+
+
+class PriceBucket(BaseModel):
+    min: float
+    max: float
+    count: int
+
+
+class SweetFacets(BaseModel):
+    total: int
+    in_stock: int
+    categories: List[CategoryFacet]  # ignores the category filter so other chips stay visible
+    price_buckets: List[PriceBucket]  # ignores the price filters; edges span the whole catalog
+
+
+class Suggestion(BaseModel):
+    text: str
+    kind: str  # sweet or category
+    sweet_id: Optional[int] = None
+
+
 # Purchase/Restock Schemas
 class PurchaseRequest(BaseModel):
     quantity: int = 1
@@ -68,11 +116,30 @@ class RestockRequest(BaseModel):
     quantity: int
 
 
+class StockShardsUpdate(BaseModel):
+    shards: int  # 1 turns sharding off
+
+
+class StockShardsResponse(BaseModel):
+    sweet_id: int
+    shards: int
+    quantity: int
+    shard_quantities: List[int]  # empty when the stock lives on the sweets row
+
+
 # Token Schemas
 class Token(BaseModel):
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
 
 
 class TokenData(BaseModel):
     email: Optional[str] = None
+    user_id: Optional[int] = None
+    is_admin: bool = False
+    token_version: Optional[int] = None
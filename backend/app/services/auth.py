@@ -1,13 +1,44 @@
+import hashlib
+import time
 from datetime import datetime, timedelta
 from typing import Optional
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from ..core.config import settings
 from ..models.models import User
 from ..schemas.schemas import TokenData
+from .cache import TTLCache
+from .password_pool import password_pool
+from .refresh_tokens import revoke_user_refresh_tokens
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+def build_crypt_context(scheme: str, rounds: int) -> CryptContext:
+    """Build the password context for a scheme and cost.
+
+    Pinning min/max rounds to the configured cost makes ``needs_update`` flag
+    any stored hash with a different cost (or an older scheme) for rehashing.
+    """
+    schemes = [scheme] if scheme == "bcrypt" else [scheme, "bcrypt"]
+    return CryptContext(
+        schemes=schemes,
+        deprecated="auto",
+        **{
+            f"{scheme}__default_rounds": rounds,
+            f"{scheme}__min_rounds": rounds,
+            f"{scheme}__max_rounds": rounds,
+        },
+    )
+
+
+pwd_context = build_crypt_context(settings.password_hash_scheme, settings.password_hash_rounds)
+
+# Decoded claims keyed by token digest; each entry expires with its token's ``exp``
+token_claims_cache = TTLCache(
+    max_entries=settings.token_claims_cache_max_entries,
+    ttl_seconds=settings.access_token_expire_minutes * 60,
+)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -29,22 +60,71 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return encoded_jwt
 
 
+def create_user_access_token(user: User) -> str:
+    """Issue an access token carrying the claims needed for stateless authorization"""
+    return create_access_token(
+        data={
+            "sub": user.email,
+            "uid": user.id,
+            "adm": bool(user.is_admin),
+            "ver": user.token_version or 0,
+        },
+        expires_delta=timedelta(minutes=settings.access_token_expire_minutes),
+    )
+
+
 def verify_token(token: str, credentials_exception):
+    digest = hashlib.sha256(token.encode()).digest()
+    token_data = token_claims_cache.get(digest)
+    if token_data is not None:
+        return token_data
+
     try:
         payload = jwt.decode(token, settings.secret_key, algorithms=[settings.algorithm])
         email: str = payload.get("sub")
         if email is None:
             raise credentials_exception
-        token_data = TokenData(email=email)
+        token_data = TokenData(
+            email=email,
+            user_id=payload.get("uid"),
+            is_admin=bool(payload.get("adm", False)),
+            token_version=payload.get("ver"),
+        )
     except JWTError:
         raise credentials_exception
+
+    expires_in = payload.get("exp", 0) - time.time()
+    if expires_in > 0:
+        token_claims_cache.set(digest, token_data, ttl_seconds=expires_in)
     return token_data
 
 
-def authenticate_user(db: Session, email: str, password: str):
-    user = db.query(User).filter(User.email == email).first()
+def get_user_by_email(db: Session, email: str) -> Optional[User]:
+    return db.query(User).filter(User.email == email).first()
+
+
+def _save_password_hash(db: Session, user: User, hashed_password: str):
+    user.hashed_password = hashed_password
+    db.commit()
+    db.refresh(user)
+
+
+async def authenticate_user(db: Session, email: str, password: str):
+    user = await run_in_threadpool(get_user_by_email, db, email)
     if not user:
         return False
-    if not verify_password(password, user.hashed_password):
+    valid, new_hash = await password_pool.verify_and_update(password, user.hashed_password)
+    if not valid:
         return False
+    if new_hash:
+        # Transparently migrate the stored hash to the current scheme and cost
+        await run_in_threadpool(_save_password_hash, db, user, new_hash)
     return user
+
+
+def revoke_user_tokens(db: Session, user: User):
+    """Invalidate every token issued to a user by bumping their token version
+    and revoking their refresh tokens"""
+    user.token_version = User.token_version + 1
+    revoke_user_refresh_tokens(db, user.id)
+    db.commit()
@@ -0,0 +1,35 @@
+import asyncio
+from typing import Callable, List, Tuple
+from fastapi.concurrency import run_in_threadpool
+
+
+class PeriodicJobs:
+    """Sync maintenance functions run on an interval in the threadpool while the app is up"""
+
+    def __init__(self):
+        self._jobs: List[Tuple[str, float, Callable[[], object]]] = []
+        self._tasks: List[asyncio.Task] = []
+
+    def add(self, name: str, interval_seconds: float, job: Callable[[], object]):
+        self._jobs.append((name, interval_seconds, job))
+
+    async def _loop(self, name: str, interval_seconds: float, job: Callable[[], object]):
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await run_in_threadpool(job)
+            except Exception as exc:
+                # Keep the loop alive; the next tick retries
+                print(f"⚠️ Background job {name} failed: {exc}")
+
+    def start(self):
+        self._tasks = [asyncio.create_task(self._loop(*spec)) for spec in self._jobs]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+
+periodic_jobs = PeriodicJobs()
@@ -0,0 +1,122 @@
+import itertools
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..models.models import Sweet
+from ..schemas.schemas import SweetResponse
+from .serialization import validate_rows
+from .stock_shards import sweet_columns
+
+# Distinguishes rebuilds that share a version (TTL expiry picks up other workers' writes)
+_generations = itertools.count(1)
+
+
+class CatalogSnapshot:
+    """Immutable view of the sweets table, each item already serialized to JSON"""
+
+    def __init__(self, version: int, sweets: List[SweetResponse]):
+        self.version = version
+        self.generation = next(_generations)
+        self.sweets = sweets
+        self.items = [sweet.model_dump_json().encode() for sweet in sweets]
+        self.built_at = time.monotonic()
+        self._derived: Dict[str, Any] = {}
+        self._derived_lock = threading.Lock()
+
+    def item(self, sweet_id: int) -> Optional[bytes]:
+        """Serialized JSON for one sweet, or None if it is not in this snapshot"""
+        by_id = self.derived("items_by_id", lambda built: {sweet.id: item for sweet, item in zip(built.sweets, built.items)})
+        return by_id.get(sweet_id)
+
+    def derived(self, key: str, build: Callable[["CatalogSnapshot"], Any]) -> Any:
+        """Memoize a structure computed from this snapshot (facet columns, suggestions)"""
+        value = self._derived.get(key)
+        if value is None:
+            with self._derived_lock:
+                value = self._derived.get(key)
+                if value is None:
+                    value = self._derived[key] = build(self)
+        return value
+
+    def page(self, skip: int = 0, limit: int = 100) -> bytes:
+        """JSON array for an offset/limit page, ordered by id"""
+        skip = max(skip, 0)
+        return b"[" + b",".join(self.items[skip:skip + max(limit, 0)]) + b"]"
+
+
+class Catalog:
+    """Process-wide catalog snapshot, rebuilt only after the catalog version moves.
+
+    Writers call ``bump()`` after committing. Other workers never see this
+    process's bumps, so snapshots also expire after ``ttl_seconds``.
+    """
+
+    def __init__(self, ttl_seconds: float):
+        self.ttl_seconds = ttl_seconds
+        self._version = 0
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self.hits = 0
+        self.rebuilds = 0
+
+    @property
+    def version(self) -> int:
+        return self._version
+
+    def bump(self):
+        with self._lock:
+            self._version += 1
+
+    def _current(self) -> Optional[CatalogSnapshot]:
+        snapshot = self._snapshot
+        if (
+            snapshot is not None
+            and snapshot.version == self._version
+            and time.monotonic() - snapshot.built_at < self.ttl_seconds
+        ):
+            return snapshot
+        return None
+
+    def snapshot(self, db: Session) -> CatalogSnapshot:
+        snapshot = self._current()
+        if snapshot is not None:
+            self.hits += 1
+            return snapshot
+
+        # One request rebuilds while concurrent ones wait for its result
+        with self._build_lock:
+            snapshot = self._current()
+            if snapshot is not None:
+                self.hits += 1
+                return snapshot
+            # Read the version before querying: a bump that lands mid-build
+            # leaves this snapshot stale and the next request rebuilds it
+            version = self._version
+            rows = db.execute(select(*sweet_columns()).order_by(Sweet.id)).mappings()
+            snapshot = CatalogSnapshot(version, validate_rows(SweetResponse, rows))
+            self._snapshot = snapshot
+            self.rebuilds += 1
+            return snapshot
+
+    def reset(self):
+        with self._build_lock:
+            self._snapshot = None
+            self.bump()
+            self.hits = 0
+            self.rebuilds = 0
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "version": self._version,
+            "items": len(snapshot.items) if snapshot else 0,
+            "hits": self.hits,
+            "rebuilds": self.rebuilds,
+        }
+
+
+catalog = Catalog(settings.catalog_snapshot_ttl_seconds)
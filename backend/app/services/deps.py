@@ -2,29 +2,44 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 from ..core.database import get_db
-from ..models.models import User
+from ..schemas.schemas import TokenData
 from .auth import verify_token
+from .principals import Principal, is_token_current, load_principal
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)):
-    credentials_exception = HTTPException(
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
+
+
+def get_token_claims(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> TokenData:
+    """Authorize from the JWT claims alone; only the token version is checked,
+    against the in-memory principal cache"""
+    credentials_exception = _credentials_exception()
+    token_data = verify_token(token, credentials_exception)
+    if token_data.user_id is None or not is_token_current(db, token_data):
+        raise credentials_exception
+    return token_data
+
+
+def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> Principal:
+    credentials_exception = _credentials_exception()
     token_data = verify_token(token, credentials_exception)
-    user = db.query(User).filter(User.email == token_data.email).first()
-    if user is None:
+    user = load_principal(db, token_data.email)
+    if user is None or user.token_version != token_data.token_version:
         raise credentials_exception
     return user
 
 
-def get_admin_user(current_user: User = Depends(get_current_user)):
-    if not current_user.is_admin:
+def get_admin_user(claims: TokenData = Depends(get_token_claims)) -> TokenData:
+    if not claims.is_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Not enough permissions"
         )
-    return current_user
+    return claims
@@ -0,0 +1,110 @@
+from array import array
+from typing import Optional
+from ..core.config import settings
+from ..schemas.schemas import CategoryFacet, PriceBucket, SweetFacets
+from .cache import TTLCache
+from .catalog import CatalogSnapshot
+
+# Serialized facet responses keyed by (snapshot generation, filters); a new
+# snapshot changes the generation, so stale entries are simply never hit again
+facet_cache = TTLCache(settings.facet_cache_max_entries, settings.catalog_snapshot_ttl_seconds)
+
+
+class FacetColumns:
+    """Columnar copy of the catalog snapshot: one flat sequence per attribute"""
+
+    def __init__(self, snapshot: CatalogSnapshot):
+        sweets = snapshot.sweets
+        self.category_names = sorted({sweet.category for sweet in sweets})
+        codes = {category: code for code, category in enumerate(self.category_names)}
+        self.names = [sweet.name.lower() for sweet in sweets]
+        self.categories = array("l", (codes[sweet.category] for sweet in sweets))
+        self.prices = array("d", (sweet.price for sweet in sweets))
+        self.in_stock = bytearray(sweet.quantity > 0 for sweet in sweets)
+        self.min_price = min(self.prices) if sweets else 0.0
+        self.max_price = max(self.prices) if sweets else 0.0
+
+
+def compute_facets(
+    columns: FacetColumns,
+    name: Optional[str] = None,
+    category: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    buckets: int = 10,
+) -> SweetFacets:
+    """One pass over the columns.
+
+    Filters use the same case-insensitive substring match as the database
+    search. Category counts skip the category filter and the histogram skips
+    the price filters, so the UI can show what each alternative would yield.
+    """
+    needle = name.lower() if name else None
+    wanted = category.lower() if category else None
+    category_ok = [not wanted or wanted in value.lower() for value in columns.category_names]
+    low = columns.min_price
+    width = (columns.max_price - low) / buckets
+
+    category_counts = [0] * len(columns.category_names)
+    category_in_stock = [0] * len(columns.category_names)
+    bucket_counts = [0] * buckets
+    total = in_stock = 0
+
+    for index, price in enumerate(columns.prices):
+        if needle and needle not in columns.names[index]:
+            continue
+        code = columns.categories[index]
+        stocked = columns.in_stock[index]
+        price_ok = (min_price is None or price >= min_price) and (max_price is None or price <= max_price)
+        if price_ok:
+            category_counts[code] += 1
+            category_in_stock[code] += stocked
+        if category_ok[code]:
+            bucket = min(int((price - low) / width), buckets - 1) if width else 0
+            bucket_counts[bucket] += 1
+            if price_ok:
+                total += 1
+                in_stock += stocked
+
+    return SweetFacets(
+        total=total,
+        in_stock=in_stock,
+        categories=[
+            CategoryFacet(category=value, count=count, in_stock=category_in_stock[code])
+            for code, (value, count) in enumerate(zip(columns.category_names, category_counts))
+            if count
+        ],
+        price_buckets=[
+            PriceBucket(
+                min=round(low + width * bucket, 2),
+                max=round(columns.max_price if bucket == buckets - 1 else low + width * (bucket + 1), 2),
+                count=count,
+            )
+            for bucket, count in enumerate(bucket_counts)
+        ] if columns.prices else [],
+    )
+
+
+def facets_json(
+    snapshot: CatalogSnapshot,
+    name: Optional[str] = None,
+    category: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    buckets: int = 10,
+) -> bytes:
+    """Serialized facets for the snapshot, cached per catalog generation and filters"""
+    key = (
+        snapshot.generation,
+        name.lower() if name else None,
+        category.lower() if category else None,
+        min_price,
+        max_price,
+        buckets,
+    )
+    body = facet_cache.get(key)
+    if body is None:
+        columns = snapshot.derived("facet_columns", FacetColumns)
+        body = compute_facets(columns, name, category, min_price, max_price, buckets).model_dump_json().encode()
+        facet_cache.set(key, body)
+    return body
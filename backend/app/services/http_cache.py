@@ -0,0 +1,40 @@
+import hashlib
+from typing import Iterable, Optional
+from fastapi import Request, Response, status
+from pydantic import BaseModel
+from ..core.config import settings
+
+
+def etag_for(body: bytes) -> str:
+    """Strong ETag derived from the response bytes, so every worker agrees on it"""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Weak comparison against If-None-Match, as RFC 9110 requires for GET"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    candidates = (candidate.strip() for candidate in header.split(","))
+    return etag in (candidate[2:] if candidate.startswith("W/") else candidate for candidate in candidates)
+
+
+def dump_list(models: Iterable[BaseModel]) -> bytes:
+    return b"[" + b",".join(model.model_dump_json().encode() for model in models) + b"]"
+
+
+def json_response(request: Request, body: bytes, cache_control: Optional[str] = None) -> Response:
+    """Serve pre-serialized JSON with an ETag, or 304 when the client already has it"""
+    headers = {"ETag": etag_for(body)}
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    if etag_matches(request, headers["ETag"]):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+def public_json_response(request: Request, body: bytes) -> Response:
+    """Anonymous catalog reads that browsers and reverse proxies may cache"""
+    return json_response(request, body, settings.catalog_cache_control)
@@ -0,0 +1,125 @@
+import hashlib
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+from fastapi import HTTPException, Response, status
+from pydantic import BaseModel
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..models.models import IdempotencyKey
+
+REPLAY_HEADER = "Idempotent-Replayed"
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands timezone-aware columns back as naive datetimes
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def request_hash(payload: BaseModel) -> str:
+    return hashlib.sha256(payload.model_dump_json().encode()).hexdigest()
+
+
+def _replay(db: Session, user_id: int, key: str, fingerprint: str) -> Optional[Response]:
+    """The stored response for a live key, in one indexed lookup; an expired key is dropped"""
+    record = db.execute(
+        select(IdempotencyKey).where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+    ).scalars().first()
+    if record is None:
+        return None
+    if _as_utc(record.expires_at) <= _utcnow():
+        db.delete(record)
+        db.flush()
+        return None
+    if record.request_hash != fingerprint:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Idempotency-Key was already used with a different request"
+        )
+    return Response(
+        content=record.response_body,
+        status_code=record.status_code,
+        media_type="application/json",
+        headers={REPLAY_HEADER: "true"},
+    )
+
+
+def begin(db: Session, user_id: int, key: str, payload: BaseModel) -> Tuple[Optional[IdempotencyKey], Optional[Response]]:
+    """Claim ``key`` for this request, or return the response it already produced.
+
+    Returns ``(record, None)`` for a first attempt; the caller fills the
+    record in with ``complete`` and commits it together with its own work.
+    Returns ``(None, response)`` for a retry. A concurrent duplicate blocks
+    on the unique index until the first attempt commits, then replays it.
+    """
+    fingerprint = request_hash(payload)
+    replay = _replay(db, user_id, key, fingerprint)
+    if replay is not None:
+        return None, replay
+
+    record = IdempotencyKey(
+        user_id=user_id,
+        key=key,
+        request_hash=fingerprint,
+        expires_at=_utcnow() + timedelta(seconds=settings.idempotency_key_ttl_seconds),
+    )
+    db.add(record)
+    try:
+        db.flush()
+    except IntegrityError:
+        db.rollback()
+        replay = _replay(db, user_id, key, fingerprint)
+        if replay is None:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="A request with this Idempotency-Key is already in progress"
+            )
+        return None, replay
+    return record, None
+
+
+def complete(record: IdempotencyKey, status_code: int, body: bytes):
+    """Store the response to replay; it commits with the caller's transaction"""
+    record.status_code = status_code
+    record.response_body = body.decode()
+
+
+def purge_expired_keys(db: Session, batch_size: int = None) -> int:
+    """Delete expired keys in batches, committing after each one"""
+    batch_size = batch_size or settings.idempotency_purge_batch_size
+    purged = 0
+    while True:
+        now = _utcnow()
+        ids = db.execute(
+            select(IdempotencyKey.id)
+            .where(IdempotencyKey.expires_at <= now)
+            .order_by(IdempotencyKey.expires_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        if not ids:
+            break
+
+        result = db.execute(
+            delete(IdempotencyKey)
+            .where(IdempotencyKey.id.in_(ids), IdempotencyKey.expires_at <= now)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+        purged += result.rowcount
+        if len(ids) < batch_size:
+            break
+    return purged
+
+
+def run_idempotency_purge():
+    """Background job for purge_expired_keys"""
+    with SessionLocal() as db:
+        purge_expired_keys(db)
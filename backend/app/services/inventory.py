@@ -0,0 +1,104 @@
+from typing import Any, Dict
+from fastapi import HTTPException, status
+from sqlalchemy import case, select, update
+from sqlalchemy.orm import Session
+from ..models.models import StockShard, Sweet
+from .stock_shards import add_to_shards, sweet_row, take_from_shards
+
+
+def _not_found() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sweet not found")
+
+
+def _check_quantity(quantity: int):
+    if quantity <= 0:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Quantity must be positive")
+
+
+def _apply(db: Session, statement) -> Dict[str, Any]:
+    row = db.execute(
+        statement.returning(*Sweet.__table__.c).execution_options(synchronize_session=False)
+    ).mappings().first()
+    return dict(row) if row is not None else None
+
+
+def _stock_shards(db: Session, sweet_id: int) -> int:
+    shards = db.execute(select(Sweet.stock_shards).where(Sweet.id == sweet_id)).scalar()
+    if shards is None:
+        raise _not_found()
+    return shards
+
+
+def decrement_stock(db: Session, sweet_id: int, quantity: int) -> Dict[str, Any]:
+    """Atomically take stock in one conditional UPDATE ... RETURNING; the caller commits.
+
+    The ``quantity >= n`` guard is evaluated by the database under the row
+    lock, so concurrent purchases can never drive stock negative. Sharded
+    sweets never match it and take from a shard row instead.
+    """
+    _check_quantity(quantity)
+    row = _apply(db, (
+        update(Sweet)
+        .where(Sweet.id == sweet_id, Sweet.stock_shards == 1, Sweet.quantity >= quantity)
+        .values(quantity=Sweet.quantity - quantity)
+    ))
+    if row is None:
+        if _stock_shards(db, sweet_id) > 1 and take_from_shards(db, sweet_id, quantity):
+            return sweet_row(db, sweet_id)
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Insufficient quantity in stock")
+    return row
+
+
+def increment_stock(db: Session, sweet_id: int, quantity: int) -> Dict[str, Any]:
+    """Atomically add stock; the caller commits"""
+    _check_quantity(quantity)
+    row = _apply(db, (
+        update(Sweet)
+        .where(Sweet.id == sweet_id, Sweet.stock_shards == 1)
+        .values(quantity=Sweet.quantity + quantity)
+    ))
+    if row is None:
+        add_to_shards(db, sweet_id, _stock_shards(db, sweet_id), quantity)
+        return sweet_row(db, sweet_id)
+    return row
+
+
+def take_stock(db: Session, amounts: Dict[int, int]):
+    """Take stock from many unsharded sweets in one UPDATE (``sweet_id -> units``); the caller commits.
+
+    Callers check availability first under row locks; the guard still
+    refuses the whole batch rather than let any row go negative.
+    """
+    if not amounts:
+        return
+    taken = case(amounts, value=Sweet.id, else_=0)
+    result = db.execute(
+        update(Sweet)
+        .where(Sweet.id.in_(amounts), Sweet.stock_shards == 1, Sweet.quantity >= taken)
+        .values(quantity=Sweet.quantity - taken)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != len(amounts):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Insufficient quantity in stock")
+
+
+def restore_stock(db: Session, amounts: Dict[int, int]):
+    """Add stock back to many sweets (``sweet_id -> units``); the caller commits.
+
+    One UPDATE for plain sweets and one for sharded ones, whose returns land
+    on shard 0 until the rebalancer spreads them.
+    """
+    if not amounts:
+        return
+    db.execute(
+        update(Sweet)
+        .where(Sweet.id.in_(amounts), Sweet.stock_shards == 1)
+        .values(quantity=Sweet.quantity + case(amounts, value=Sweet.id, else_=0))
+        .execution_options(synchronize_session=False)
+    )
+    db.execute(
+        update(StockShard)
+        .where(StockShard.sweet_id.in_(amounts), StockShard.shard == 0)
+        .values(quantity=StockShard.quantity + case(amounts, value=StockShard.sweet_id, else_=0))
+        .execution_options(synchronize_session=False)
+    )
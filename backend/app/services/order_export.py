@@ -0,0 +1,106 @@
+import csv
+import io
+from itertools import groupby
+from typing import Any, Dict, Iterator, List
+from sqlalchemy import select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..models.models import Order, OrderItem
+from ..schemas.orders import OrderResponse
+from .serialization import list_adapter
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# One CSV row per order item; order columns repeat on each of its rows
+CSV_COLUMNS = [
+    "order_id", "created_at", "status", "user_id", "customer_name", "email", "phone_number",
+    "delivery_address", "total_amount", "item_id", "sweet_id", "sweet_name", "selected_quantity",
+    "quantity", "price",
+]
+
+_ITEM_COLUMNS = [column.label(f"item_{column.name}") for column in OrderItem.__table__.c]
+
+
+def _joined_rows(db: Session, criteria: list, batch_size: int) -> Iterator[Dict[str, Any]]:
+    """Orders outer-joined to their items in id order, through a server-side cursor"""
+    statement = (
+        select(*Order.__table__.c, *_ITEM_COLUMNS)
+        .select_from(Order)
+        .outerjoin(OrderItem, OrderItem.order_id == Order.id)
+        .where(*criteria)
+        .order_by(Order.id, OrderItem.id)
+        .execution_options(yield_per=batch_size)
+    )
+    return db.execute(statement).mappings()
+
+
+def _orders(rows: Iterator[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Fold consecutive joined rows back into one order with its item list"""
+    for _, group in groupby(rows, key=lambda row: row["id"]):
+        first = next(group)
+        order = {column.name: first[column.name] for column in Order.__table__.c}
+        order["order_items"] = [
+            {column.name: row[f"item_{column.name}"] for column in OrderItem.__table__.c}
+            for row in (first, *group)
+            if row["item_id"] is not None
+        ]
+        yield order
+
+
+def _batches(orders: Iterator[Dict[str, Any]], batch_size: int) -> Iterator[List[Dict[str, Any]]]:
+    batch = []
+    for order in orders:
+        batch.append(order)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _ndjson(batch: List[Dict[str, Any]]) -> bytes:
+    # Same field set and encoding as OrderResponse in the JSON endpoints
+    return b"".join(order.model_dump_json().encode() + b"\n" for order in list_adapter(OrderResponse).validate_python(batch))
+
+
+def _csv(batch: List[Dict[str, Any]], header: bool) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(CSV_COLUMNS)
+    for order in batch:
+        created_at = order["created_at"].isoformat() if order["created_at"] else ""
+        head = [
+            order["id"], created_at, order["status"], order["user_id"], order["customer_name"], order["email"],
+            order["phone_number"], order["delivery_address"], order["total_amount"],
+        ]
+        for item in order["order_items"] or [None]:
+            if item is None:
+                writer.writerow(head + [""] * 6)
+            else:
+                writer.writerow(head + [
+                    item["id"], item["sweet_id"], item["sweet_name"], item["selected_quantity"],
+                    item["quantity"], item["price"],
+                ])
+    return buffer.getvalue().encode()
+
+
+def export_orders(bind: Engine, criteria: list, fmt: str, batch_size: int = None) -> Iterator[bytes]:
+    """Yield the export in chunks of ``batch_size`` orders.
+
+    Memory is bounded by one batch however many orders match. The generator
+    owns its session, so the cursor stays open for as long as the response
+    is streaming and is closed when the client finishes or disconnects.
+    """
+    batch_size = batch_size or settings.order_export_batch_size
+    with Session(bind) as db:
+        header = True
+        for batch in _batches(_orders(_joined_rows(db, criteria, batch_size)), batch_size):
+            yield _ndjson(batch) if fmt == "ndjson" else _csv(batch, header)
+            header = False
+        if header and fmt == "csv":
+            yield _csv([], header)
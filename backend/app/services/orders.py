@@ -0,0 +1,137 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+from fastapi import HTTPException, status
+from sqlalchemy import func, insert, select
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..models.models import Order, OrderItem, Sweet
+from ..schemas.orders import OrderItemCreate
+from .cache import TTLCache
+from .inventory import take_stock
+from .reservations import convert_hold
+from .stock_shards import shard_layout, take_from_shards
+
+# Admin listing totals keyed by filters; new orders show up once an entry expires
+order_count_cache = TTLCache(settings.order_count_cache_max_entries, settings.order_count_cache_ttl_seconds)
+
+
+def _lock_sweets(db: Session, sweet_ids) -> Dict[int, Sweet]:
+    """Fetch every referenced sweet, locking the unsharded rows in one statement.
+
+    Rows are locked in id order so concurrent orders cannot deadlock. Sharded
+    sweets are read without a lock: their stock lives in shard rows, and
+    locking the hot sweets row would serialize every order for that SKU.
+    """
+    columns = (Sweet.id, Sweet.name, Sweet.quantity, Sweet.stock_shards)
+    rows = db.execute(
+        select(*columns)
+        .where(Sweet.id.in_(sweet_ids), Sweet.stock_shards == 1)
+        .order_by(Sweet.id)
+        .with_for_update()
+    ).all()
+    sweets = {row.id: row for row in rows}
+    unlocked = set(sweet_ids) - sweets.keys()
+    if unlocked:
+        sweets.update((row.id, row) for row in db.execute(select(*columns).where(Sweet.id.in_(unlocked))))
+    return sweets
+
+
+def add_order_items(db: Session, order_id: int, user_id: int, items: List[OrderItemCreate]):
+    """Take stock for an order's lines and insert them; the caller commits.
+
+    The statement count does not grow with the number of lines: one locking
+    SELECT, one set-based stock UPDATE and one bulk INSERT. Reserved lines
+    and sharded sweets add their own statements.
+    """
+    wanted = defaultdict(int)
+    for item in items:
+        if item.hold_id is None:
+            wanted[item.sweet_id] += item.quantity
+
+    # Lock every row the order may touch, reserved lines included, before
+    # any stock moves, so all row locks are taken in one id-ordered pass
+    sweet_ids = {item.sweet_id for item in items}
+    sweets = _lock_sweets(db, sweet_ids) if sweet_ids else {}
+    for sweet_id in wanted:
+        if sweet_id not in sweets:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Sweet with id {sweet_id} not found"
+            )
+
+    # Reserved items first: their stock is already set aside, so the
+    # contended sweet rows are not re-checked
+    for item in items:
+        if item.hold_id is not None:
+            convert_hold(db, user_id, item.hold_id, item.sweet_id, item.quantity)
+
+    plain = {}
+    for sweet_id, quantity in wanted.items():
+        sweet = sweets[sweet_id]
+        if sweet.stock_shards > 1:
+            # Hot SKU: its stock lives in shard rows, not on the sweet
+            if take_from_shards(db, sweet_id, quantity):
+                continue
+            available = sum(shard_layout(db, sweet_id))
+        elif sweet.quantity >= quantity:
+            plain[sweet_id] = quantity
+            continue
+        else:
+            available = sweet.quantity
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Insufficient quantity for {sweet.name}. Available: {available}, Requested: {quantity}"
+        )
+    take_stock(db, plain)
+
+    if not items:
+        return
+    db.execute(insert(OrderItem), [
+        {
+            "order_id": order_id,
+            "sweet_id": item.sweet_id,
+            "sweet_name": item.sweet_name,
+            "selected_quantity": item.selected_quantity,
+            "quantity": item.quantity,
+            "price": item.price,
+        }
+        for item in items
+    ])
+
+
+def order_filters(
+    status: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    email: Optional[str] = None,
+    phone_number: Optional[str] = None,
+    min_total: Optional[float] = None,
+    user_id: Optional[int] = None,
+) -> list:
+    """WHERE criteria for the admin order listing; each one is served by an (x, created_at, id) index"""
+    criteria = []
+    if status is not None:
+        criteria.append(Order.status == status)
+    if created_from is not None:
+        criteria.append(Order.created_at >= created_from)
+    if created_to is not None:
+        criteria.append(Order.created_at < created_to)
+    if email is not None:
+        criteria.append(Order.email == email)
+    if phone_number is not None:
+        criteria.append(Order.phone_number == phone_number)
+    if min_total is not None:
+        criteria.append(Order.total_amount >= min_total)
+    if user_id is not None:
+        criteria.append(Order.user_id == user_id)
+    return criteria
+
+
+def cached_order_count(db: Session, key: tuple, criteria: list) -> int:
+    """Total for a filter combination, counted at most once per TTL"""
+    total = order_count_cache.get(key)
+    if total is None:
+        total = db.execute(select(func.count()).select_from(Order).where(*criteria)).scalar()
+        order_count_cache.set(key, total)
+    return total
@@ -0,0 +1,113 @@
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, List, Optional, Sequence, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import String, literal, tuple_, type_coerce
+from sqlalchemy.orm import Query
+
+
+def _invalid_cursor() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+
+
+def encode_cursor(sort: str, key: Sequence[Any], direction: str) -> str:
+    """Opaque, URL-safe cursor pointing just after (``next``) or before (``prev``) a row key"""
+    payload = {
+        "s": sort,
+        "k": [value.isoformat() if isinstance(value, datetime) else value for value in key],
+        "d": direction,
+    }
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(",", ":")).encode()).decode().rstrip("=")
+
+
+def _load(cursor: str) -> dict:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError, TypeError):
+        raise _invalid_cursor()
+    if not isinstance(payload, dict):
+        raise _invalid_cursor()
+    return payload
+
+
+def cursor_sort(cursor: str) -> str:
+    """Sort key a cursor was issued for, so clients only have to echo the cursor"""
+    sort = _load(cursor).get("s")
+    if not isinstance(sort, str):
+        raise _invalid_cursor()
+    return sort
+
+
+def decode_cursor(cursor: str, sort: str, columns: Sequence) -> Tuple[List[Any], str]:
+    """Return ``(key, direction)``; raise 400 for tampered cursors or a different sort"""
+    payload = _load(cursor)
+    try:
+        key, direction = payload["k"], payload["d"]
+        if payload["s"] != sort or direction not in ("next", "prev") or len(key) != len(columns):
+            raise ValueError
+        return [
+            datetime.fromisoformat(value) if column.type.python_type is datetime else column.type.python_type(value)
+            for column, value in zip(columns, key)
+        ], direction
+    except (ValueError, TypeError, KeyError):
+        raise _invalid_cursor()
+
+
+def _comparable(query: Query, columns: Sequence, key: Sequence[Any]):
+    bind = query.session.get_bind()
+    if bind.dialect.name != "sqlite":
+        return tuple_(*columns), tuple_(*(literal(value, column.type) for column, value in zip(columns, key)))
+
+    # SQLite keeps datetimes as text, and CURRENT_TIMESTAMP defaults omit the
+    # microseconds SQLAlchemy would bind; compare the stored text directly
+    left, right = [], []
+    for column, value in zip(columns, key):
+        if isinstance(value, datetime):
+            timespec = "microseconds" if value.microsecond else "seconds"
+            text = value.replace(tzinfo=None).isoformat(sep=" ", timespec=timespec)
+            left.append(type_coerce(column, String))
+            right.append(literal(text, String))
+        else:
+            left.append(column)
+            right.append(literal(value, column.type))
+    return tuple_(*left), tuple_(*right)
+
+
+def keyset_page(query: Query, sort: str, columns: Sequence, cursor: Optional[str], limit: int, descending: bool = False):
+    """Fetch one page ordered by ``columns`` (last column unique), newest first with ``descending``.
+
+    Returns ``(rows, next_cursor, prev_cursor)``. Each page is a single index
+    range scan, so its cost does not grow with how deep the client has paged.
+    """
+    direction = "next"
+    if cursor:
+        key, direction = decode_cursor(cursor, sort, columns)
+    # Scan in index order when paging forward through an ascending sort or back through a descending one
+    ascending = (direction == "next") != descending
+    if cursor:
+        left, right = _comparable(query, columns, key)
+        query = query.filter(left > right if ascending else left < right)
+
+    if ascending:
+        query = query.order_by(*columns)
+    else:
+        query = query.order_by(*(column.desc() for column in columns))
+
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if direction == "prev":
+        rows.reverse()
+
+    def key_of(row):
+        return [getattr(row, column.key) for column in columns]
+
+    next_cursor = prev_cursor = None
+    if rows:
+        if has_more or direction == "prev":
+            next_cursor = encode_cursor(sort, key_of(rows[-1]), "next")
+        if cursor and (has_more or direction == "next"):
+            prev_cursor = encode_cursor(sort, key_of(rows[0]), "prev")
+    return rows, next_cursor, prev_cursor
@@ -0,0 +1,165 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi import HTTPException, status
+from ..core.config import settings
+
+
+def _timed_hash(password: str):
+    """Worker entry point: hash a password and report the CPU time spent"""
+    from .auth import pwd_context
+
+    started = time.perf_counter()
+    hashed = pwd_context.hash(password)
+    return hashed, time.perf_counter() - started
+
+
+def _timed_verify_and_update(plain_password: str, hashed_password: str):
+    """Worker entry point: verify a password, returning a replacement hash if
+    the stored one no longer matches the configured policy"""
+    from .auth import pwd_context
+
+    started = time.perf_counter()
+    result = pwd_context.verify_and_update(plain_password, hashed_password)
+    return result, time.perf_counter() - started
+
+
+class PasswordPoolSaturated(HTTPException):
+    def __init__(self):
+        super().__init__(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many concurrent password operations, please retry",
+            headers={"Retry-After": "1"},
+        )
+
+
+class PasswordPool:
+    """Bounded executor that keeps password hashing off the request threadpool.
+
+    With ``workers > 0`` hashing runs in a process pool, so it neither holds an
+    AnyIO worker thread nor the GIL; ``workers = 0`` falls back to a thread pool
+    for environments where forking is not available.
+    """
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self._slot_freed = threading.Condition(self._lock)
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self.queue_wait_seconds = 0.0
+        self.hash_seconds = 0.0
+        self.max_queue_wait_seconds = 0.0
+
+    def _get_executor(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.workers > 0:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers)
+                else:
+                    self._executor = ThreadPoolExecutor(thread_name_prefix="password")
+            return self._executor
+
+    async def _submit(self, fn, *args) -> Any:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self.rejected += 1
+                raise PasswordPoolSaturated()
+            self._pending += 1
+
+        submitted = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result, work_seconds = await loop.run_in_executor(self._get_executor(), fn, *args)
+        except BrokenProcessPool:
+            # A crashed worker poisons the pool; start a fresh one on the next call
+            self.shutdown(wait=False)
+            raise
+        finally:
+            with self._lock:
+                self._pending -= 1
+                self._slot_freed.notify_all()
+
+        queue_wait = max(time.perf_counter() - submitted - work_seconds, 0.0)
+        with self._lock:
+            self.completed += 1
+            self.queue_wait_seconds += queue_wait
+            self.hash_seconds += work_seconds
+            self.max_queue_wait_seconds = max(self.max_queue_wait_seconds, queue_wait)
+        return result
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(_timed_hash, password)
+
+    async def verify_and_update(self, plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        return await self._submit(_timed_verify_and_update, plain_password, hashed_password)
+
+    def hash_many(self, passwords: List[str]) -> List[str]:
+        """Hash a batch from a worker thread, blocking until every hash is done.
+
+        Used by bulk imports: instead of failing part way through an upload,
+        a batch waits until it fits under ``max_pending`` (a batch larger than
+        the limit runs alone).
+        """
+        if not passwords:
+            return []
+        with self._slot_freed:
+            self._slot_freed.wait_for(
+                lambda: self._pending == 0 or self._pending + len(passwords) <= self.max_pending
+            )
+            self._pending += len(passwords)
+
+        chunksize = max(1, len(passwords) // (max(self.workers, 1) * 4))
+        try:
+            results = list(self._get_executor().map(_timed_hash, passwords, chunksize=chunksize))
+        except BrokenProcessPool:
+            self.shutdown(wait=False)
+            raise
+        finally:
+            with self._slot_freed:
+                self._pending -= len(passwords)
+                self._slot_freed.notify_all()
+
+        with self._lock:
+            self.completed += len(results)
+            self.hash_seconds += sum(work_seconds for _, work_seconds in results)
+        return [hashed for hashed, _ in results]
+
+    def shutdown(self, wait: bool = True):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            completed = self.completed
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "completed": completed,
+                "rejected": self.rejected,
+                "avg_queue_wait_ms": round(self.queue_wait_seconds / completed * 1000, 2) if completed else 0.0,
+                "max_queue_wait_ms": round(self.max_queue_wait_seconds * 1000, 2),
+                "avg_hash_ms": round(self.hash_seconds / completed * 1000, 2) if completed else 0.0,
+            }
+
+
+password_pool = PasswordPool(
+    workers=settings.password_pool_workers,
+    max_pending=settings.password_pool_max_pending,
+)
+
+# Separate from password_pool so a bulk import never queues ahead of logins
+import_pool = PasswordPool(
+    workers=settings.user_import_workers or os.cpu_count() or 1,
+    max_pending=settings.user_import_max_pending,
+)
@@ -0,0 +1,82 @@
+from dataclasses import dataclass
+from typing import Optional
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..models.models import User
+from ..schemas.schemas import TokenData
+from .cache import TTLCache
+
+
+@dataclass(frozen=True)
+class Principal:
+    """Detached, read-only snapshot of the authenticated user"""
+    id: int
+    email: str
+    username: str
+    is_admin: bool
+    token_version: int
+
+
+principal_cache = TTLCache(
+    max_entries=settings.principal_cache_max_entries,
+    ttl_seconds=settings.principal_cache_ttl_seconds,
+)
+
+
+def load_principal(db: Session, email: str) -> Optional[Principal]:
+    """Return the principal for a token subject, hitting the users table only on a cache miss"""
+    principal = principal_cache.get(email)
+    if principal is not None:
+        return principal
+
+    user = db.query(User).filter(User.email == email).first()
+    if user is None:
+        return None
+
+    principal = Principal(
+        id=user.id,
+        email=user.email,
+        username=user.username,
+        is_admin=bool(user.is_admin),
+        token_version=user.token_version or 0,
+    )
+    principal_cache.set(email, principal)
+    return principal
+
+
+def is_token_current(db: Session, token_data: TokenData) -> bool:
+    """Cheap revocation check: the token's version must match the user's current one"""
+    principal = load_principal(db, token_data.email)
+    return (
+        principal is not None
+        and principal.id == token_data.user_id
+        and principal.token_version == token_data.token_version
+    )
+
+
+def invalidate_principal(email: str):
+    """Drop a cached principal, e.g. after a bulk UPDATE that bypasses ORM events"""
+    principal_cache.invalidate(email)
+
+
+@event.listens_for(User, "before_update")
+def _revoke_tokens_on_role_change(mapper, connection, target):
+    # Admin rights are read from the token's adm claim, so tokens issued
+    # before a promotion or demotion must stop working
+    state = inspect(target)
+    if state.attrs.is_admin.history.has_changes() and not state.attrs.token_version.history.has_changes():
+        target.token_version = User.token_version + 1
+
+
+@event.listens_for(User, "after_update")
+def _invalidate_updated_user(mapper, connection, target):
+    invalidate_principal(target.email)
+    # An email change leaves the old subject cached under its previous key
+    for old_email in inspect(target).attrs.email.history.deleted or ():
+        invalidate_principal(old_email)
+
+
+@event.listens_for(User, "after_delete")
+def _invalidate_deleted_user(mapper, connection, target):
+    invalidate_principal(target.email)
@@ -0,0 +1,153 @@
+import hashlib
+import secrets
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..models.models import RefreshToken, User
+
+
+def _hash_token(token: str) -> str:
+    # Refresh tokens are 256 random bits, so a fast digest is enough; no bcrypt needed
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands timezone-aware columns back as naive datetimes
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _invalid_refresh_token(detail: str = "Invalid refresh token") -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail=detail,
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
+def issue_refresh_token(db: Session, user_id: int, family_id: Optional[str] = None) -> str:
+    """Store a new refresh token for the user and return its raw value.
+
+    Every rotation stays in the login's family, so replaying any superseded
+    token can revoke the whole chain. The caller commits.
+    """
+    token = secrets.token_urlsafe(32)
+    db.add(RefreshToken(
+        user_id=user_id,
+        token_hash=_hash_token(token),
+        family_id=family_id or secrets.token_hex(16),
+        expires_at=_utcnow() + timedelta(days=settings.refresh_token_expire_days),
+    ))
+    return token
+
+
+def revoke_refresh_family(db: Session, family_id: str):
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=_utcnow())
+    )
+
+
+def revoke_user_refresh_tokens(db: Session, user_id: int):
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=_utcnow())
+    )
+
+
+def rotate_refresh_token(db: Session, token: str) -> Tuple[User, str]:
+    """Exchange a refresh token for a new one (sliding expiry), detecting reuse"""
+    stored = db.query(RefreshToken).filter(RefreshToken.token_hash == _hash_token(token)).first()
+    if stored is None:
+        raise _invalid_refresh_token()
+
+    if stored.revoked_at is not None:
+        # A rotated token came back: assume it was stolen and end the whole session
+        revoke_refresh_family(db, stored.family_id)
+        db.commit()
+        raise _invalid_refresh_token("Refresh token reuse detected")
+
+    if _as_utc(stored.expires_at) <= _utcnow():
+        raise _invalid_refresh_token("Refresh token expired")
+
+    # Conditional revoke so two concurrent refreshes cannot both succeed
+    result = db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.id == stored.id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=_utcnow())
+    )
+    if result.rowcount != 1:
+        db.rollback()
+        revoke_refresh_family(db, stored.family_id)
+        db.commit()
+        raise _invalid_refresh_token("Refresh token reuse detected")
+
+    user = db.query(User).filter(User.id == stored.user_id).first()
+    if user is None:
+        db.rollback()
+        raise _invalid_refresh_token()
+
+    new_token = issue_refresh_token(db, user.id, stored.family_id)
+    db.commit()
+    db.refresh(user)
+    return user, new_token
+
+
+def revoke_refresh_token(db: Session, token: str):
+    """Log out: revoke the token's whole family"""
+    stored = db.query(RefreshToken).filter(RefreshToken.token_hash == _hash_token(token)).first()
+    if stored is not None:
+        revoke_refresh_family(db, stored.family_id)
+        db.commit()
+
+
+def purge_refresh_tokens(db: Session, batch_size: int = None) -> int:
+    """Delete expired tokens, and revoked ones past their retention, in batches committing after each one.
+
+    A revoked token is kept for ``refresh_token_revoked_retention_seconds`` so
+    that replaying it still revokes its family; after that it is only rejected.
+    """
+    batch_size = batch_size or settings.refresh_token_purge_batch_size
+    purged = 0
+    while True:
+        now = _utcnow()
+        purgeable = or_(
+            RefreshToken.expires_at <= now,
+            RefreshToken.revoked_at <= now - timedelta(seconds=settings.refresh_token_revoked_retention_seconds),
+        )
+        ids = db.execute(
+            select(RefreshToken.id)
+            .where(purgeable)
+            .order_by(RefreshToken.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        if not ids:
+            break
+
+        result = db.execute(
+            delete(RefreshToken)
+            .where(RefreshToken.id.in_(ids), purgeable)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+
+        purged += result.rowcount
+        if len(ids) < batch_size:
+            break
+    return purged
+
+
+def run_refresh_token_purge():
+    """Background job for purge_refresh_tokens"""
+    with SessionLocal() as db:
+        purge_refresh_tokens(db)
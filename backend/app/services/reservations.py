@@ -0,0 +1,163 @@
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+from fastapi import HTTPException, status
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..models.models import StockHold
+from .catalog import catalog
+from .inventory import decrement_stock, restore_stock
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands timezone-aware columns back as naive datetimes
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+def _hold_not_found() -> HTTPException:
+    return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Reservation not found or expired")
+
+
+def reserve_stock(db: Session, user_id: int, sweet_id: int, quantity: int) -> StockHold:
+    """Take stock now and hold it for the user until it expires; the caller commits"""
+    decrement_stock(db, sweet_id, quantity)
+    now = _utcnow()
+    hold = StockHold(
+        user_id=user_id,
+        sweet_id=sweet_id,
+        quantity=quantity,
+        expires_at=now + timedelta(seconds=settings.reservation_ttl_seconds),
+        created_at=now,
+    )
+    db.add(hold)
+    db.flush()
+    return hold
+
+
+def active_holds(db: Session, user_id: int) -> List[StockHold]:
+    return (
+        db.query(StockHold)
+        .filter(StockHold.user_id == user_id, StockHold.expires_at > _utcnow())
+        .order_by(StockHold.id)
+        .all()
+    )
+
+
+def extend_hold(db: Session, user_id: int, hold_id: int) -> StockHold:
+    """Push the expiry out by another TTL, capped at the hold's maximum lifetime"""
+    now = _utcnow()
+    hold = (
+        db.query(StockHold)
+        .filter(StockHold.id == hold_id, StockHold.user_id == user_id, StockHold.expires_at > now)
+        .first()
+    )
+    if hold is None:
+        raise _hold_not_found()
+
+    expires_at = min(
+        now + timedelta(seconds=settings.reservation_ttl_seconds),
+        _as_utc(hold.created_at) + timedelta(seconds=settings.reservation_max_seconds),
+    )
+    # Conditional so a hold the sweeper is expiring right now is not revived
+    result = db.execute(
+        update(StockHold)
+        .where(StockHold.id == hold_id, StockHold.expires_at > now)
+        .values(expires_at=expires_at)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount != 1:
+        raise _hold_not_found()
+    hold.expires_at = expires_at
+    return hold
+
+
+def release_hold(db: Session, user_id: int, hold_id: int):
+    """Delete the hold and give its stock back; the caller commits"""
+    row = db.execute(
+        delete(StockHold)
+        .where(StockHold.id == hold_id, StockHold.user_id == user_id)
+        .returning(StockHold.sweet_id, StockHold.quantity)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if row is None:
+        raise _hold_not_found()
+    restore_stock(db, {row.sweet_id: row.quantity})
+
+
+def claim_hold(db: Session, user_id: int, hold_id: int, sweet_id: int) -> Optional[int]:
+    """Consume a live hold for checkout; return its quantity, or None if it is gone.
+
+    The DELETE is the only claim on the hold, so a racing sweeper or second
+    checkout cannot also use (or restore) the same stock.
+    """
+    row = db.execute(
+        delete(StockHold)
+        .where(
+            StockHold.id == hold_id,
+            StockHold.user_id == user_id,
+            StockHold.sweet_id == sweet_id,
+            StockHold.expires_at > _utcnow(),
+        )
+        .returning(StockHold.quantity)
+        .execution_options(synchronize_session=False)
+    ).first()
+    return row.quantity if row is not None else None
+
+
+def convert_hold(db: Session, user_id: int, hold_id: int, sweet_id: int, quantity: int):
+    """Turn a hold into ordered stock, taking or returning any difference; the caller commits"""
+    held = claim_hold(db, user_id, hold_id, sweet_id)
+    if held is None:
+        # Expired or already used: fall back to a regular stock check
+        decrement_stock(db, sweet_id, quantity)
+    elif quantity > held:
+        decrement_stock(db, sweet_id, quantity - held)
+    elif quantity < held:
+        restore_stock(db, {sweet_id: held - quantity})
+
+
+def sweep_expired_holds(db: Session, batch_size: int = None) -> int:
+    """Return expired holds' stock in batches; each batch is one DELETE and one UPDATE"""
+    batch_size = batch_size or settings.reservation_sweep_batch_size
+    swept = 0
+    while True:
+        now = _utcnow()
+        ids = db.execute(
+            select(StockHold.id)
+            .where(StockHold.expires_at <= now)
+            .order_by(StockHold.expires_at)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        ).scalars().all()
+        if not ids:
+            break
+
+        rows = db.execute(
+            delete(StockHold)
+            .where(StockHold.id.in_(ids), StockHold.expires_at <= now)
+            .returning(StockHold.sweet_id, StockHold.quantity)
+            .execution_options(synchronize_session=False)
+        ).all()
+        amounts = defaultdict(int)
+        for sweet_id, quantity in rows:
+            amounts[sweet_id] += quantity
+        restore_stock(db, amounts)
+        db.commit()
+
+        swept += len(rows)
+        if len(ids) < batch_size:
+            break
+    return swept
+
+
+def run_hold_sweeper():
+    """Background job: expire holds and refresh the catalog if any stock came back"""
+    with SessionLocal() as db:
+        if sweep_expired_holds(db):
+            catalog.bump()
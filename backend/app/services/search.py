@@ -0,0 +1,80 @@
+from typing import Any, List, Optional
+from sqlalchemy import case, func, or_
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..models.models import Sweet
+from .catalog import catalog
+from .search_index import search_index
+from .stock_shards import sweet_columns
+
+
+def _like_pattern(term: str) -> str:
+    """Substring pattern with the user's own wildcards escaped"""
+    escaped = term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def database_search(
+    db: Session,
+    name: Optional[str] = None,
+    category: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    limit: int = 50,
+) -> List[Any]:
+    """Substring search on name/category, best matches first.
+
+    On Postgres the ILIKE filters and the ``%`` similarity operator are served
+    by the pg_trgm GIN indexes and results are ranked by ``similarity()``.
+    Other databases scan and rank exact, then prefix, then shorter names first.
+    Rows carry the available quantity, summed over shards for hot SKUs.
+    """
+    query = db.query(*sweet_columns())
+    postgres = db.get_bind().dialect.name == "postgresql"
+
+    if name:
+        name_match = Sweet.name.ilike(_like_pattern(name), escape="\\")
+        if postgres:
+            # Also accept close misspellings above pg_trgm.similarity_threshold
+            name_match = or_(name_match, Sweet.name.op("%")(name))
+        query = query.filter(name_match)
+
+    if category:
+        query = query.filter(Sweet.category.ilike(_like_pattern(category), escape="\\"))
+
+    if min_price is not None:
+        query = query.filter(Sweet.price >= min_price)
+
+    if max_price is not None:
+        query = query.filter(Sweet.price <= max_price)
+
+    if name and postgres:
+        query = query.order_by(func.similarity(Sweet.name, name).desc(), Sweet.id)
+    elif name:
+        lowered = func.lower(Sweet.name)
+        term = name.lower()
+        query = query.order_by(
+            case((lowered == term, 0), (func.substr(lowered, 1, len(term)) == term, 1), else_=2),
+            func.length(Sweet.name),
+            Sweet.id,
+        )
+    else:
+        query = query.order_by(Sweet.id)
+
+    return query.limit(limit).all()
+
+
+def search_sweets(
+    db: Session,
+    name: Optional[str] = None,
+    category: Optional[str] = None,
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    limit: int = 50,
+) -> List:
+    """Dispatch to the configured backend (``search_backend``: database | memory)"""
+    if settings.search_backend == "memory":
+        snapshot = catalog.snapshot(db)
+        search_index.sync(snapshot.generation, snapshot.sweets)
+        return search_index.search(name, category, min_price, max_price, limit)
+    return database_search(db, name, category, min_price, max_price, limit)
@@ -0,0 +1,263 @@
+import bisect
+import heapq
+import math
+import re
+import threading
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from ..schemas.schemas import SweetResponse
+
+# Field boosts: a hit in the name outweighs one in the description
+FIELD_WEIGHTS = (("name", 3.0), ("category", 2.0), ("description", 1.0))
+BM25_K1 = 1.2
+BM25_B = 0.75
+PREFIX_WEIGHT = 0.9
+FUZZY_WEIGHT = 0.7
+MAX_EXPANSIONS = 50
+
+_TOKEN = re.compile(r"[^\W_]+")
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    return _TOKEN.findall(text.lower()) if text else []
+
+
+def trigrams(token: str) -> Set[str]:
+    padded = f"${token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def within_edits(a: str, b: str, limit: int) -> bool:
+    """True if the optimal-string-alignment distance between a and b is <= limit"""
+    if abs(len(a) - len(b)) > limit:
+        return False
+    previous2, previous = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return False
+        previous2, previous = previous, current
+    return previous[-1] <= limit
+
+
+class SearchIndex:
+    """Inverted token index plus a trigram index over the vocabulary.
+
+    Documents are catalog items; ``sync`` applies only the items that changed
+    since the last catalog snapshot. Queries are ranked with BM25 over
+    field-weighted term frequencies; the last query token also matches as a
+    prefix (search-as-you-type) and unknown tokens fall back to vocabulary
+    words within one or two edits ("jamon" -> "jamun").
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self._postings: Dict[str, Dict[int, float]] = defaultdict(dict)
+        self._grams: Dict[str, Set[str]] = defaultdict(set)
+        self._vocabulary: List[str] = []
+        self._docs: Dict[int, SweetResponse] = {}
+        self._doc_terms: Dict[int, Dict[str, float]] = {}
+        self._doc_lengths: Dict[int, float] = {}
+        self._total_length = 0.0
+        self._norms: Dict[int, float] = {}
+        self._by_category: Dict[str, Set[int]] = defaultdict(set)
+        self._fuzzy_cache: Dict[str, List[str]] = {}
+        self.generation: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    # --- maintenance -----------------------------------------------------
+
+    def sync(self, generation: int, sweets: Iterable[SweetResponse]):
+        """Bring the index in line with a catalog snapshot, touching only changed items"""
+        if generation == self.generation:
+            return
+        with self._lock:
+            if generation == self.generation:
+                return
+            current = {sweet.id: sweet for sweet in sweets}
+            for doc_id in [doc_id for doc_id in self._docs if doc_id not in current]:
+                self._remove(doc_id)
+            for doc_id, sweet in current.items():
+                if self._docs.get(doc_id) != sweet:
+                    self._remove(doc_id)
+                    self._add(sweet)
+            self._refresh_norms()
+            self._fuzzy_cache.clear()
+            self.generation = generation
+
+    def clear(self):
+        with self._lock:
+            self._reset()
+
+    def _add(self, sweet: SweetResponse):
+        terms: Dict[str, float] = defaultdict(float)
+        for field, weight in FIELD_WEIGHTS:
+            for token in tokenize(getattr(sweet, field)):
+                terms[token] += weight
+        for token, frequency in terms.items():
+            if token not in self._postings:
+                bisect.insort(self._vocabulary, token)
+                for gram in trigrams(token):
+                    self._grams[gram].add(token)
+            self._postings[token][sweet.id] = frequency
+        length = sum(terms.values())
+        self._docs[sweet.id] = sweet
+        self._doc_terms[sweet.id] = terms
+        self._doc_lengths[sweet.id] = length
+        self._total_length += length
+        self._by_category[sweet.category.lower()].add(sweet.id)
+
+    def _remove(self, doc_id: int):
+        if doc_id not in self._docs:
+            return
+        for token in self._doc_terms.pop(doc_id):
+            postings = self._postings[token]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[token]
+                del self._vocabulary[bisect.bisect_left(self._vocabulary, token)]
+                for gram in trigrams(token):
+                    self._grams[gram].discard(token)
+        self._total_length -= self._doc_lengths.pop(doc_id)
+        category = self._docs.pop(doc_id).category.lower()
+        self._by_category[category].discard(doc_id)
+        if not self._by_category[category]:
+            del self._by_category[category]
+
+    # --- querying --------------------------------------------------------
+
+    def _prefixed(self, prefix: str) -> List[str]:
+        start = bisect.bisect_left(self._vocabulary, prefix)
+        matches = []
+        for token in self._vocabulary[start:start + MAX_EXPANSIONS]:
+            if not token.startswith(prefix):
+                break
+            matches.append(token)
+        return matches
+
+    def _fuzzy(self, term: str) -> List[str]:
+        if term in self._fuzzy_cache:
+            return self._fuzzy_cache[term]
+        matches: List[str] = []
+        if len(term) >= 4:
+            limit = 1 if len(term) <= 5 else 2
+            shared: Dict[str, int] = defaultdict(int)
+            for gram in trigrams(term):
+                for token in self._grams.get(gram, ()):
+                    shared[token] += 1
+            # Each edit destroys at most three of the term's trigrams
+            needed = max(1, len(term) - 3 * limit)
+            candidates = sorted((token for token, count in shared.items() if count >= needed),
+                                key=lambda token: -shared[token])
+            matches = [token for token in candidates if within_edits(term, token, limit)][:MAX_EXPANSIONS]
+        self._fuzzy_cache[term] = matches
+        return matches
+
+    def _expand(self, term: str, last: bool) -> List[Tuple[str, float]]:
+        expansions = {term: 1.0} if term in self._postings else {}
+        if last and len(term) >= 2:
+            for token in self._prefixed(term):
+                expansions.setdefault(token, PREFIX_WEIGHT)
+        if not expansions:
+            for token in self._fuzzy(term):
+                expansions.setdefault(token, FUZZY_WEIGHT)
+        return list(expansions.items())
+
+    def _idf(self, token: str) -> float:
+        df = len(self._postings[token])
+        return math.log(1 + (len(self._docs) - df + 0.5) / (df + 0.5))
+
+    def _refresh_norms(self):
+        # BM25 length normalisation only moves when documents change, so it is
+        # precomputed per document instead of inside the scoring loops
+        average = self._total_length / len(self._docs) if self._docs else 1.0
+        self._norms = {
+            doc_id: BM25_K1 * (1 - BM25_B + BM25_B * length / average)
+            for doc_id, length in self._doc_lengths.items()
+        }
+
+    def search(
+        self,
+        name: Optional[str] = None,
+        category: Optional[str] = None,
+        min_price: Optional[float] = None,
+        max_price: Optional[float] = None,
+        limit: int = 50,
+    ) -> List[SweetResponse]:
+        with self._lock:
+            allowed = None
+            if category:
+                needle = category.lower()
+                allowed = set()
+                for value, doc_ids in self._by_category.items():
+                    if needle in value:
+                        allowed |= doc_ids
+
+            def keep(doc_id: int) -> bool:
+                if allowed is not None and doc_id not in allowed:
+                    return False
+                price = self._docs[doc_id].price
+                return (min_price is None or price >= min_price) and (max_price is None or price <= max_price)
+
+            terms = tokenize(name)
+            if not terms:
+                if name:
+                    return []
+                doc_ids = allowed if allowed is not None else self._docs
+                return [self._docs[doc_id] for doc_id in heapq.nsmallest(limit, filter(keep, doc_ids))]
+
+            ranked = heapq.nlargest(
+                limit,
+                ((score, -doc_id) for doc_id, score in self._score(terms).items() if keep(doc_id)),
+            )
+            return [self._docs[-negated] for _, negated in ranked]
+
+    def _score(self, terms: List[str]) -> Dict[int, float]:
+        """Every query term must match (exactly, by prefix or fuzzily); scores add up"""
+        expanded = [self._expand(term, index == len(terms) - 1) for index, term in enumerate(terms)]
+        if not all(expanded):
+            return {}
+        # Start from the rarest term so later terms only probe surviving candidates
+        expanded.sort(key=lambda expansions: sum(len(self._postings[token]) for token, _ in expansions))
+        norms = self._norms
+
+        scores: Dict[int, float] = {}
+        for token, weight in expanded[0]:
+            factor = weight * self._idf(token) * (BM25_K1 + 1)
+            for doc_id, frequency in self._postings[token].items():
+                score = factor * frequency / (frequency + norms[doc_id])
+                if score > scores.get(doc_id, 0.0):
+                    scores[doc_id] = score
+
+        for expansions in expanded[1:]:
+            probes = [
+                (self._postings[token], weight * self._idf(token) * (BM25_K1 + 1))
+                for token, weight in expansions
+            ]
+            survivors = {}
+            for doc_id, total in scores.items():
+                best = 0.0
+                for postings, factor in probes:
+                    frequency = postings.get(doc_id)
+                    if frequency:
+                        best = max(best, factor * frequency / (frequency + norms[doc_id]))
+                if best:
+                    survivors[doc_id] = total + best
+            scores = survivors
+        return scores
+
+    def stats(self):
+        return {"documents": len(self._docs), "terms": len(self._vocabulary), "generation": self.generation}
+
+
+search_index = SearchIndex()
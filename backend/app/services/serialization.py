@@ -0,0 +1,63 @@
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Iterable, List, Mapping, Sequence, Type
+from fastapi import Response
+from pydantic import BaseModel, TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from ..models.models import Order, OrderItem
+from ..schemas.orders import OrderResponse
+
+
+@lru_cache(maxsize=None)
+def list_adapter(model: Type[BaseModel]) -> TypeAdapter:
+    """One compiled validator/serializer per response model, built on first use"""
+    return TypeAdapter(List[model])
+
+
+def validate_rows(model: Type[BaseModel], rows: Iterable[Mapping[str, Any]]) -> List[BaseModel]:
+    """Build response models from plain row mappings, skipping ORM objects entirely"""
+    return list_adapter(model).validate_python([dict(row) for row in rows])
+
+
+def rows_json(model: Type[BaseModel], rows: Iterable[Mapping[str, Any]]) -> bytes:
+    """Serialize row mappings (``Result.mappings()`` or dicts) as a JSON array of ``model``.
+
+    Produces the same bytes FastAPI writes for ``response_model=List[model]``,
+    but validation and encoding each run once over the list in pydantic-core.
+    """
+    adapter = list_adapter(model)
+    return adapter.dump_json(adapter.validate_python([dict(row) for row in rows]))
+
+
+def json_bytes_response(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
+
+
+def _orders_with_items(orders: Sequence[Mapping[str, Any]], items: Iterable[Mapping[str, Any]]) -> bytes:
+    items_by_order = defaultdict(list)
+    for item in items:
+        items_by_order[item["order_id"]].append(item)
+    return rows_json(OrderResponse, ({**order, "order_items": items_by_order[order["id"]]} for order in orders))
+
+
+def orders_json(db: Session, *criteria) -> bytes:
+    """Order lists serialized straight from rows: one query for orders, one for all their items"""
+    orders = db.execute(
+        select(Order.__table__).where(*criteria).order_by(Order.created_at.desc())
+    ).mappings().all()
+    items = db.execute(
+        select(OrderItem.__table__)
+        .where(OrderItem.order_id.in_(select(Order.id).where(*criteria)))
+        .order_by(OrderItem.id)
+    ).mappings().all()
+    return _orders_with_items(orders, items)
+
+
+def order_page_json(db: Session, orders: Sequence[Mapping[str, Any]]) -> bytes:
+    """One page of already fetched order rows, with their items loaded by id in one query"""
+    ids = [order["id"] for order in orders]
+    items = db.execute(
+        select(OrderItem.__table__).where(OrderItem.order_id.in_(ids)).order_by(OrderItem.id)
+    ).mappings().all() if ids else []
+    return _orders_with_items(orders, items)
@@ -0,0 +1,175 @@
+from typing import Any, Dict, List, Optional
+from fastapi import HTTPException, status
+from sqlalchemy import case, delete, func, insert, select, update
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..core.database import SessionLocal
+from ..models.models import StockShard, Sweet
+
+# Stock a buyer can take: the sweets row, or the sum of its shards for hot SKUs
+available_quantity = case(
+    (
+        Sweet.stock_shards > 1,
+        select(func.coalesce(func.sum(StockShard.quantity), 0))
+        .where(StockShard.sweet_id == Sweet.id)
+        .correlate(Sweet)
+        .scalar_subquery(),
+    ),
+    else_=Sweet.quantity,
+)
+
+
+def sweet_columns() -> List[Any]:
+    """Sweet table columns with ``quantity`` read through the shards"""
+    return [
+        available_quantity.label("quantity") if column.name == "quantity" else column
+        for column in Sweet.__table__.c
+    ]
+
+
+def sweet_row(db: Session, sweet_id: int) -> Optional[Dict[str, Any]]:
+    row = db.execute(select(*sweet_columns()).where(Sweet.id == sweet_id)).mappings().first()
+    return dict(row) if row is not None else None
+
+
+def _even_split(total: int, shards: int) -> List[int]:
+    return [total // shards + (1 if shard < total % shards else 0) for shard in range(shards)]
+
+
+def _lock_shards(db: Session, sweet_id: int) -> List[int]:
+    """Lock every shard of a sweet in shard order (so lockers never deadlock); return their quantities"""
+    return list(db.execute(
+        select(StockShard.quantity)
+        .where(StockShard.sweet_id == sweet_id)
+        .order_by(StockShard.shard)
+        .with_for_update()
+    ).scalars())
+
+
+def _set_shards(db: Session, sweet_id: int, quantities: List[int]):
+    db.execute(
+        update(StockShard)
+        .where(StockShard.sweet_id == sweet_id)
+        .values(quantity=case(dict(enumerate(quantities)), value=StockShard.shard, else_=StockShard.quantity))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def take_from_shards(db: Session, sweet_id: int, quantity: int) -> bool:
+    """Take stock from a sharded sweet; False if the shards together hold too little.
+
+    The common case is one UPDATE on a random shard that can cover the
+    request. On Postgres, SKIP LOCKED steers it past shards that other
+    buyers are updating. If no single shard can cover the request, all
+    shards are locked and drained together.
+    """
+    pick = (
+        select(StockShard.shard)
+        .where(StockShard.sweet_id == sweet_id, StockShard.quantity >= quantity)
+        .order_by(func.random())
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    result = db.execute(
+        update(StockShard)
+        .where(StockShard.sweet_id == sweet_id, StockShard.shard == pick, StockShard.quantity >= quantity)
+        .values(quantity=StockShard.quantity - quantity)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 1:
+        return True
+
+    # Fragmented stock (or every stocked shard busy): take across shards under the locks
+    quantities = _lock_shards(db, sweet_id)
+    if sum(quantities) < quantity:
+        return False
+    remaining = quantity
+    for shard, available in enumerate(quantities):
+        taken = min(available, remaining)
+        quantities[shard] -= taken
+        remaining -= taken
+    _set_shards(db, sweet_id, quantities)
+    return True
+
+
+def add_to_shards(db: Session, sweet_id: int, shards: int, quantity: int):
+    """Spread added stock evenly over the shards in one UPDATE"""
+    db.execute(
+        update(StockShard)
+        .where(StockShard.sweet_id == sweet_id)
+        .values(quantity=StockShard.quantity + quantity // shards + case((StockShard.shard < quantity % shards, 1), else_=0))
+        .execution_options(synchronize_session=False)
+    )
+
+
+def configure_shards(db: Session, sweet_id: int, shards: int, quantity: Optional[int] = None) -> List[int]:
+    """Set how many counter rows a sweet's stock is split over; the caller commits.
+
+    Stock is carried over (or replaced by ``quantity``) and split evenly.
+    ``shards=1`` folds everything back into the sweets row.
+    """
+    if not 1 <= shards <= settings.stock_shards_max:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Shards must be between 1 and {settings.stock_shards_max}"
+        )
+    current = db.execute(
+        select(Sweet.stock_shards, Sweet.quantity).where(Sweet.id == sweet_id).with_for_update()
+    ).first()
+    if current is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Sweet not found")
+    if quantity is None:
+        quantity = sum(_lock_shards(db, sweet_id)) if current.stock_shards > 1 else current.quantity
+
+    db.execute(delete(StockShard).where(StockShard.sweet_id == sweet_id))
+    layout = _even_split(quantity, shards) if shards > 1 else []
+    if layout:
+        db.execute(insert(StockShard), [
+            {"sweet_id": sweet_id, "shard": shard, "quantity": amount} for shard, amount in enumerate(layout)
+        ])
+    db.execute(
+        update(Sweet)
+        .where(Sweet.id == sweet_id)
+        .values(stock_shards=shards, quantity=quantity)
+        .execution_options(synchronize_session=False)
+    )
+    return layout
+
+
+def shard_layout(db: Session, sweet_id: int) -> List[int]:
+    return list(db.execute(
+        select(StockShard.quantity).where(StockShard.sweet_id == sweet_id).order_by(StockShard.shard)
+    ).scalars())
+
+
+def rebalance_shards(db: Session) -> int:
+    """Even out drained shards and refresh the cached total on the sweets row.
+
+    Random routing only finds stock on shards that still have some, so
+    without this a hot SKU drifts into the slow cross-shard path. Each
+    sweet is rebalanced in its own short transaction.
+    """
+    sweet_ids = db.execute(select(Sweet.id).where(Sweet.stock_shards > 1).order_by(Sweet.id)).scalars().all()
+    rebalanced = 0
+    for sweet_id in sweet_ids:
+        quantities = _lock_shards(db, sweet_id)
+        total = sum(quantities)
+        layout = _even_split(total, len(quantities)) if quantities else []
+        if layout != quantities:
+            _set_shards(db, sweet_id, layout)
+            rebalanced += 1
+        db.execute(
+            update(Sweet)
+            .where(Sweet.id == sweet_id, Sweet.quantity != total)
+            .values(quantity=total)
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+    return rebalanced
+
+
+def run_shard_rebalancer():
+    """Background job for rebalance_shards"""
+    with SessionLocal() as db:
+        rebalance_shards(db)
@@ -0,0 +1,113 @@
+import bisect
+import heapq
+import itertools
+from collections import defaultdict
+from typing import Dict, List, Tuple
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..models.models import Order, OrderItem
+from ..schemas.schemas import Suggestion
+from .cache import TTLCache
+from .catalog import CatalogSnapshot
+
+MAX_SUGGESTIONS = 20
+# Prefixes this short match too many keys to scan per keystroke; their
+# top suggestions are precomputed when the index is built
+PRECOMPUTED_PREFIX_LENGTH = 2
+
+# Popularity aggregates every order line, so it has its own, longer TTL
+# rather than being recounted with each catalog snapshot
+popularity_cache = TTLCache(1, settings.suggest_popularity_ttl_seconds)
+_popularity_generations = itertools.count()
+
+
+def order_popularity(db: Session) -> Dict[int, int]:
+    """Units ordered per sweet, ignoring cancelled orders"""
+    rows = (
+        db.query(OrderItem.sweet_id, func.sum(OrderItem.quantity))
+        .join(Order, Order.id == OrderItem.order_id)
+        .filter(Order.status != "cancelled")
+        .group_by(OrderItem.sweet_id)
+        .all()
+    )
+    return {sweet_id: int(units or 0) for sweet_id, units in rows}
+
+
+def cached_order_popularity(db: Session) -> Tuple[int, Dict[int, int]]:
+    """``(generation, order_popularity)``, counted at most once per TTL; the
+    generation changes with every recount"""
+    cached = popularity_cache.get("units")
+    if cached is None:
+        cached = (next(_popularity_generations), order_popularity(db))
+        popularity_cache.set("units", cached)
+    return cached
+
+
+class SuggestionIndex:
+    """Sorted array of lowercase keys searched with bisect.
+
+    Every sweet is reachable from the start of its name and from the start
+    of each later word ("jam" finds "Gulab Jamun"); categories are entries too.
+    Ties on popularity fall back to alphabetical order.
+    """
+
+    def __init__(self, snapshot: CatalogSnapshot, popularity: Dict[int, int]):
+        self.suggestions: List[Suggestion] = []
+        self.weights: List[int] = []
+        pairs: List[Tuple[str, int]] = []
+
+        category_weights: Dict[str, int] = defaultdict(int)
+        for sweet in snapshot.sweets:
+            weight = popularity.get(sweet.id, 0)
+            category_weights[sweet.category] += weight
+            self._add(pairs, Suggestion(text=sweet.name, kind="sweet", sweet_id=sweet.id), weight)
+        for category, weight in category_weights.items():
+            self._add(pairs, Suggestion(text=category, kind="category"), weight)
+
+        pairs.sort()
+        self.keys = [key for key, _ in pairs]
+        self.entries = [entry for _, entry in pairs]
+
+        self.top_by_prefix: Dict[str, List[int]] = {}
+        for length in range(1, PRECOMPUTED_PREFIX_LENGTH + 1):
+            groups: Dict[str, List[int]] = defaultdict(list)
+            for key, entry in pairs:
+                if len(key) >= length:
+                    groups[key[:length]].append(entry)
+            for prefix, entries in groups.items():
+                self.top_by_prefix[prefix] = self._top(entries, MAX_SUGGESTIONS)
+
+    def _add(self, pairs: List[Tuple[str, int]], suggestion: Suggestion, weight: int):
+        entry = len(self.suggestions)
+        self.suggestions.append(suggestion)
+        self.weights.append(weight)
+        words = suggestion.text.lower().split()
+        for start in range(len(words)):
+            pairs.append((" ".join(words[start:]), entry))
+
+    def _top(self, entries, limit: int) -> List[int]:
+        unique = set(entries)
+        return heapq.nsmallest(
+            limit, unique, key=lambda entry: (-self.weights[entry], self.suggestions[entry].text.lower(), entry)
+        )
+
+    def complete(self, prefix: str, limit: int = 8) -> List[Suggestion]:
+        prefix = " ".join(prefix.lower().split())
+        if not prefix:
+            return []
+        if len(prefix) <= PRECOMPUTED_PREFIX_LENGTH:
+            entries = self.top_by_prefix.get(prefix, [])[:limit]
+        else:
+            start = bisect.bisect_left(self.keys, prefix)
+            end = bisect.bisect_left(self.keys, prefix + "\uffff", start)
+            entries = self._top(self.entries[start:end], limit)
+        return [self.suggestions[entry] for entry in entries]
+
+
+def suggest(db: Session, snapshot: CatalogSnapshot, prefix: str, limit: int = 8) -> List[Suggestion]:
+    """Top completions for a prefix; the index is rebuilt with each catalog snapshot,
+    while the popularity ranking it uses may lag orders by its own TTL"""
+    generation, popularity = cached_order_popularity(db)
+    index = snapshot.derived(f"suggestions:{generation}", lambda built: SuggestionIndex(built, popularity))
+    return index.complete(prefix, limit)
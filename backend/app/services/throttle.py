@@ -0,0 +1,155 @@
+import math
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+from ..core.config import settings
+
+try:
+    import redis
+except ImportError:  # the shared backend is optional
+    redis = None
+
+
+class TokenBucketLimiter:
+    """In-process token buckets stored as ``key -> (tokens, updated_at)`` tuples.
+
+    Buckets that have refilled completely carry no information, so a periodic
+    sweep drops them and memory stays proportional to recently active keys.
+    """
+
+    def __init__(self, rate_per_minute: float, burst: int, sweep_interval_seconds: float = 60.0):
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self._buckets: Dict[str, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self._next_sweep = time.monotonic() + sweep_interval_seconds
+        self.rejected = 0
+
+    def acquire(self, key: str) -> float:
+        """Take one token; return 0 if allowed, else the seconds until one is available"""
+        now = time.monotonic()
+        with self._lock:
+            if now >= self._next_sweep:
+                self._sweep(now)
+            tokens, updated_at = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                return 0.0
+            self._buckets[key] = (tokens, now)
+            self.rejected += 1
+            return (1 - tokens) / self.rate
+
+    def _sweep(self, now: float):
+        full = [
+            key for key, (tokens, updated_at) in self._buckets.items()
+            if tokens + (now - updated_at) * self.rate >= self.burst
+        ]
+        for key in full:
+            del self._buckets[key]
+        self._next_sweep = now + self.sweep_interval_seconds
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+            self.rejected = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"buckets": len(self._buckets), "rejected": self.rejected}
+
+
+# Same token-bucket arithmetic as TokenBucketLimiter, executed atomically in Redis
+_REDIS_TOKEN_BUCKET = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local now = tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 't', 'ts')
+local tokens = tonumber(bucket[1]) or burst
+local updated_at = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(now - updated_at, 0) * rate)
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 't', tokens, 'ts', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return tostring(retry_after)
+"""
+
+
+class RedisTokenBucketLimiter:
+    """Token buckets shared by every worker through Redis; keys expire once full"""
+
+    def __init__(self, client, prefix: str, rate_per_minute: float, burst: int, fallback: TokenBucketLimiter):
+        self.prefix = prefix
+        self.rate = rate_per_minute / 60.0
+        self.burst = burst
+        self.fallback = fallback
+        self._script = client.register_script(_REDIS_TOKEN_BUCKET)
+        self.rejected = 0
+        self.errors = 0
+
+    def acquire(self, key: str) -> float:
+        try:
+            retry_after = float(self._script(
+                keys=[f"{self.prefix}:{key}"],
+                args=[self.rate, self.burst, time.time()],
+            ))
+        except redis.RedisError:
+            # Keep protecting this worker's CPU if Redis is unreachable
+            self.errors += 1
+            return self.fallback.acquire(key)
+        if retry_after > 0:
+            self.rejected += 1
+        return retry_after
+
+    def reset(self):
+        self.fallback.reset()
+        self.rejected = 0
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": "redis", "rejected": self.rejected, "errors": self.errors}
+
+
+class LoginThrottle:
+    """Per-client-IP and per-account login limits, checked before any password work"""
+
+    def __init__(self, redis_url: Optional[str] = None):
+        self.by_ip = self._limiter(
+            redis_url, "login:ip", settings.login_throttle_ip_per_minute, settings.login_throttle_ip_burst
+        )
+        self.by_account = self._limiter(
+            redis_url, "login:account",
+            settings.login_throttle_account_per_minute, settings.login_throttle_account_burst,
+        )
+
+    @staticmethod
+    def _limiter(redis_url: Optional[str], prefix: str, rate_per_minute: float, burst: int):
+        local = TokenBucketLimiter(rate_per_minute, burst)
+        if not redis_url:
+            return local
+        if redis is None:
+            raise RuntimeError("LOGIN_THROTTLE_REDIS_URL is set but the redis package is not installed")
+        client = redis.Redis.from_url(redis_url, socket_timeout=0.05)
+        return RedisTokenBucketLimiter(client, prefix, rate_per_minute, burst, fallback=local)
+
+    def check(self, client_ip: str, account: str) -> int:
+        """Return 0 if the attempt may proceed, else a Retry-After in whole seconds"""
+        retry_after = self.by_ip.acquire(client_ip)
+        if not retry_after:
+            retry_after = self.by_account.acquire(account.strip().lower())
+        return math.ceil(retry_after)
+
+    def reset(self):
+        self.by_ip.reset()
+        self.by_account.reset()
+
+    def stats(self) -> Dict[str, Any]:
+        return {"ip": self.by_ip.stats(), "account": self.by_account.stats()}
+
+
+login_throttle = LoginThrottle(settings.login_throttle_redis_url)
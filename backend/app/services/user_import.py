@@ -0,0 +1,214 @@
+import csv
+import io
+import json
+from typing import IO, Iterable, Iterator, List, Optional, Tuple
+from pydantic import ValidationError
+from sqlalchemy import insert, or_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from ..core.config import settings
+from ..models.models import User
+from ..schemas.schemas import UserImportError, UserImportResult, UserImportRow
+from .auth import pwd_context
+from .password_pool import PasswordPool, import_pool
+
+# Cap the per-row error list so a garbage upload cannot produce a huge response
+MAX_REPORTED_ERRORS = 1000
+# Bytes that are not valid UTF-8 decode to this, so the row can be reported
+REPLACEMENT_CHARACTER = "\ufffd"
+
+
+class ChunkReader(io.RawIOBase):
+    """Binary stream over an iterator of byte chunks, read as they arrive"""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._pending = b""
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        while not self._pending:
+            self._pending = next(self._chunks, None)
+            if self._pending is None:
+                self._pending = b""
+                return 0
+        size = min(len(buffer), len(self._pending))
+        buffer[:size] = self._pending[:size]
+        self._pending = self._pending[size:]
+        return size
+
+
+def _error_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in err['loc']) or 'row'}: {err['msg']}" for err in exc.errors()
+    )
+
+
+def read_rows(stream: IO[str], fmt: str) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """Yield ``(line, record, error)`` for each NDJSON or CSV record in a text stream.
+
+    Malformed input never ends the stream: invalid UTF-8, oversized CSV
+    fields and unparsable lines come back as errors for their line.
+    """
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        while True:
+            try:
+                record = next(reader)
+            except StopIteration:
+                return
+            except csv.Error as exc:
+                # The underlying reader has consumed the bad line; carry on after it
+                yield reader.reader.line_num, None, f"invalid CSV: {exc}"
+                continue
+            if any(isinstance(value, str) and REPLACEMENT_CHARACTER in value for value in record.values()):
+                yield reader.line_num, None, "invalid UTF-8"
+                continue
+            yield reader.line_num, record, None
+
+    for line_no, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        if REPLACEMENT_CHARACTER in line:
+            yield line_no, None, "invalid UTF-8"
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as exc:
+            yield line_no, None, f"invalid JSON: {exc.msg}"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, None, "expected a JSON object"
+            continue
+        yield line_no, record, None
+
+
+class UserImporter:
+    """Validate, hash and insert users in large batches, collecting per-row errors"""
+
+    def __init__(self, db: Session, batch_size: int = None, pool: PasswordPool = None):
+        self.db = db
+        self.batch_size = batch_size or settings.user_import_batch_size
+        self.pool = pool or import_pool
+        self.imported = 0
+        self.failed = 0
+        self.errors: List[UserImportError] = []
+        self._seen_emails = set()
+        self._seen_usernames = set()
+
+    def _fail(self, line: int, email, error: str):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            # The email comes from untrusted input; only echo it back if it is text
+            email = email if isinstance(email, str) else None
+            self.errors.append(UserImportError(line=line, email=email, error=error))
+
+    def _parse(self, line: int, record: dict) -> Optional[UserImportRow]:
+        """Validate one record, reporting it as a row error if it is unusable"""
+        if None in record:
+            # csv.DictReader files fields beyond the header under a None key
+            self._fail(line, record.get("email"), "row has more fields than the header")
+            return None
+        try:
+            row = UserImportRow(**record)
+        except ValidationError as exc:
+            self._fail(line, record.get("email"), _error_message(exc))
+            return None
+        except TypeError as exc:
+            self._fail(line, record.get("email"), f"invalid row: {exc}")
+            return None
+        if row.hashed_password and pwd_context.identify(row.hashed_password, required=False) is None:
+            # Stored as-is, an unknown hash would only fail later, at login
+            self._fail(line, row.email, "hashed_password is not a supported password hash")
+            return None
+        return row
+
+    def run(self, rows: Iterable[Tuple[int, Optional[dict], Optional[str]]]) -> UserImportResult:
+        batch = []
+        for line, record, error in rows:
+            if error:
+                self._fail(line, None, error)
+                continue
+            row = self._parse(line, record)
+            if row is None:
+                continue
+            batch.append((line, row))
+            if len(batch) >= self.batch_size:
+                self._import_batch(batch)
+                batch = []
+        if batch:
+            self._import_batch(batch)
+
+        return UserImportResult(imported=self.imported, failed=self.failed, errors=self.errors)
+
+    def _import_batch(self, batch: List[Tuple[int, UserImportRow]]):
+        # One query checks the whole batch against existing accounts
+        emails = [row.email for _, row in batch]
+        usernames = [row.username for _, row in batch]
+        existing = self.db.execute(
+            select(User.email, User.username).where(
+                or_(User.email.in_(emails), User.username.in_(usernames))
+            )
+        ).all()
+        taken_emails = {email for email, _ in existing} | self._seen_emails
+        taken_usernames = {username for _, username in existing} | self._seen_usernames
+
+        accepted = []
+        for line, row in batch:
+            if row.email in taken_emails:
+                self._fail(line, row.email, "Email already registered")
+                continue
+            if row.username in taken_usernames:
+                self._fail(line, row.email, "Username already taken")
+                continue
+            taken_emails.add(row.email)
+            taken_usernames.add(row.username)
+            accepted.append((line, row))
+
+        # Hash every plaintext password of the batch in parallel on the shared pool
+        hashes = iter(self.pool.hash_many([row.password for _, row in accepted if not row.hashed_password]))
+        values = [
+            {
+                "email": row.email,
+                "username": row.username,
+                "hashed_password": row.hashed_password or next(hashes),
+            }
+            for _, row in accepted
+        ]
+        if not values:
+            return
+
+        try:
+            self.db.execute(insert(User), values)
+            self.db.commit()
+        except IntegrityError:
+            # A concurrent signup raced the uniqueness check; retry row by row
+            self.db.rollback()
+            self._insert_rows_individually(accepted, values)
+        else:
+            self.imported += len(values)
+
+        self._seen_emails.update(value["email"] for value in values)
+        self._seen_usernames.update(value["username"] for value in values)
+
+    def _insert_rows_individually(self, accepted, values):
+        for (line, row), value in zip(accepted, values):
+            try:
+                with self.db.begin_nested():
+                    self.db.execute(insert(User), [value])
+            except IntegrityError:
+                self._fail(line, row.email, "Email or username already exists")
+            else:
+                self.imported += 1
+        self.db.commit()
+
+
+def import_users(db: Session, stream: IO[bytes], fmt: str, **options) -> UserImportResult:
+    """Import users from a binary NDJSON or CSV stream"""
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", errors="replace", newline="")
+    try:
+        return UserImporter(db, **options).run(read_rows(text, fmt))
+    finally:
+        text.detach()
@@ -50,3 +50,14 @@ def seed_initial_sweets(db: Session):
         db.add(sweet)
     
     db.commit()
+
+
+def seed_defaults(db: Session):
+    """Seed the default admin account and the starter catalog"""
+    create_admin_user(
+        db=db,
+        email="admin@sweetshop.com",
+        username="admin",
+        password="admin123"
+    )
+    seed_initial_sweets(db)
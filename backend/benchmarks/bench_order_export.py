@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Benchmark: peak Python memory exporting every order, the materialized JSON list
+(serialization.orders_json) vs the streaming export in services/order_export.py
+
+Usage: python benchmarks/bench_order_export.py [--database-url URL] [--orders N ...] [--items N]
+
+Defaults to a temporary SQLite file. Peaks are measured with tracemalloc,
+so they cover Python objects only, not the database driver's buffers.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import create_engine, delete, insert
+from sqlalchemy.orm import Session
+from app.core.database import Base
+from app.models.models import Order, OrderItem
+from app.services.order_export import export_orders
+from app.services.serialization import orders_json
+
+
+def fill(engine, orders: int, items: int):
+    with Session(engine) as db:
+        db.execute(delete(OrderItem))
+        db.execute(delete(Order))
+        db.execute(insert(Order), [
+            {"id": order_id, "user_id": 1, "total_amount": 100.0, "status": "delivered",
+             "delivery_address": "12 MG Road, Pune", "customer_name": f"Customer {order_id}",
+             "email": f"customer{order_id}@example.com", "phone_number": "9876543210"}
+            for order_id in range(1, orders + 1)
+        ])
+        db.execute(insert(OrderItem), [
+            {"order_id": order_id, "sweet_id": item + 1, "sweet_name": f"Sweet {item}",
+             "selected_quantity": "500g", "quantity": 2, "price": 50.0}
+            for order_id in range(1, orders + 1) for item in range(items)
+        ])
+        db.commit()
+
+
+def measure(export):
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = export()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 2 ** 20, elapsed, size / 2 ** 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url")
+    parser.add_argument("--orders", type=int, nargs="+", default=[5000, 20000, 80000])
+    parser.add_argument("--items", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = args.database_url or f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        engine = create_engine(url)
+        Base.metadata.create_all(bind=engine)
+
+        def materialized():
+            with Session(engine) as db:
+                return len(orders_json(db))
+
+        def streamed(fmt):
+            return sum(len(chunk) for chunk in export_orders(engine, [], fmt))
+
+        print("=" * 60)
+        print(f"📦 Exporting orders with {args.items} items each (peak MB / seconds / output MB)")
+        for orders in args.orders:
+            fill(engine, orders, args.items)
+            print(f"   {orders} orders")
+            for label, export in [
+                ("JSON list", materialized),
+                ("NDJSON stream", lambda: streamed("ndjson")),
+                ("CSV stream", lambda: streamed("csv")),
+            ]:
+                peak, elapsed, size = measure(export)
+                print(f"      {label:14} peak {peak:8.1f} MB   {elapsed:6.2f} s   output {size:7.1f} MB")
+        print("=" * 60)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Benchmark: order creation latency against the number of line items, per-line
+ORM statements (the old create_order) vs services/orders.py add_order_items
+
+Usage: python benchmarks/bench_order_items.py [--database-url URL] [--lines N ...] [--orders N]
+
+Defaults to a temporary SQLite file; against a networked Postgres every
+saved statement also saves a round trip.
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from app.core.database import Base
+from app.models.models import Order, OrderItem, Sweet, User
+from app.schemas.orders import OrderItemCreate
+from app.services.orders import add_order_items
+
+
+def per_line_items(db, order_id: int, user_id: int, items):
+    for item in items:
+        sweet = db.query(Sweet).filter(Sweet.id == item.sweet_id).first()
+        if sweet.quantity < item.quantity:
+            raise ValueError("insufficient")
+        db.add(OrderItem(
+            order_id=order_id, sweet_id=item.sweet_id, sweet_name=item.sweet_name,
+            selected_quantity=item.selected_quantity, quantity=item.quantity, price=item.price,
+        ))
+        sweet.quantity -= item.quantity
+
+
+def run(engine, SessionLocal, place, user_id: int, sweet_ids, lines: int, orders: int):
+    items = [
+        OrderItemCreate(sweet_id=sweet_id, sweet_name="Bench Sweet", selected_quantity="500g", quantity=1, price=1.0)
+        for sweet_id in sweet_ids[:lines]
+    ]
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    latencies = []
+    for _ in range(orders):
+        with SessionLocal() as db:
+            statements.clear()
+            event.listen(engine, "before_cursor_execute", count)
+            started = time.perf_counter()
+            order = Order(user_id=user_id, total_amount=float(lines))
+            db.add(order)
+            db.flush()
+            place(db, order.id, user_id, items)
+            db.commit()
+            latencies.append(time.perf_counter() - started)
+            event.remove(engine, "before_cursor_execute", count)
+    return statistics.median(latencies) * 1000, len(statements)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url")
+    parser.add_argument("--lines", type=int, nargs="+", default=[1, 5, 20, 50])
+    parser.add_argument("--orders", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = args.database_url or f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        engine = create_engine(url)
+        Base.metadata.create_all(bind=engine)
+        SessionLocal = sessionmaker(bind=engine, autoflush=False)
+
+        with SessionLocal() as db:
+            user = User(email="bench-orders@example.com", username="bench-orders", hashed_password="x")
+            sweets = [
+                Sweet(name=f"Bench Sweet {index}", category="Bench", price=1.0, quantity=10 ** 9)
+                for index in range(max(args.lines))
+            ]
+            db.add_all([user, *sweets])
+            db.commit()
+            user_id = user.id
+            sweet_ids = [sweet.id for sweet in sweets]
+
+        print("=" * 60)
+        print(f"🧾 Median of {args.orders} orders per size")
+        print(f"   {'lines':>5}   {'per-line ORM':>22}   {'add_order_items':>22}")
+        for lines in args.lines:
+            old_ms, old_statements = run(engine, SessionLocal, per_line_items, user_id, sweet_ids, lines, args.orders)
+            new_ms, new_statements = run(engine, SessionLocal, add_order_items, user_id, sweet_ids, lines, args.orders)
+            print(
+                f"   {lines:>5}   {old_ms:7.2f} ms {old_statements:4} stmts   "
+                f"{new_ms:7.2f} ms {new_statements:4} stmts"
+            )
+        print("=" * 60)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
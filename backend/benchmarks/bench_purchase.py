@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark: concurrent purchases of one SKU, ORM read-modify-write (the old
+purchase_sweet) vs the conditional UPDATE in services/inventory.py
+
+Usage: python benchmarks/bench_purchase.py [--database-url URL] [--stock N] [--purchases N] [--threads N]
+
+Defaults to a temporary SQLite file; point --database-url at a scratch
+Postgres database to see the read-modify-write path oversell.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import sessionmaker
+from app.core.database import Base
+from app.models.models import Sweet
+from app.services.inventory import decrement_stock
+
+
+def read_modify_write(db, sweet_id: int):
+    sweet = db.query(Sweet).filter(Sweet.id == sweet_id).first()
+    if sweet.quantity < 1:
+        raise HTTPException(status_code=400)
+    sweet.quantity -= 1
+    db.commit()
+
+
+def conditional_update(db, sweet_id: int):
+    decrement_stock(db, sweet_id, 1)
+    db.commit()
+
+
+def run(SessionLocal, purchase, stock: int, purchases: int, threads: int):
+    with SessionLocal() as db:
+        sweet = Sweet(name="Flash Sale Sweet", category="Bench", price=1.0, quantity=stock)
+        db.add(sweet)
+        db.commit()
+        sweet_id = sweet.id
+
+    def attempt(_):
+        with SessionLocal() as db:
+            try:
+                purchase(db, sweet_id)
+                return "sold"
+            except HTTPException:
+                return "rejected"
+            except DBAPIError:
+                db.rollback()
+                return "error"
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        outcomes = list(executor.map(attempt, range(purchases)))
+    elapsed = time.perf_counter() - started
+
+    with SessionLocal() as db:
+        sweet = db.get(Sweet, sweet_id)
+        remaining = sweet.quantity
+        db.delete(sweet)
+        db.commit()
+    sold = outcomes.count("sold")
+    return {
+        "throughput": purchases / elapsed,
+        "sold": sold,
+        "errors": outcomes.count("error"),
+        "oversold": max(0, sold - stock) + max(0, (stock - sold) - remaining),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url")
+    parser.add_argument("--stock", type=int, default=100)
+    parser.add_argument("--purchases", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=32)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = args.database_url or f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        options = {"pool_size": args.threads}
+        if url.startswith("sqlite"):
+            options["connect_args"] = {"check_same_thread": False, "timeout": 30}
+        engine = create_engine(url, **options)
+        Base.metadata.create_all(bind=engine)
+        SessionLocal = sessionmaker(bind=engine)
+
+        print("=" * 60)
+        print(f"🛒 {args.purchases} purchases of a SKU with {args.stock} in stock, {args.threads} threads")
+        for label, purchase in [("read-modify-write", read_modify_write), ("conditional UPDATE", conditional_update)]:
+            result = run(SessionLocal, purchase, args.stock, args.purchases, args.threads)
+            print(
+                f"   {label:18} {result['throughput']:8.0f} req/s   sold {result['sold']:4}   "
+                f"oversold {result['oversold']:4}   errors {result['errors']}"
+            )
+        print("=" * 60)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark: sweet search latency, database ILIKE path vs the in-memory index
+in services/search_index.py, over a synthetic catalog. The database side runs
+on a temporary SQLite file, i.e. the non-Postgres fallback without pg_trgm.
+
+Usage: python benchmarks/bench_search.py [--skus N] [--queries N]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import Session
+from app.core.database import Base
+from app.models.models import Sweet
+from app.schemas.schemas import SweetResponse
+from app.services.search import database_search
+from app.services.search_index import SearchIndex
+
+BASES = [
+    "Gulab Jamun", "Kaju Katli", "Barfi", "Ladoo", "Motichoor Ladoo", "Rasgulla", "Jalebi", "Peda",
+    "Halwa", "Sandesh", "Soan Papdi", "Mysore Pak", "Truffle", "Fudge", "Toffee", "Rasmalai",
+    "Cham Cham", "Kalakand", "Ghevar", "Imarti", "Malpua", "Petha", "Balushahi", "Chikki",
+]
+FLAVOURS = [
+    "Pistachio", "Almond", "Coconut", "Saffron", "Rose", "Chocolate", "Caramel", "Mango",
+    "Cardamom", "Honey", "Jaggery", "Orange", "Strawberry", "Dates", "Fig", "Walnut",
+]
+CATEGORIES = ["Traditional", "Chocolate", "Dry Fruit", "Bengali", "Festive", "Sugar Free"]
+SYLLABLES = ["ka", "ri", "mo", "la", "shi", "ta", "ven", "dra", "pu", "ne", "so", "gha", "mi", "ro"]
+QUERIES = [
+    {"name": "gulab jamun"},
+    {"name": "gulab jamon"},      # typo
+    {"name": "kaju kat"},         # search-as-you-type prefix
+    {"name": "chocolate", "category": "Chocolate"},
+    {"name": "pistachio barfi", "max_price": 200.0},
+    {"name": "rasgula"},          # typo
+    {"category": "Bengali"},
+]
+
+
+def build_catalog(engine, skus: int):
+    """Names look like "<flavour> <base> <brand>" with a few thousand distinct brands"""
+    rng = random.Random(42)
+    brands = sorted({"".join(rng.choices(SYLLABLES, k=3)).title() for _ in range(5000)})
+    descriptive = [word.lower() for word in FLAVOURS]
+    descriptive += ["fresh", "handmade", "premium", "ghee", "festive", "gift", "box"]
+    rows = [
+        {
+            "name": f"{rng.choice(FLAVOURS)} {rng.choice(BASES)} {rng.choice(brands)}",
+            "category": rng.choice(CATEGORIES),
+            "price": round(rng.uniform(20, 900), 2),
+            "quantity": rng.randint(0, 500),
+            "description": " ".join(rng.sample(descriptive, 4)),
+        }
+        for _ in range(skus)
+    ]
+    with Session(engine) as db:
+        db.execute(insert(Sweet), rows)
+        db.commit()
+
+
+def measure(search, queries: int):
+    """Return (p50, p99) latency in milliseconds"""
+    timings = []
+    for index in range(queries):
+        query = QUERIES[index % len(QUERIES)]
+        started = time.perf_counter()
+        search(query)
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return statistics.median(timings), timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--skus", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=350)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        print(f"🍬 Building a {args.skus:,}-SKU catalog...")
+        build_catalog(engine, args.skus)
+
+        with Session(engine) as db:
+            sweets = [SweetResponse.model_validate(sweet) for sweet in db.query(Sweet).order_by(Sweet.id)]
+            index = SearchIndex()
+            started = time.perf_counter()
+            index.sync(1, sweets)
+            build_seconds = time.perf_counter() - started
+
+            # A single changed item is applied incrementally
+            sweets[0] = sweets[0].model_copy(update={"name": "Renamed Sweet"})
+            started = time.perf_counter()
+            index.sync(2, sweets)
+            resync_seconds = time.perf_counter() - started
+
+            database = measure(lambda query: database_search(db, limit=50, **query), args.queries)
+            memory = measure(lambda query: index.search(limit=50, **query), args.queries)
+        engine.dispose()
+
+    print("=" * 60)
+    print(f"🔎 index build: {build_seconds:.2f} s, incremental resync: {resync_seconds * 1000:.1f} ms")
+    print(f"   database ILIKE   p50 {database[0]:8.2f} ms   p99 {database[1]:8.2f} ms")
+    print(f"   in-memory index  p50 {memory[0]:8.2f} ms   p99 {memory[1]:8.2f} ms")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
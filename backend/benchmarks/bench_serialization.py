@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Benchmark: list endpoint serialization, ORM objects validated by FastAPI's
+response_model vs the row-based path in services/serialization.py
+
+Usage: python benchmarks/bench_serialization.py [--rows N] [--repeat N]
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from typing import List
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine, insert, select
+from sqlalchemy.orm import Session
+from app.core.database import Base
+from app.models.models import Order, OrderItem, Sweet, User
+from app.schemas.orders import OrderResponse
+from app.schemas.schemas import SweetResponse
+from app.services.serialization import orders_json, rows_json
+
+
+def build(engine, rows: int):
+    rng = random.Random(7)
+    with Session(engine) as db:
+        db.execute(insert(User), [{"email": "bench@example.com", "username": "bench", "hashed_password": "x"}])
+        db.execute(insert(Sweet), [
+            {"name": f"Sweet {index}", "category": rng.choice(["Traditional", "Chocolate", "Bengali"]),
+             "price": round(rng.uniform(10, 500), 2), "quantity": rng.randint(0, 100),
+             "description": "Handmade with ghee"}
+            for index in range(rows)
+        ])
+        db.execute(insert(Order), [
+            {"user_id": 1, "total_amount": 250.0, "status": "pending", "delivery_address": "1 Bench Road",
+             "customer_name": "Bench", "email": "bench@example.com"}
+            for _ in range(rows)
+        ])
+        db.execute(insert(OrderItem), [
+            {"order_id": order_id, "sweet_id": rng.randint(1, rows), "sweet_name": "Sweet",
+             "selected_quantity": "500g", "quantity": 2, "price": 125.0}
+            for order_id in range(1, rows + 1) for _ in range(2)
+        ])
+        db.commit()
+
+
+def fastapi_path(model, objects) -> bytes:
+    """What FastAPI does for response_model=List[model] given ORM objects"""
+    adapter = TypeAdapter(List[model])
+    return adapter.dump_json(adapter.validate_python(objects, from_attributes=True))
+
+
+def best_of(repeat: int, run) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        build(engine, args.rows)
+
+        def orm_sweets():
+            with Session(engine) as db:
+                return fastapi_path(SweetResponse, db.query(Sweet).order_by(Sweet.id).all())
+
+        def fast_sweets():
+            with Session(engine) as db:
+                return rows_json(SweetResponse, db.execute(select(Sweet.__table__).order_by(Sweet.id)).mappings())
+
+        def orm_orders():
+            with Session(engine) as db:
+                return fastapi_path(OrderResponse, db.query(Order).order_by(Order.created_at.desc()).all())
+
+        def fast_orders():
+            with Session(engine) as db:
+                return orders_json(db)
+
+        assert orm_sweets() == fast_sweets()
+        assert orm_orders() == fast_orders()
+        results = [
+            ("sweets", best_of(args.repeat, orm_sweets), best_of(args.repeat, fast_sweets)),
+            ("orders", best_of(args.repeat, orm_orders), best_of(args.repeat, fast_orders)),
+        ]
+        engine.dispose()
+
+    print("=" * 60)
+    print(f"📦 {args.rows:,} rows per list (orders carry 2 items each)")
+    for name, orm, fast in results:
+        print(f"   {name}: response_model {orm:8.1f} ms   rows_json {fast:8.1f} ms   ({orm / fast:.1f}x)")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark: purchase throughput on one hot SKU, single stock row vs sharded counters
+
+Usage: python benchmarks/bench_stock_shards.py [--database-url URL] [--shards N ...] [--purchases N] [--threads N] [--hold-ms MS]
+
+Each purchase takes one unit and then keeps its transaction open for
+--hold-ms, standing in for the rest of an order (items, payment row) while
+the stock row lock is held. Defaults to a temporary SQLite file, where one
+database-wide write lock serializes every variant alike; point
+--database-url at a scratch Postgres database to measure row-lock contention.
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the backend directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.core.database import Base
+from app.models.models import Sweet
+from app.services.inventory import decrement_stock
+from app.services.stock_shards import configure_shards, shard_layout
+
+
+def run(SessionLocal, shards: int, purchases: int, threads: int, hold_ms: float):
+    with SessionLocal() as db:
+        sweet = Sweet(name="Kaju Katli", category="Bench", price=1.0, quantity=purchases)
+        db.add(sweet)
+        db.commit()
+        sweet_id = sweet.id
+        configure_shards(db, sweet_id, shards)
+        db.commit()
+
+    def purchase(_):
+        with SessionLocal() as db:
+            started = time.perf_counter()
+            try:
+                decrement_stock(db, sweet_id, 1)
+                time.sleep(hold_ms / 1000)
+                db.commit()
+            except HTTPException:
+                db.rollback()
+                return None
+            return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        latencies = sorted(latency for latency in executor.map(purchase, range(purchases)) if latency is not None)
+    elapsed = time.perf_counter() - started
+
+    with SessionLocal() as db:
+        remaining = sum(shard_layout(db, sweet_id)) if shards > 1 else db.get(Sweet, sweet_id).quantity
+        configure_shards(db, sweet_id, 1)
+        db.delete(db.get(Sweet, sweet_id))
+        db.commit()
+    return {
+        "throughput": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000 if latencies else 0.0,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000 if latencies else 0.0,
+        "sold": len(latencies),
+        "remaining": remaining,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--database-url")
+    parser.add_argument("--shards", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--purchases", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=32)
+    parser.add_argument("--hold-ms", type=float, default=2.0)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        url = args.database_url or f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        options = {"pool_size": args.threads}
+        if url.startswith("sqlite"):
+            options["connect_args"] = {"check_same_thread": False, "timeout": 60}
+        engine = create_engine(url, **options)
+        Base.metadata.create_all(bind=engine)
+        SessionLocal = sessionmaker(bind=engine)
+
+        print("=" * 60)
+        print(f"🔥 {args.purchases} purchases of one SKU, {args.threads} threads, {args.hold_ms:g} ms per transaction")
+        for shards in args.shards:
+            result = run(SessionLocal, shards, args.purchases, args.threads, args.hold_ms)
+            label = "single row" if shards == 1 else f"{shards} shards"
+            print(
+                f"   {label:10} {result['throughput']:8.0f} req/s   p50 {result['p50_ms']:7.1f} ms   "
+                f"p99 {result['p99_ms']:7.1f} ms   sold {result['sold']:5}   left {result['remaining']}"
+            )
+        print("=" * 60)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
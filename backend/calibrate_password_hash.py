@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Calibrate the password hash cost for this machine
+Benchmarks the password CryptContext and recommends the strongest cost
+that still verifies a password within the per-login latency budget
+"""
+
+import argparse
+import statistics
+import sys
+import os
+import time
+
+# Add the app directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from passlib.registry import get_crypt_handler
+from app.core.config import settings
+from app.services.auth import build_crypt_context
+
+SAMPLE_PASSWORD = "correct horse battery staple"
+
+
+def measure(scheme: str, rounds: int, samples: int) -> float:
+    """Return the median verify time in milliseconds for a scheme and cost"""
+    context = build_crypt_context(scheme, rounds)
+    hashed = context.hash(SAMPLE_PASSWORD)
+    timings = []
+    for _ in range(samples):
+        started = time.perf_counter()
+        context.verify(SAMPLE_PASSWORD, hashed)
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def calibrate_log2(scheme: str, budget_ms: float, samples: int):
+    """Walk exponential-cost schemes (bcrypt) upwards until the budget is exceeded"""
+    handler = get_crypt_handler(scheme)
+    best = None
+    for rounds in range(handler.min_rounds, handler.max_rounds + 1):
+        elapsed = measure(scheme, rounds, samples)
+        print(f"   {scheme} rounds={rounds:<8} {elapsed:8.1f} ms")
+        if elapsed > budget_ms:
+            break
+        best = (rounds, elapsed)
+    return best
+
+
+def calibrate_linear(scheme: str, budget_ms: float, samples: int):
+    """Extrapolate linear-cost schemes (pbkdf2, sha512_crypt) from one measurement"""
+    handler = get_crypt_handler(scheme)
+    reference = handler.default_rounds
+    elapsed = measure(scheme, reference, samples)
+    print(f"   {scheme} rounds={reference:<8} {elapsed:8.1f} ms")
+
+    rounds = int(reference * budget_ms / elapsed * 0.9)
+    rounds = max(handler.min_rounds, min(handler.max_rounds, rounds))
+    elapsed = measure(scheme, rounds, samples)
+    print(f"   {scheme} rounds={rounds:<8} {elapsed:8.1f} ms")
+    if elapsed > budget_ms:
+        return None
+    return rounds, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recommend a password hash cost for a login latency budget")
+    parser.add_argument("--budget-ms", type=float, default=settings.login_latency_budget_ms,
+                        help="maximum time one password verification may take")
+    parser.add_argument("--scheme", nargs="+", default=[settings.password_hash_scheme],
+                        help="passlib schemes to benchmark, e.g. bcrypt pbkdf2_sha256")
+    parser.add_argument("--samples", type=int, default=5, help="verifications per measurement")
+    args = parser.parse_args()
+
+    print("🔐 Kata Sweet Shop - Password Hash Calibration")
+    print("=" * 60)
+    print(f"   CPU count: {os.cpu_count()}")
+    print(f"   Budget: {args.budget_ms:.0f} ms per login")
+    print(f"   Current: {settings.password_hash_scheme} rounds={settings.password_hash_rounds}")
+
+    recommendations = []
+    for scheme in args.scheme:
+        print(f"\n⏱️  Benchmarking {scheme}...")
+        handler = get_crypt_handler(scheme)
+        if getattr(handler, "rounds_cost", "linear") == "log2":
+            result = calibrate_log2(scheme, args.budget_ms, args.samples)
+        else:
+            result = calibrate_linear(scheme, args.budget_ms, args.samples)
+        if result is None:
+            print(f"   ⚠️  No {scheme} cost fits within {args.budget_ms:.0f} ms")
+            continue
+        recommendations.append((scheme,) + result)
+
+    if not recommendations:
+        print("\n❌ No scheme meets the latency budget on this machine")
+        sys.exit(1)
+
+    print("\n✅ Recommendations:")
+    for scheme, rounds, elapsed in recommendations:
+        per_core = 1000 / elapsed if elapsed else float("inf")
+        print(f"   PASSWORD_HASH_SCHEME={scheme} PASSWORD_HASH_ROUNDS={rounds}"
+              f"   ({elapsed:.1f} ms, ~{per_core:.1f} logins/s per core)")
+
+    print("\n💡 Set these in backend/.env. Existing hashes are upgraded on each user's next login.")
+
+
+if __name__ == "__main__":
+    main()
@@ -23,6 +23,10 @@ def create_tables():
         print("   - sweets (Sweet products)")
         print("   - orders (Customer orders)")
         print("   - order_items (Individual items in orders)")
+        print("   - refresh_tokens (Hashed, rotating login sessions)")
+        print("   - stock_holds (Cart reservations with expiry)")
+        print("   - sweet_stock_shards (Split stock counters for hot sweets)")
+        print("   - idempotency_keys (Stored order responses for retried requests)")
         
         print("\n🔗 Table relationships:")
         print("   - users → orders (one-to-many)")
@@ -44,6 +48,7 @@ def show_table_schema():
     print("   - username (Unique)")
     print("   - hashed_password")
     print("   - is_admin (Boolean)")
+    print("   - token_version (bumped to revoke issued tokens)")
     print("   - created_at, updated_at")
     
     print("\n2. SWEETS table:")
@@ -52,6 +57,7 @@ def show_table_schema():
     print("   - category")
     print("   - price")
     print("   - quantity")
+    print("   - stock_shards (>1 splits stock over sweet_stock_shards)")
     print("   - description")
     print("   - image")
     print("   - created_at, updated_at")
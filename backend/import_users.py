@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Bulk-import customer accounts for Kata Sweet Shop
+Reads NDJSON or CSV rows with email, username and password (or an
+existing hashed_password) and inserts them in large batches
+"""
+
+import argparse
+import sys
+import os
+
+# Add the app directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.services.password_pool import PasswordPool, import_pool
+from app.services.user_import import import_users
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-import users from NDJSON or CSV")
+    parser.add_argument("path", help="file with one user per line/row")
+    parser.add_argument("--format", choices=["ndjson", "csv"],
+                        help="input format (default: from the file extension)")
+    parser.add_argument("--batch-size", type=int, help="rows per uniqueness check and insert")
+    parser.add_argument("--workers", type=int, help="password hashing processes")
+    args = parser.parse_args()
+
+    fmt = args.format or ("csv" if args.path.lower().endswith(".csv") else "ndjson")
+
+    print("🏪 Kata Sweet Shop - Bulk User Import")
+    print("=" * 60)
+    print(f"📥 Importing {args.path} ({fmt})...")
+
+    pool = PasswordPool(args.workers, settings.user_import_max_pending) if args.workers else import_pool
+    db = SessionLocal()
+    try:
+        with open(args.path, "rb") as stream:
+            result = import_users(db, stream, fmt, batch_size=args.batch_size, pool=pool)
+    finally:
+        db.close()
+        pool.shutdown()
+
+    print(f"\n✅ Imported: {result.imported}")
+    print(f"❌ Failed:   {result.failed}")
+    for error in result.errors:
+        print(f"   line {error.line}: {error.email or '-'}: {error.error}")
+    if result.failed > len(result.errors):
+        print(f"   ... {result.failed - len(result.errors)} more errors not shown")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,12 +13,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
 
 from app.core.database import SessionLocal
 from app.models.models import User, Sweet, Order, OrderItem
-from passlib.context import CryptContext
-
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+from app.services.auth import get_password_hash as hash_password
 
 def create_sample_data():
     """Create sample users and sweets"""
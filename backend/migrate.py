@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+Apply the database schema and seed data for Kata Sweet Shop
+Run once per deploy; app workers then start with SCHEMA_STARTUP_MODE=check
+and skip all schema work
+"""
+
+import argparse
+import sys
+import os
+
+# Add the app directory to the Python path
+sys.path.append(os.path.join(os.path.dirname(__file__), 'app'))
+
+from app.core.database import engine
+from app.core.schema import migrate, recorded_fingerprint, schema_fingerprint
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Create tables, seed defaults and record the schema fingerprint")
+    parser.add_argument("--no-seed", action="store_true", help="skip the default admin and sweets")
+    parser.add_argument("--check", action="store_true", help="only report whether a migration is needed")
+    args = parser.parse_args()
+
+    print("🏪 Kata Sweet Shop - Database Migration")
+    print("=" * 60)
+
+    current = schema_fingerprint(engine)
+    recorded = recorded_fingerprint(engine)
+    print(f"   Models fingerprint:   {current[:16]}")
+    print(f"   Recorded fingerprint: {recorded[:16] if recorded else '(none)'}")
+
+    if args.check:
+        if recorded == current:
+            print("\n✅ Schema is up to date")
+            return
+        print("\n⚠️  Schema is out of date; run `python migrate.py`")
+        sys.exit(1)
+
+    try:
+        migrate(engine, seed=not args.no_seed)
+    except Exception as e:
+        print(f"\n❌ Migration failed: {str(e)}")
+        sys.exit(1)
+
+    print("\n✅ Schema applied and fingerprint recorded")
+
+
+if __name__ == "__main__":
+    main()
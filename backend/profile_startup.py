@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Import-time profile for the FastAPI app
+Runs `python -X importtime -c "import app.main"` in a fresh interpreter and
+reports total cold-start import time plus the slowest modules
+"""
+
+import argparse
+import subprocess
+import sys
+import os
+
+
+def profile_imports(module: str):
+    """Return (total_us, [(cumulative_us, self_us, name), ...]) for importing a module"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+
+    entries = []
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        entry = (int(cumulative_us), int(self_us), name.strip())
+        entries.append(entry)
+        # Nesting is shown by indentation; top-level cumulative times add up to the total
+        if not name[1:].startswith(" "):
+            total += entry[0]
+    return total, entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report import-time cost of the app")
+    parser.add_argument("--module", default="app.main")
+    parser.add_argument("--top", type=int, default=20, help="number of modules to list")
+    args = parser.parse_args()
+
+    total, entries = profile_imports(args.module)
+
+    print(f"⏱️  Import profile for {args.module}")
+    print("=" * 60)
+    print(f"   Total import time: {total / 1000:.1f} ms ({len(entries)} modules)")
+
+    print("\n📦 Slowest by cumulative time:")
+    for cumulative_us, self_us, name in sorted(entries, reverse=True)[:args.top]:
+        print(f"   {cumulative_us / 1000:8.1f} ms  {name}")
+
+    print("\n🔥 Slowest by self time:")
+    for cumulative_us, self_us, name in sorted(entries, key=lambda e: e[1], reverse=True)[:args.top]:
+        print(f"   {self_us / 1000:8.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -28,6 +28,10 @@ def create_tables():
         print("   - sweets (Sweet products)")
         print("   - orders (Customer orders)")
         print("   - order_items (Individual items in orders)")
+        print("   - refresh_tokens (Hashed, rotating login sessions)")
+        print("   - stock_holds (Cart reservations with expiry)")
+        print("   - sweet_stock_shards (Split stock counters for hot sweets)")
+        print("   - idempotency_keys (Stored order responses for retried requests)")
         
         print("\n🔗 Table relationships:")
         print("   - users → orders (one-to-many)")
@@ -0,0 +1,131 @@
+from contextlib import contextmanager
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.main import app
+from app.core.database import get_db, Base
+from app.services.principals import principal_cache
+from app.services.auth import token_claims_cache
+from app.services.throttle import login_throttle
+from app.services.catalog import catalog
+from app.services.search_index import search_index
+from app.services.facets import facet_cache
+from app.services.orders import order_count_cache
+from app.services.suggest import popularity_cache
+from app.models.models import User
+from app.services.auth import get_password_hash
+
+# Create test database
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+engine = create_engine(
+    SQLALCHEMY_DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    poolclass=StaticPool,
+)
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+Base.metadata.create_all(bind=engine)
+
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+
+app.dependency_overrides[get_db] = override_get_db
+client = TestClient(app)
+
+
+@contextmanager
+def count_queries():
+    """Collect the SQL statements run on the test engine inside the block"""
+    statements = []
+    
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+    
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+@contextmanager
+def assert_max_queries(limit):
+    """Fail when the block runs more than ``limit`` statements, e.g. an N+1 lazy load"""
+    with count_queries() as statements:
+        yield statements
+    assert len(statements) <= limit, f"{len(statements)} queries (limit {limit}):\n" + "\n".join(statements)
+
+
+@pytest.fixture
+def test_db():
+    Base.metadata.create_all(bind=engine)
+    principal_cache.clear()
+    token_claims_cache.clear()
+    login_throttle.reset()
+    catalog.reset()
+    search_index.clear()
+    facet_cache.clear()
+    order_count_cache.clear()
+    popularity_cache.clear()
+    yield
+    Base.metadata.drop_all(bind=engine)
+
+
+@pytest.fixture
+def auth_headers(test_db):
+    """Create a test user and return auth headers"""
+    # Register and login user
+    client.post(
+        "/api/auth/register",
+        json={
+            "email": "test@example.com",
+            "username": "testuser",
+            "password": "testpass123"
+        }
+    )
+    
+    response = client.post(
+        "/api/auth/login",
+        data={
+            "username": "test@example.com",
+            "password": "testpass123"
+        }
+    )
+    token = response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture
+def admin_headers(test_db):
+    """Create an admin user and return auth headers"""
+    db = TestingSessionLocal()
+    
+    # Create admin user directly in database
+    admin_user = User(
+        email="admin@example.com",
+        username="admin",
+        hashed_password=get_password_hash("adminpass123"),
+        is_admin=True
+    )
+    db.add(admin_user)
+    db.commit()
+    db.close()
+    
+    # Login admin
+    response = client.post(
+        "/api/auth/login",
+        data={
+            "username": "admin@example.com",
+            "password": "adminpass123"
+        }
+    )
+    token = response.json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
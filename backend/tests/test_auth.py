@@ -0,0 +1,400 @@
+from datetime import datetime, timedelta, timezone
+import pytest
+from fastapi import HTTPException
+from conftest import client, TestingSessionLocal
+from app.models.models import RefreshToken, User
+from app.services.principals import principal_cache
+from app.services.password_pool import password_pool
+from app.services.refresh_tokens import _hash_token, purge_refresh_tokens
+from app.services.throttle import TokenBucketLimiter
+from app.services.auth import (
+    build_crypt_context, create_access_token, pwd_context, token_claims_cache, verify_token
+)
+
+
+def test_principal_cache_serves_repeat_requests(auth_headers):
+    """Test that repeated authenticated requests reuse the cached principal"""
+    client.get("/api/orders/", headers=auth_headers)
+    misses = principal_cache.misses
+    hits = principal_cache.hits
+
+    client.get("/api/orders/", headers=auth_headers)
+    client.get("/api/orders/", headers=auth_headers)
+
+    assert principal_cache.misses == misses
+    assert principal_cache.hits == hits + 2
+    assert client.get("/metrics").json()["principal_cache"]["hits"] >= 2
+
+
+def test_admin_flag_change_revokes_old_tokens(auth_headers):
+    """Test that a promotion only applies to tokens issued after it"""
+    sweet = {"name": "Promo Sweet", "category": "Test", "price": 10.0, "quantity": 1}
+    response = client.post("/api/sweets/", json=sweet, headers=auth_headers)
+    assert response.status_code == 403
+
+    db = TestingSessionLocal()
+    user = db.query(User).filter(User.email == "test@example.com").first()
+    user.is_admin = True
+    db.commit()
+    db.close()
+
+    response = client.post("/api/sweets/", json=sweet, headers=auth_headers)
+    assert response.status_code == 401
+
+    response = client.post(
+        "/api/auth/login",
+        data={"username": "test@example.com", "password": "testpass123"}
+    )
+    headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    response = client.post("/api/sweets/", json=sweet, headers=headers)
+    assert response.status_code == 200
+
+
+def test_demoted_admin_loses_access(admin_headers):
+    """Test that demoting an admin revokes the admin tokens already issued"""
+    sweet = {"name": "Demo Sweet", "category": "Test", "price": 10.0, "quantity": 1}
+    assert client.post("/api/sweets/", json=sweet, headers=admin_headers).status_code == 200
+
+    db = TestingSessionLocal()
+    user = db.query(User).filter(User.email == "admin@example.com").first()
+    user.is_admin = False
+    db.commit()
+    db.close()
+
+    response = client.post("/api/sweets/", json=sweet, headers=admin_headers)
+    assert response.status_code in (401, 403)
+    assert client.get("/api/orders/admin", headers=admin_headers).status_code in (401, 403)
+
+
+def test_revoke_tokens_rejects_old_tokens(auth_headers, admin_headers):
+    """Test that bumping the token version revokes previously issued tokens"""
+    assert client.get("/api/orders/", headers=auth_headers).status_code == 200
+
+    db = TestingSessionLocal()
+    user = db.query(User).filter(User.email == "test@example.com").first()
+    user_id = user.id
+    db.close()
+
+    response = client.post(f"/api/auth/users/{user_id}/revoke-tokens", headers=auth_headers)
+    assert response.status_code == 403
+
+    response = client.post(f"/api/auth/users/{user_id}/revoke-tokens", headers=admin_headers)
+    assert response.status_code == 200
+    assert client.get("/api/orders/", headers=auth_headers).status_code == 401
+    response = client.post("/api/sweets/1/purchase", json={"quantity": 1}, headers=auth_headers)
+    assert response.status_code == 401
+
+
+def test_principal_cache_invalidated_on_delete(auth_headers):
+    """Test that a deleted user can no longer authenticate with a live token"""
+    assert client.get("/api/orders/", headers=auth_headers).status_code == 200
+
+    db = TestingSessionLocal()
+    user = db.query(User).filter(User.email == "test@example.com").first()
+    db.delete(user)
+    db.commit()
+    db.close()
+
+    assert client.get("/api/orders/", headers=auth_headers).status_code == 401
+
+
+def test_login_rejected_when_password_pool_saturated(auth_headers):
+    """Test that logins shed load with 503 once the hashing queue is full"""
+    max_pending = password_pool.max_pending
+    password_pool.max_pending = 0
+    try:
+        response = client.post(
+            "/api/auth/login",
+            data={"username": "test@example.com", "password": "testpass123"}
+        )
+    finally:
+        password_pool.max_pending = max_pending
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "1"
+
+
+def test_password_pool_metrics(auth_headers):
+    """Test that queue wait and hash time are reported separately"""
+    stats = client.get("/metrics").json()["password_pool"]
+    assert stats["completed"] >= 2
+    assert stats["avg_hash_ms"] > 0
+    assert "avg_queue_wait_ms" in stats
+
+
+def test_login_rehashes_outdated_password_hash(test_db):
+    """Test that a hash with a stale cost is upgraded on successful login"""
+    legacy_context = build_crypt_context("bcrypt", 4)
+    db = TestingSessionLocal()
+    db.add(User(
+        email="legacy@example.com",
+        username="legacy",
+        hashed_password=legacy_context.hash("legacypass123")
+    ))
+    db.commit()
+    db.close()
+
+    response = client.post(
+        "/api/auth/login",
+        data={"username": "legacy@example.com", "password": "legacypass123"}
+    )
+    assert response.status_code == 200
+
+    db = TestingSessionLocal()
+    user = db.query(User).filter(User.email == "legacy@example.com").first()
+    db.close()
+    assert not pwd_context.needs_update(user.hashed_password)
+    assert pwd_context.verify("legacypass123", user.hashed_password)
+
+
+def test_token_claims_cache_reuses_decoded_claims():
+    """Test that a repeated bearer token is decoded only once"""
+    token = create_access_token(data={"sub": "cached@example.com", "uid": 7, "ver": 0})
+    error = HTTPException(status_code=401)
+    token_claims_cache.clear()
+
+    first = verify_token(token, error)
+    hits = token_claims_cache.hits
+    second = verify_token(token, error)
+
+    assert second == first
+    assert second.user_id == 7
+    assert token_claims_cache.hits == hits + 1
+
+
+def test_token_claims_cache_skips_expired_tokens():
+    """Test that expired tokens are rejected and never cached"""
+    token = create_access_token(data={"sub": "old@example.com"}, expires_delta=timedelta(seconds=-1))
+    token_claims_cache.clear()
+    with pytest.raises(HTTPException):
+        verify_token(token, HTTPException(status_code=401))
+    assert token_claims_cache.stats()["entries"] == 0
+
+
+def _login(email: str, password: str) -> dict:
+    response = client.post("/api/auth/login", data={"username": email, "password": password})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_refresh_token_rotation(auth_headers):
+    """Test that a refresh token yields new tokens without a password"""
+    tokens = _login("test@example.com", "testpass123")
+    assert tokens["refresh_token"]
+
+    response = client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+    refreshed = response.json()
+    assert refreshed["refresh_token"] != tokens["refresh_token"]
+
+    headers = {"Authorization": f"Bearer {refreshed['access_token']}"}
+    assert client.get("/api/orders/", headers=headers).status_code == 200
+
+
+def test_refresh_token_reuse_revokes_family(auth_headers):
+    """Test that replaying a rotated refresh token ends the whole session"""
+    tokens = _login("test@example.com", "testpass123")
+    first = tokens["refresh_token"]
+    second = client.post("/api/auth/refresh", json={"refresh_token": first}).json()["refresh_token"]
+
+    response = client.post("/api/auth/refresh", json={"refresh_token": first})
+    assert response.status_code == 401
+    assert "reuse" in response.json()["detail"]
+
+    response = client.post("/api/auth/refresh", json={"refresh_token": second})
+    assert response.status_code == 401
+
+
+def test_purge_drops_expired_and_long_revoked_refresh_tokens(auth_headers):
+    """Test the purge keeps live and recently revoked tokens, so reuse is still detected"""
+    first = _login("test@example.com", "testpass123")["refresh_token"]
+    second = client.post("/api/auth/refresh", json={"refresh_token": first}).json()["refresh_token"]
+    expired = _login("test@example.com", "testpass123")["refresh_token"]
+    stale = _login("test@example.com", "testpass123")["refresh_token"]
+    client.post("/api/auth/logout", json={"refresh_token": stale})
+
+    db = TestingSessionLocal()
+    now = datetime.now(timezone.utc)
+    db.query(RefreshToken).filter(RefreshToken.token_hash == _hash_token(expired)).update(
+        {RefreshToken.expires_at: now - timedelta(seconds=1)}
+    )
+    db.query(RefreshToken).filter(RefreshToken.token_hash == _hash_token(stale)).update(
+        {RefreshToken.revoked_at: now - timedelta(days=2)}
+    )
+    db.commit()
+    before = db.query(RefreshToken).count()
+    assert purge_refresh_tokens(db, batch_size=1) == 2
+    assert db.query(RefreshToken).count() == before - 2
+    db.close()
+
+    response = client.post("/api/auth/refresh", json={"refresh_token": expired})
+    assert response.json()["detail"] == "Invalid refresh token"
+    # The rotated token is still on record, so replaying it ends the session
+    response = client.post("/api/auth/refresh", json={"refresh_token": first})
+    assert "reuse" in response.json()["detail"]
+    response = client.post("/api/auth/refresh", json={"refresh_token": second})
+    assert response.status_code == 401
+
+
+def test_logout_revokes_refresh_token(auth_headers):
+    """Test that a logged-out refresh token can no longer be used"""
+    tokens = _login("test@example.com", "testpass123")
+    response = client.post("/api/auth/logout", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 200
+
+    response = client.post("/api/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert response.status_code == 401
+
+
+def test_login_throttle_rejects_before_hashing(auth_headers):
+    """Test that a password-guessing burst is cut off without running bcrypt"""
+    for _ in range(4):
+        response = client.post(
+            "/api/auth/login",
+            data={"username": "test@example.com", "password": "wrong-password"}
+        )
+        assert response.status_code == 401
+
+    completed = password_pool.stats()["completed"]
+    response = client.post(
+        "/api/auth/login",
+        data={"username": "TEST@example.com", "password": "wrong-password"}
+    )
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
+    assert password_pool.stats()["completed"] == completed
+
+
+def test_token_bucket_sweep_drops_refilled_buckets():
+    """Test that idle, fully refilled buckets are swept from memory"""
+    limiter = TokenBucketLimiter(rate_per_minute=6000, burst=2, sweep_interval_seconds=0)
+    assert limiter.acquire("10.0.0.1") == 0
+    assert limiter.acquire("10.0.0.1") == 0
+    assert limiter.acquire("10.0.0.1") > 0
+
+    limiter._sweep(limiter._next_sweep + 1)
+    assert limiter.stats()["buckets"] == 0
+
+
+def test_bulk_import_ndjson_reports_row_errors(auth_headers, admin_headers):
+    """Test that a bulk import inserts valid rows and reports bad ones per line"""
+    legacy_hash = build_crypt_context("bcrypt", 4).hash("migrated123")
+    body = "\n".join([
+        '{"email": "new1@example.com", "username": "new1", "password": "secret123"}',
+        '{"email": "new2@example.com", "username": "new2", "hashed_password": "%s"}' % legacy_hash,
+        '{"email": "test@example.com", "username": "dup", "password": "secret123"}',
+        '{"email": "not-an-email", "username": "bad", "password": "secret123"}',
+        '{"email": "new3@example.com", "username": "new1", "password": "secret123"}',
+        '{not json',
+    ])
+    response = client.post(
+        "/api/auth/users/import",
+        content=body,
+        headers={**admin_headers, "Content-Type": "application/x-ndjson"}
+    )
+    assert response.status_code == 200
+    result = response.json()
+    assert result["imported"] == 2
+    assert result["failed"] == 4
+    assert sorted(error["line"] for error in result["errors"]) == [3, 4, 5, 6]
+
+    assert _login("new1@example.com", "secret123")["access_token"]
+    assert _login("new2@example.com", "migrated123")["access_token"]
+
+
+def test_bulk_import_rejects_malformed_rows(admin_headers):
+    """Test that extra CSV fields, non-text emails and unknown hashes are row errors, not crashes"""
+    def imported(body, content_type):
+        response = client.post(
+            "/api/auth/users/import",
+            content=body,
+            headers={**admin_headers, "Content-Type": content_type}
+        )
+        assert response.status_code == 200
+        return response.json()
+
+    result = imported(
+        "email,username,password\nwide@example.com,wide,secret123,extra\nok@example.com,ok,secret123\n",
+        "text/csv"
+    )
+    assert (result["imported"], result["failed"]) == (1, 1)
+    assert result["errors"][0] == {"line": 2, "email": "wide@example.com", "error": "row has more fields than the header"}
+
+    result = imported("\n".join([
+        '{"email": 5, "username": "numeric", "password": "secret123"}',
+        '{"email": "plain@example.com", "username": "plain", "hashed_password": "not-a-hash"}',
+    ]), "application/x-ndjson")
+    assert result["failed"] == 2
+    assert [(error["line"], error["email"]) for error in result["errors"]] == [(1, None), (2, "plain@example.com")]
+    response = client.post("/api/auth/login", data={"username": "plain@example.com", "password": "not-a-hash"})
+    assert response.status_code == 401
+
+
+def test_bulk_import_reports_undecodable_and_oversized_rows(admin_headers):
+    """Test that invalid UTF-8 and over-long CSV fields fail their own line, not the import"""
+    def imported(body, content_type):
+        response = client.post(
+            "/api/auth/users/import",
+            content=body,
+            headers={**admin_headers, "Content-Type": content_type}
+        )
+        assert response.status_code == 200
+        return response.json()
+
+    result = imported(
+        b'{"email": "bad\xff@example.com", "username": "badbytes", "password": "secret123"}\n'
+        b'{"email": "utf1@example.com", "username": "utf1", "password": "secret123"}\n',
+        "application/x-ndjson"
+    )
+    assert (result["imported"], result["failed"]) == (1, 1)
+    assert result["errors"][0] == {"line": 1, "email": None, "error": "invalid UTF-8"}
+
+    result = imported(
+        b"email,username,password\n"
+        b"bad\xfe@example.com,badcsv,secret123\n"
+        b"long@example.com," + b"x" * 200_000 + b",secret123\n"
+        b"utf2@example.com,utf2,secret123\n",
+        "text/csv"
+    )
+    assert (result["imported"], result["failed"]) == (1, 2)
+    assert [error["line"] for error in result["errors"]] == [2, 3]
+    assert result["errors"][0]["error"] == "invalid UTF-8"
+    assert result["errors"][1]["error"].startswith("invalid CSV: field larger than field limit")
+
+
+def test_bulk_import_streams_chunked_upload(admin_headers):
+    """Test that rows split across request chunks are reassembled as the body arrives"""
+    lines = [f'{{"email": "chunk{index}@example.com", "username": "chunk{index}", "password": "secret123"}}\n'
+             for index in range(5)]
+    body = "".join(lines).encode()
+    response = client.post(
+        "/api/auth/users/import",
+        content=(body[offset:offset + 7] for offset in range(0, len(body), 7)),
+        headers={**admin_headers, "Content-Type": "application/x-ndjson"}
+    )
+    assert response.json() == {"imported": 5, "failed": 0, "errors": []}
+
+
+def test_bulk_import_csv(auth_headers, admin_headers):
+    """Test CSV uploads, unsupported content types and non-admin callers"""
+    body = "email,username,password\ncsv1@example.com,csv1,secret123\n"
+    response = client.post(
+        "/api/auth/users/import",
+        content=body,
+        headers={**admin_headers, "Content-Type": "text/csv"}
+    )
+    assert response.status_code == 200
+    assert response.json()["imported"] == 1
+
+    response = client.post(
+        "/api/auth/users/import",
+        content=body,
+        headers={**admin_headers, "Content-Type": "application/xml"}
+    )
+    assert response.status_code == 415
+
+    response = client.post(
+        "/api/auth/users/import",
+        content=body,
+        headers={**auth_headers, "Content-Type": "text/csv"}
+    )
+    assert response.status_code == 403
@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta, timezone
+from conftest import TestingSessionLocal, assert_max_queries, client
+from app.models.models import IdempotencyKey
+from app.services.idempotency import purge_expired_keys
+
+
+def _create_sweet(admin_headers, quantity=10):
+    response = client.post(
+        "/api/sweets/",
+        json={"name": "Retry Sweet", "category": "Test", "price": 10.0, "quantity": quantity},
+        headers=admin_headers
+    )
+    return response.json()["id"]
+
+
+def _order(headers, sweet_id, key, quantity=2):
+    return client.post(
+        "/api/orders/",
+        json={
+            "total_amount": 20.0,
+            "customer_name": "Test User",
+            "order_items": [{
+                "sweet_id": sweet_id, "sweet_name": "Retry Sweet", "selected_quantity": "250g",
+                "quantity": quantity, "price": 10.0
+            }]
+        },
+        headers={**headers, "Idempotency-Key": key}
+    )
+
+
+def _stock(sweet_id):
+    return client.get(f"/api/sweets/{sweet_id}").json()["quantity"]
+
+
+def test_retry_replays_stored_order(auth_headers, admin_headers):
+    """Test a retried order returns the first response and takes stock once"""
+    sweet_id = _create_sweet(admin_headers)
+    first = _order(auth_headers, sweet_id, "checkout-1")
+    assert first.status_code == 200
+    assert "Idempotent-Replayed" not in first.headers
+    
+    # The replay is one lookup on the unique (user_id, key) index
+    with assert_max_queries(1):
+        retry = _order(auth_headers, sweet_id, "checkout-1")
+    assert retry.status_code == 200
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert retry.content == first.content
+    assert _stock(sweet_id) == 8
+    assert len(client.get("/api/orders/", headers=auth_headers).json()) == 1
+    
+    # A new key is a new order; keys are scoped per user
+    assert _order(auth_headers, sweet_id, "checkout-2").json()["id"] != first.json()["id"]
+    assert "Idempotent-Replayed" not in _order(admin_headers, sweet_id, "checkout-1").headers
+    assert _stock(sweet_id) == 4
+
+
+def test_key_reused_with_different_request_rejected(auth_headers, admin_headers):
+    """Test a key cannot be replayed for a different order body"""
+    sweet_id = _create_sweet(admin_headers)
+    assert _order(auth_headers, sweet_id, "checkout-1").status_code == 200
+    response = _order(auth_headers, sweet_id, "checkout-1", quantity=3)
+    assert response.status_code == 400
+    assert _stock(sweet_id) == 8
+
+
+def test_failed_order_does_not_store_key(auth_headers, admin_headers):
+    """Test a rejected order can be retried with the same key once stock is back"""
+    sweet_id = _create_sweet(admin_headers, quantity=1)
+    assert _order(auth_headers, sweet_id, "checkout-1").status_code == 400
+    client.post(f"/api/sweets/{sweet_id}/restock", json={"quantity": 5}, headers=admin_headers)
+    response = _order(auth_headers, sweet_id, "checkout-1")
+    assert response.status_code == 200
+    assert "Idempotent-Replayed" not in response.headers
+
+
+def test_expired_keys_purged_and_reusable(auth_headers, admin_headers):
+    """Test expired keys are purged in batches and no longer replay"""
+    sweet_id = _create_sweet(admin_headers)
+    for key in ["a", "b", "c"]:
+        _order(auth_headers, sweet_id, key, quantity=1)
+    
+    db = TestingSessionLocal()
+    db.query(IdempotencyKey).update({IdempotencyKey.expires_at: datetime.now(timezone.utc) - timedelta(seconds=1)})
+    db.commit()
+    
+    # An expired key that is still stored is treated as new
+    response = _order(auth_headers, sweet_id, "a", quantity=1)
+    assert "Idempotent-Replayed" not in response.headers
+    assert _stock(sweet_id) == 6
+    
+    assert purge_expired_keys(db, batch_size=1) == 2
+    assert [record.key for record in db.query(IdempotencyKey).all()] == ["a"]
+    db.close()
@@ -0,0 +1,66 @@
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.database import Base
+from app.models.models import Sweet
+from app.services.inventory import decrement_stock, increment_stock
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    # A real file database with one connection per thread, unlike the shared test engine
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'inventory.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+        pool_size=16,
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+def test_parallel_purchases_never_oversell(file_engine):
+    """Test hundreds of concurrent purchases of one SKU sell exactly the stock"""
+    with Session(file_engine) as db:
+        sweet = Sweet(name="Flash Sale Ladoo", category="Test", price=10.0, quantity=50)
+        db.add(sweet)
+        db.commit()
+        sweet_id = sweet.id
+    SessionLocal = sessionmaker(bind=file_engine)
+
+    def purchase(_):
+        with SessionLocal() as db:
+            try:
+                decrement_stock(db, sweet_id, 1)
+                db.commit()
+                return True
+            except HTTPException as exc:
+                assert exc.status_code == 400
+                return False
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        results = list(executor.map(purchase, range(300)))
+
+    assert results.count(True) == 50
+    with Session(file_engine) as db:
+        assert db.get(Sweet, sweet_id).quantity == 0
+
+
+def test_stock_updates_validate_input(file_engine):
+    """Test missing sweets and non-positive quantities are rejected"""
+    with Session(file_engine) as db:
+        db.add(Sweet(name="Barfi", category="Test", price=10.0, quantity=5))
+        db.commit()
+
+        assert increment_stock(db, 1, 3)["quantity"] == 8
+        with pytest.raises(HTTPException) as exc:
+            decrement_stock(db, 1, -2)
+        assert exc.value.status_code == 400
+        with pytest.raises(HTTPException) as exc:
+            decrement_stock(db, 999, 1)
+        assert exc.value.status_code == 404
+        with pytest.raises(HTTPException) as exc:
+            increment_stock(db, 999, 1)
+        assert exc.value.status_code == 404
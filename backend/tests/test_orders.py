@@ -0,0 +1,194 @@
+import csv
+import io
+import json
+from conftest import TestingSessionLocal, assert_max_queries, client, count_queries, engine
+from app.core.database import Base
+from app.models.models import Order, OrderItem
+from app.services.order_export import export_orders
+
+
+def _create_sweets(admin_headers, count, quantity=10):
+    return [
+        client.post(
+            "/api/sweets/",
+            json={"name": f"Order Sweet {index}", "category": "Test", "price": 5.0, "quantity": quantity},
+            headers=admin_headers
+        ).json()["id"]
+        for index in range(count)
+    ]
+
+
+def _order(headers, lines, **fields):
+    return client.post(
+        "/api/orders/",
+        json={
+            "total_amount": 10.0,
+            "customer_name": "Test User",
+            **fields,
+            "order_items": [
+                {"sweet_id": sweet_id, "sweet_name": "Order Sweet", "selected_quantity": "250g",
+                 "quantity": quantity, "price": 5.0}
+                for sweet_id, quantity in lines
+            ]
+        },
+        headers=headers
+    )
+
+
+def _stock(sweet_id):
+    return client.get(f"/api/sweets/{sweet_id}").json()["quantity"]
+
+
+def _count_order_statements(headers, lines):
+    with count_queries() as statements:
+        response = _order(headers, lines)
+    assert response.status_code == 200
+    return len(statements)
+
+
+def test_order_takes_stock_for_every_line(auth_headers, admin_headers):
+    """Test lines for the same sweet are combined and all stock is taken together"""
+    first, second = _create_sweets(admin_headers, 2)
+    response = _order(auth_headers, [(first, 2), (second, 3), (first, 4)])
+    assert response.status_code == 200
+    assert [item["quantity"] for item in response.json()["order_items"]] == [2, 3, 4]
+    assert _stock(first) == 4
+    assert _stock(second) == 7
+
+
+def test_failed_order_takes_nothing(auth_headers, admin_headers):
+    """Test an unavailable or unknown line rejects the whole order"""
+    first, second = _create_sweets(admin_headers, 2, quantity=5)
+
+    response = _order(auth_headers, [(first, 2), (second, 3), (second, 3)])
+    assert response.status_code == 400
+    assert "Available: 5, Requested: 6" in response.json()["detail"]
+
+    response = _order(auth_headers, [(first, 2), (999, 1)])
+    assert response.status_code == 404
+
+    assert _stock(first) == 5
+    assert _stock(second) == 5
+    assert client.get("/api/orders/", headers=auth_headers).json() == []
+
+
+def test_order_statements_do_not_grow_with_lines(auth_headers, admin_headers):
+    """Test order creation issues the same number of statements for 1 or 20 lines"""
+    sweet_ids = _create_sweets(admin_headers, 20)
+    _order(auth_headers, [(sweet_ids[0], 1)])  # warm the principal cache
+    single = _count_order_statements(auth_headers, [(sweet_ids[0], 1)])
+    many = _count_order_statements(auth_headers, [(sweet_id, 1) for sweet_id in sweet_ids])
+    assert many == single
+
+
+def test_order_reads_do_not_lazy_load_items(auth_headers, admin_headers):
+    """Test order reads issue a fixed number of queries however many orders and items exist"""
+    sweet_ids = _create_sweets(admin_headers, 3, quantity=20)
+    orders = [_order(auth_headers, [(sweet_id, 1) for sweet_id in sweet_ids]).json() for _ in range(15)]
+    client.get("/api/orders/", headers=admin_headers)  # warm the principal cache
+    
+    with assert_max_queries(2):
+        response = client.get("/api/orders/", headers=auth_headers)
+    assert sum(len(order["order_items"]) for order in response.json()) == 45
+    
+    # Page, its items, and the total (counted once, then cached)
+    with assert_max_queries(3):
+        response = client.get("/api/orders/admin", headers=admin_headers)
+    assert len(response.json()) == 15
+    
+    with assert_max_queries(1):
+        response = client.get(f"/api/orders/{orders[0]['id']}", headers=auth_headers)
+    assert len(response.json()["order_items"]) == 3
+
+
+def test_admin_orders_paginate_and_filter(auth_headers, admin_headers):
+    """Test the admin listing pages newest first with cursors and filters server side"""
+    (sweet_id,) = _create_sweets(admin_headers, 1, quantity=100)
+    ids = [
+        _order(auth_headers, [(sweet_id, 1)], total_amount=float(index * 10),
+               email="vip@example.com" if index % 2 else "other@example.com").json()["id"]
+        for index in range(7)
+    ]
+    client.delete(f"/api/orders/{ids[3]}", headers=auth_headers)
+    
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 3, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/api/orders/admin", params=params, headers=admin_headers)
+        assert response.status_code == 200
+        assert response.headers["X-Total-Count"] == "7"
+        seen += [order["id"] for order in response.json()]
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            break
+        last_page_prev = response.headers.get("X-Prev-Cursor")
+    assert seen == sorted(ids, reverse=True)
+    
+    response = client.get(
+        "/api/orders/admin", params={"limit": 3, "cursor": last_page_prev}, headers=admin_headers
+    )
+    assert [order["id"] for order in response.json()] == seen[:3]
+    
+    def listed(**params):
+        response = client.get("/api/orders/admin", params=params, headers=admin_headers)
+        return [order["id"] for order in response.json()], response.headers["X-Total-Count"]
+    
+    assert listed(status="cancelled") == ([ids[3]], "1")
+    assert listed(email="vip@example.com", min_total=30) == ([ids[5], ids[3]], "2")
+    assert listed(created_to="2000-01-01T00:00:00") == ([], "0")
+    
+    response = client.get("/api/orders/admin", params={"cursor": "bogus"}, headers=admin_headers)
+    assert response.status_code == 400
+    response = client.get("/api/orders/admin", headers=auth_headers)
+    assert response.status_code == 403
+
+
+def test_admin_order_export_streams_ndjson_and_csv(auth_headers, admin_headers):
+    """Test the export streams every matching order with its items in both formats"""
+    first, second = _create_sweets(admin_headers, 2, quantity=50)
+    ids = [_order(auth_headers, [(first, 1), (second, index + 1)]).json()["id"] for index in range(3)]
+    client.delete(f"/api/orders/{ids[1]}", headers=auth_headers)
+    
+    response = client.get("/api/orders/admin/export", headers=admin_headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    orders = [json.loads(line) for line in response.text.splitlines()]
+    assert [order["id"] for order in orders] == ids
+    assert [item["quantity"] for item in orders[2]["order_items"]] == [1, 3]
+    # Same documents as the JSON listing
+    listed = client.get("/api/orders/admin", headers=admin_headers).json()
+    assert orders == listed[::-1]
+    
+    response = client.get("/api/orders/admin/export", params={"format": "csv", "status": "pending"}, headers=admin_headers)
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [(int(row["order_id"]), int(row["quantity"])) for row in rows] == [(ids[0], 1), (ids[0], 1), (ids[2], 1), (ids[2], 3)]
+    
+    response = client.get("/api/orders/admin/export", params={"format": "xml"}, headers=admin_headers)
+    assert response.status_code == 422
+    response = client.get("/api/orders/admin/export", headers=auth_headers)
+    assert response.status_code == 403
+
+
+def test_export_batches_keep_orders_whole():
+    """Test orders whose items straddle a cursor batch are still exported once, complete"""
+    db = TestingSessionLocal()
+    Base.metadata.create_all(bind=engine)
+    try:
+        db.add_all([
+            Order(id=order_id, user_id=1, total_amount=1.0, order_items=[
+                OrderItem(sweet_id=1, sweet_name="Sweet", selected_quantity="250g", quantity=1, price=1.0)
+                for _ in range(order_id % 3)
+            ])
+            for order_id in range(1, 8)
+        ])
+        db.commit()
+        chunks = list(export_orders(engine, [], "ndjson", batch_size=2))
+        orders = [json.loads(line) for chunk in chunks for line in chunk.splitlines()]
+        assert len(chunks) == 4
+        assert [(order["id"], len(order["order_items"])) for order in orders] == [
+            (order_id, order_id % 3) for order_id in range(1, 8)
+        ]
+    finally:
+        db.close()
+        Base.metadata.drop_all(bind=engine)
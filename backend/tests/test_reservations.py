@@ -0,0 +1,93 @@
+from datetime import datetime, timedelta, timezone
+from conftest import client, TestingSessionLocal
+from app.models.models import StockHold, Sweet
+from app.services.reservations import sweep_expired_holds
+
+
+def _create_sweet(admin_headers, quantity=10):
+    response = client.post(
+        "/api/sweets/",
+        json={"name": "Reserved Sweet", "category": "Test", "price": 10.0, "quantity": quantity},
+        headers=admin_headers
+    )
+    return response.json()["id"]
+
+
+def _stock(sweet_id):
+    return client.get(f"/api/sweets/{sweet_id}").json()["quantity"]
+
+
+def test_reserve_extend_release(auth_headers, admin_headers):
+    """Test a hold takes stock, can be extended, and gives it back on release"""
+    sweet_id = _create_sweet(admin_headers)
+    
+    response = client.post("/api/reservations/", json={"sweet_id": sweet_id, "quantity": 4}, headers=auth_headers)
+    assert response.status_code == 201
+    hold = response.json()
+    assert _stock(sweet_id) == 6
+    
+    listed = client.get("/api/reservations/", headers=auth_headers).json()
+    assert [item["id"] for item in listed] == [hold["id"]]
+    
+    response = client.post(f"/api/reservations/{hold['id']}/extend", headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["expires_at"] >= hold["expires_at"]
+    
+    # Other users cannot touch the hold
+    response = client.delete(f"/api/reservations/{hold['id']}", headers=admin_headers)
+    assert response.status_code == 404
+    
+    response = client.delete(f"/api/reservations/{hold['id']}", headers=auth_headers)
+    assert response.status_code == 200
+    assert _stock(sweet_id) == 10
+    assert client.get("/api/reservations/", headers=auth_headers).json() == []
+
+
+def test_reserve_more_than_stock_rejected(auth_headers, admin_headers):
+    """Test holds cannot exceed available stock"""
+    sweet_id = _create_sweet(admin_headers, quantity=2)
+    response = client.post("/api/reservations/", json={"sweet_id": sweet_id, "quantity": 3}, headers=auth_headers)
+    assert response.status_code == 400
+    assert _stock(sweet_id) == 2
+
+
+def test_order_converts_hold(auth_headers, admin_headers):
+    """Test checkout consumes the hold instead of taking stock a second time"""
+    sweet_id = _create_sweet(admin_headers)
+    hold = client.post(
+        "/api/reservations/", json={"sweet_id": sweet_id, "quantity": 3}, headers=auth_headers
+    ).json()
+    
+    response = client.post(
+        "/api/orders/",
+        json={
+            "total_amount": 40.0,
+            "customer_name": "Test User",
+            "order_items": [{
+                "sweet_id": sweet_id, "sweet_name": "Reserved Sweet", "selected_quantity": "250g",
+                "quantity": 4, "price": 10.0, "hold_id": hold["id"]
+            }]
+        },
+        headers=auth_headers
+    )
+    assert response.status_code == 200
+    # 3 came from the hold, 1 more was taken at checkout
+    assert _stock(sweet_id) == 6
+    assert client.get("/api/reservations/", headers=auth_headers).json() == []
+
+
+def test_sweeper_returns_expired_holds(auth_headers, admin_headers):
+    """Test expired holds are swept in batches and their stock restored"""
+    sweet_id = _create_sweet(admin_headers)
+    for _ in range(3):
+        client.post("/api/reservations/", json={"sweet_id": sweet_id, "quantity": 2}, headers=auth_headers)
+    assert _stock(sweet_id) == 4
+    
+    db = TestingSessionLocal()
+    db.query(StockHold).update({StockHold.expires_at: datetime.now(timezone.utc) - timedelta(seconds=1)})
+    db.commit()
+    
+    assert sweep_expired_holds(db, batch_size=2) == 3
+    assert db.query(StockHold).count() == 0
+    assert db.get(Sweet, sweet_id).quantity == 10
+    db.close()
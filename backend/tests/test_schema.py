@@ -0,0 +1,73 @@
+import pytest
+from sqlalchemy import create_engine, inspect
+from sqlalchemy.orm import Session
+from app.core.schema import prepare_database, recorded_fingerprint
+from app.models.models import SchemaState, Sweet, User
+
+
+@pytest.fixture
+def fresh_engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'startup.db'}")
+    yield engine
+    engine.dispose()
+
+
+def test_startup_migrates_once_then_skips(fresh_engine):
+    """Test that schema work and seeding only run while the fingerprint differs"""
+    assert prepare_database(fresh_engine, "auto") == "migrated"
+
+    with Session(fresh_engine) as db:
+        assert db.query(User).filter(User.is_admin == True).count() == 1
+        assert db.query(Sweet).count() > 0
+        assert db.query(SchemaState).count() == 1
+
+    assert prepare_database(fresh_engine, "auto") == "up-to-date"
+
+
+def test_check_mode_refuses_unmigrated_database(fresh_engine):
+    """Test that check mode never creates tables itself"""
+    with pytest.raises(RuntimeError):
+        prepare_database(fresh_engine, "check")
+    assert prepare_database(fresh_engine, "skip") == "skipped"
+
+    prepare_database(fresh_engine, "auto")
+    assert prepare_database(fresh_engine, "check") == "up-to-date"
+
+
+def test_migrate_adds_indexes_to_existing_tables(fresh_engine):
+    """Test that new model indexes reach tables created by an older release"""
+    prepare_database(fresh_engine, "auto")
+    with fresh_engine.begin() as conn:
+        conn.exec_driver_sql("DROP INDEX ix_sweets_price_id")
+        conn.exec_driver_sql("DELETE FROM schema_state")
+
+    assert prepare_database(fresh_engine, "auto") == "migrated"
+    assert "ix_sweets_price_id" in {index["name"] for index in inspect(fresh_engine).get_indexes("sweets")}
+
+
+def test_migrate_adds_columns_to_existing_tables(fresh_engine):
+    """Test that columns added to a model reach tables created by an older release"""
+    prepare_database(fresh_engine, "auto")
+    with fresh_engine.begin() as conn:
+        conn.exec_driver_sql("ALTER TABLE users DROP COLUMN token_version")
+        conn.exec_driver_sql("DELETE FROM schema_state")
+
+    with pytest.raises(RuntimeError, match="users.token_version"):
+        prepare_database(fresh_engine, "check")
+    assert prepare_database(fresh_engine, "auto") == "migrated"
+    assert "token_version" in {column["name"] for column in inspect(fresh_engine).get_columns("users")}
+    with Session(fresh_engine) as db:
+        assert db.query(User).first().token_version == 0
+
+
+def test_migrate_refuses_columns_it_cannot_fill(fresh_engine, monkeypatch):
+    """Test that an unfillable NOT NULL column fails the migration without recording the fingerprint"""
+    prepare_database(fresh_engine, "auto")
+    with fresh_engine.begin() as conn:
+        conn.exec_driver_sql("ALTER TABLE sweets DROP COLUMN stock_shards")
+        conn.exec_driver_sql("DELETE FROM schema_state")
+    monkeypatch.setattr(Sweet.__table__.c.stock_shards, "server_default", None)
+
+    with pytest.raises(RuntimeError, match="sweets.stock_shards"):
+        prepare_database(fresh_engine, "auto")
+    assert recorded_fingerprint(fresh_engine) is None
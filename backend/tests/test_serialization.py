@@ -0,0 +1,70 @@
+from typing import List
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+from conftest import client, override_get_db
+from app.models.models import Order, Sweet
+from app.schemas.orders import OrderResponse
+from app.schemas.schemas import SweetResponse
+
+# The previous endpoints: ORM objects validated and encoded by FastAPI itself
+reference_app = FastAPI()
+
+
+@reference_app.get("/orders", response_model=List[OrderResponse])
+def reference_orders(db: Session = Depends(override_get_db)):
+    return db.query(Order).order_by(Order.created_at.desc()).all()
+
+
+@reference_app.get("/sweets", response_model=List[SweetResponse])
+def reference_sweets(db: Session = Depends(override_get_db)):
+    return db.query(Sweet).order_by(Sweet.name, Sweet.id).all()
+
+
+reference_client = TestClient(reference_app)
+
+
+def _place_order(headers, sweet_ids, quantity):
+    return client.post(
+        "/api/orders/",
+        json={
+            "total_amount": 42.5,
+            "delivery_address": "1 Test Lane",
+            "customer_name": "Test User",
+            "notes": "Ünïcode “quotes” ✓",
+            "order_items": [
+                {"sweet_id": sweet_id, "sweet_name": f"Sweet {sweet_id}", "selected_quantity": "500g",
+                 "quantity": quantity, "price": 10.25}
+                for sweet_id in sweet_ids
+            ],
+        },
+        headers=headers
+    )
+
+
+def test_fast_list_serialization_is_byte_identical(auth_headers, admin_headers):
+    """Test the row-based JSON path matches FastAPI's response_model output byte for byte"""
+    sweet_ids = []
+    for index, price in enumerate([12.5, 3.0, 7.125]):
+        response = client.post(
+            "/api/sweets/",
+            json={"name": f"Contract Sweet {index}", "category": "Test", "price": price,
+                  "quantity": 20, "description": "Crème brûlée" if index else None},
+            headers=admin_headers
+        )
+        sweet_ids.append(response.json()["id"])
+    _place_order(auth_headers, sweet_ids[:2], 1)
+    _place_order(auth_headers, sweet_ids[2:], 3)
+    _place_order(admin_headers, sweet_ids, 2)
+
+    admin_orders = client.get("/api/orders/admin", headers=admin_headers)
+    assert admin_orders.status_code == 200
+    assert admin_orders.headers["content-type"] == "application/json"
+    assert len(admin_orders.json()) == 3
+    assert admin_orders.content == reference_client.get("/orders").content
+
+    user_orders = client.get("/api/orders/", headers=auth_headers).json()
+    assert sorted(len(order["order_items"]) for order in user_orders) == [1, 2]
+
+    sweets = client.get("/api/sweets/?sort=name&limit=1000")
+    assert sweets.content == reference_client.get("/sweets").content
@@ -0,0 +1,157 @@
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+from conftest import client, TestingSessionLocal
+from app.core.database import Base
+from app.models.models import Sweet
+from app.services.inventory import decrement_stock
+from app.services.stock_shards import configure_shards, rebalance_shards, shard_layout
+
+
+def _sharded_sweet(admin_headers, quantity, shards):
+    sweet_id = client.post(
+        "/api/sweets/",
+        json={"name": "Kaju Katli", "category": "Test", "price": 10.0, "quantity": quantity},
+        headers=admin_headers
+    ).json()["id"]
+    response = client.put(f"/api/sweets/{sweet_id}/stock-shards", json={"shards": shards}, headers=admin_headers)
+    assert response.status_code == 200
+    return sweet_id, response.json()
+
+
+def _stock(sweet_id):
+    return client.get(f"/api/sweets/{sweet_id}").json()["quantity"]
+
+
+def test_sharded_purchase_restock_and_rebalance(auth_headers, admin_headers):
+    """Test sharded stock is split, summed on read, refilled evenly and rebalanced"""
+    sweet_id, layout = _sharded_sweet(admin_headers, 10, 4)
+    assert layout == {"sweet_id": sweet_id, "shards": 4, "quantity": 10, "shard_quantities": [3, 3, 2, 2]}
+
+    for _ in range(3):
+        response = client.post(f"/api/sweets/{sweet_id}/purchase", json={"quantity": 2}, headers=auth_headers)
+        assert response.status_code == 200
+    assert response.json()["quantity"] == 4
+    assert _stock(sweet_id) == 4
+
+    # No single shard holds 4 any more, so this drains across shards
+    response = client.post(f"/api/sweets/{sweet_id}/purchase", json={"quantity": 4}, headers=auth_headers)
+    assert response.status_code == 200
+    assert response.json()["quantity"] == 0
+    response = client.post(f"/api/sweets/{sweet_id}/purchase", json={"quantity": 1}, headers=auth_headers)
+    assert response.status_code == 400
+
+    response = client.post(f"/api/sweets/{sweet_id}/restock", json={"quantity": 6}, headers=admin_headers)
+    assert response.json()["quantity"] == 6
+    assert client.get(f"/api/sweets/{sweet_id}/stock-shards", headers=admin_headers).json()["shard_quantities"] == [2, 2, 1, 1]
+
+    db = TestingSessionLocal()
+    configure_shards(db, sweet_id, 4, quantity=6)
+    db.commit()
+    decrement_stock(db, sweet_id, 3)
+    db.commit()
+    assert rebalance_shards(db) == 1
+    assert shard_layout(db, sweet_id) == [1, 1, 1, 0]
+    assert db.get(Sweet, sweet_id).quantity == 3  # cached total refreshed
+    db.close()
+
+    # Folding back to a single row keeps the stock
+    response = client.put(f"/api/sweets/{sweet_id}/stock-shards", json={"shards": 1}, headers=admin_headers)
+    assert response.json() == {"sweet_id": sweet_id, "shards": 1, "quantity": 3, "shard_quantities": []}
+    assert _stock(sweet_id) == 3
+
+
+def _order(headers, sweet_id, quantity):
+    return client.post(
+        "/api/orders/",
+        json={
+            "total_amount": 50.0,
+            "customer_name": "Test User",
+            "order_items": [{
+                "sweet_id": sweet_id, "sweet_name": "Kaju Katli", "selected_quantity": "500g",
+                "quantity": quantity, "price": 10.0
+            }]
+        },
+        headers=headers
+    )
+
+
+def test_sharded_order_and_cancel(auth_headers, admin_headers):
+    """Test orders take from and cancellations return to a sharded sweet"""
+    sweet_id, _ = _sharded_sweet(admin_headers, 8, 2)
+    response = _order(auth_headers, sweet_id, 5)
+    assert response.status_code == 200
+    assert _stock(sweet_id) == 3
+
+    # Availability comes from the shards, not the cached total on the sweets row
+    rejected = _order(auth_headers, sweet_id, 4)
+    assert rejected.status_code == 400
+    assert "Available: 3, Requested: 4" in rejected.json()["detail"]
+
+    response = client.delete(f"/api/orders/{response.json()['id']}", headers=auth_headers)
+    assert response.status_code == 200
+    assert _stock(sweet_id) == 8
+
+
+def test_sharded_stock_read_through_shards_everywhere(auth_headers, admin_headers):
+    """Test search and updates report the shard total, not the cached sweets row"""
+    sweet_id, _ = _sharded_sweet(admin_headers, 40, 4)
+    response = client.post(f"/api/sweets/{sweet_id}/purchase", json={"quantity": 5}, headers=auth_headers)
+    assert response.json()["quantity"] == 35
+
+    response = client.get("/api/sweets/search?name=kaju", headers=auth_headers)
+    assert [(sweet["id"], sweet["quantity"]) for sweet in response.json()] == [(sweet_id, 35)]
+
+    response = client.put(f"/api/sweets/{sweet_id}", json={"price": 12.0}, headers=admin_headers)
+    assert response.status_code == 200
+    assert (response.json()["price"], response.json()["quantity"]) == (12.0, 35)
+
+
+def test_stock_shards_admin_only(auth_headers, admin_headers):
+    """Test only admins may configure shards, within the allowed range"""
+    sweet_id, _ = _sharded_sweet(admin_headers, 5, 2)
+    response = client.put(f"/api/sweets/{sweet_id}/stock-shards", json={"shards": 4}, headers=auth_headers)
+    assert response.status_code == 403
+    response = client.put(f"/api/sweets/{sweet_id}/stock-shards", json={"shards": 0}, headers=admin_headers)
+    assert response.status_code == 400
+    response = client.put("/api/sweets/999/stock-shards", json={"shards": 2}, headers=admin_headers)
+    assert response.status_code == 404
+
+
+def test_parallel_sharded_purchases_never_oversell(tmp_path):
+    """Test concurrent purchases of a sharded SKU sell exactly the stock"""
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'shards.db'}",
+        connect_args={"check_same_thread": False, "timeout": 30},
+        pool_size=16,
+    )
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as db:
+        sweet = Sweet(name="Flash Sale Katli", category="Test", price=10.0, quantity=101)
+        db.add(sweet)
+        db.commit()
+        sweet_id = sweet.id
+        configure_shards(db, sweet_id, 8)
+        db.commit()
+    SessionLocal = sessionmaker(bind=engine)
+
+    def purchase(index):
+        with SessionLocal() as db:
+            try:
+                decrement_stock(db, sweet_id, 1 + index % 3)
+                db.commit()
+                return 1 + index % 3
+            except HTTPException as exc:
+                assert exc.status_code == 400
+                return 0
+
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        sold = sum(executor.map(purchase, range(200)))
+
+    with Session(engine) as db:
+        remaining = sum(shard_layout(db, sweet_id))
+        assert min(shard_layout(db, sweet_id)) >= 0
+    assert sold + remaining == 101
+    assert remaining < 3
+    engine.dispose()
@@ -1,94 +1,6 @@
-import pytest
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
-from app.main import app
-from app.core.database import get_db, Base
-from app.models.models import User, Sweet
-from app.services.auth import get_password_hash
-
-# Create test database
-SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
-)
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-Base.metadata.create_all(bind=engine)
-
-
-def override_get_db():
-    try:
-        db = TestingSessionLocal()
-        yield db
-    finally:
-        db.close()
-
-
-app.dependency_overrides[get_db] = override_get_db
-client = TestClient(app)
-
-
-@pytest.fixture
-def test_db():
-    Base.metadata.create_all(bind=engine)
-    yield
-    Base.metadata.drop_all(bind=engine)
-
-
-@pytest.fixture
-def auth_headers(test_db):
-    """Create a test user and return auth headers"""
-    # Register and login user
-    client.post(
-        "/api/auth/register",
-        json={
-            "email": "test@example.com",
-            "username": "testuser",
-            "password": "testpass123"
-        }
-    )
-    
-    response = client.post(
-        "/api/auth/login",
-        data={
-            "username": "test@example.com",
-            "password": "testpass123"
-        }
-    )
-    token = response.json()["access_token"]
-    return {"Authorization": f"Bearer {token}"}
-
-
-@pytest.fixture
-def admin_headers(test_db):
-    """Create an admin user and return auth headers"""
-    db = TestingSessionLocal()
-    
-    # Create admin user directly in database
-    admin_user = User(
-        email="admin@example.com",
-        username="admin",
-        hashed_password=get_password_hash("adminpass123"),
-        is_admin=True
-    )
-    db.add(admin_user)
-    db.commit()
-    db.close()
-    
-    # Login admin
-    response = client.post(
-        "/api/auth/login",
-        data={
-            "username": "admin@example.com",
-            "password": "adminpass123"
-        }
-    )
-    token = response.json()["access_token"]
-    return {"Authorization": f"Bearer {token}"}
+from conftest import client
+from app.core.config import settings
+from app.services.suggest import popularity_cache
 
 
 def test_create_sweet_success(admin_headers):
@@ -151,10 +63,12 @@ def test_get_sweets_success(auth_headers, admin_headers):
     assert data[0]["name"] == "Test Sweet"
 
 
-def test_get_sweets_unauthorized():
-    """Test getting sweets without authentication"""
+def test_get_sweets_public(test_db):
+    """Test the catalog is publicly readable and cacheable without authentication"""
     response = client.get("/api/sweets/")
-    assert response.status_code == 401
+    assert response.status_code == 200
+    assert response.headers["cache-control"].startswith("public")
+    assert "etag" in response.headers
 
 
 def test_search_sweets_by_name(auth_headers, admin_headers):
@@ -406,3 +320,267 @@ def test_delete_sweet_unauthorized(auth_headers, admin_headers):
     response = client.delete(f"/api/sweets/{sweet_id}", headers=auth_headers)
     assert response.status_code == 403
     assert "Not enough permissions" in response.json()["detail"]
+
+
+def test_get_sweets_etag_not_modified(auth_headers, admin_headers):
+    """Test catalog listing returns 304 for a matching If-None-Match"""
+    client.post(
+        "/api/sweets/",
+        json={"name": "ETag Sweet", "category": "Test", "price": 10.0, "quantity": 5},
+        headers=admin_headers
+    )
+    
+    response = client.get("/api/sweets/", headers=auth_headers)
+    assert response.status_code == 200
+    etag = response.headers["etag"]
+    assert response.json()[0]["name"] == "ETag Sweet"
+    
+    response = client.get("/api/sweets/", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+
+def test_get_sweets_snapshot_refreshes_after_purchase(auth_headers, admin_headers):
+    """Test purchases bump the catalog version and change the ETag"""
+    create_response = client.post(
+        "/api/sweets/",
+        json={"name": "Snapshot Sweet", "category": "Test", "price": 10.0, "quantity": 5},
+        headers=admin_headers
+    )
+    sweet_id = create_response.json()["id"]
+    etag = client.get("/api/sweets/", headers=auth_headers).headers["etag"]
+    
+    client.post(f"/api/sweets/{sweet_id}/purchase", json={"quantity": 2}, headers=auth_headers)
+    
+    response = client.get("/api/sweets/", headers={**auth_headers, "If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()[0]["quantity"] == 3
+
+
+def test_get_sweets_keyset_pagination(auth_headers, admin_headers):
+    """Test cursor pagination walks every sweet once in both directions"""
+    for index, price in enumerate([5.0, 1.0, 3.0, 1.0, 4.0]):
+        client.post(
+            "/api/sweets/",
+            json={"name": f"Keyset Sweet {index}", "category": "Test", "price": price, "quantity": 1},
+            headers=admin_headers
+        )
+    
+    pages = []
+    response = client.get("/api/sweets/?sort=price&limit=2", headers=auth_headers)
+    assert "x-prev-cursor" not in response.headers
+    while True:
+        assert response.status_code == 200
+        pages.append([(sweet["price"], sweet["id"]) for sweet in response.json()])
+        if "x-next-cursor" not in response.headers:
+            break
+        response = client.get(
+            f"/api/sweets/?limit=2&cursor={response.headers['x-next-cursor']}", headers=auth_headers
+        )
+    
+    seen = [key for page in pages for key in page]
+    assert [len(page) for page in pages] == [2, 2, 1]
+    assert seen == sorted(seen)
+    assert [price for price, _ in seen] == [1.0, 1.0, 3.0, 4.0, 5.0]
+    
+    # Walking back from the last page returns the previous page unchanged
+    response = client.get(
+        f"/api/sweets/?limit=2&cursor={response.headers['x-prev-cursor']}", headers=auth_headers
+    )
+    assert [(sweet["price"], sweet["id"]) for sweet in response.json()] == pages[1]
+
+
+def test_get_sweets_keyset_created_at(auth_headers, admin_headers):
+    """Test created_at cursors page past rows sharing a timestamp"""
+    for index in range(3):
+        client.post(
+            "/api/sweets/",
+            json={"name": f"Created Sweet {index}", "category": "Test", "price": 1.0, "quantity": 1},
+            headers=admin_headers
+        )
+    
+    first = client.get("/api/sweets/?sort=created_at&limit=2", headers=auth_headers)
+    second = client.get(
+        f"/api/sweets/?limit=2&cursor={first.headers['x-next-cursor']}", headers=auth_headers
+    )
+    names = [sweet["name"] for sweet in first.json() + second.json()]
+    assert names == ["Created Sweet 0", "Created Sweet 1", "Created Sweet 2"]
+
+
+def test_get_sweets_invalid_cursor(auth_headers):
+    """Test a tampered cursor or unknown sort is rejected"""
+    response = client.get("/api/sweets/?cursor=not-a-cursor", headers=auth_headers)
+    assert response.status_code == 400
+    
+    # Well-formed cursor whose sort is not a string
+    response = client.get("/api/sweets/?cursor=eyJzIjpbMV19", headers=auth_headers)
+    assert response.status_code == 400
+    
+    response = client.get("/api/sweets/?sort=quantity", headers=auth_headers)
+    assert response.status_code == 400
+
+
+def test_search_sweets_ranked_with_limit(auth_headers, admin_headers):
+    """Test search ranks exact and prefix matches first and honours limit"""
+    for name in ["Dark Ladoo Deluxe", "Ladoo", "Motichoor Ladoo", "Ladoo Box", "100% Cocoa"]:
+        client.post(
+            "/api/sweets/",
+            json={"name": name, "category": "Test", "price": 10.0, "quantity": 1},
+            headers=admin_headers
+        )
+    
+    response = client.get("/api/sweets/search?name=ladoo", headers=auth_headers)
+    assert response.status_code == 200
+    assert [sweet["name"] for sweet in response.json()] == [
+        "Ladoo", "Ladoo Box", "Motichoor Ladoo", "Dark Ladoo Deluxe"
+    ]
+    
+    response = client.get("/api/sweets/search?name=ladoo&limit=2", headers=auth_headers)
+    assert [sweet["name"] for sweet in response.json()] == ["Ladoo", "Ladoo Box"]
+    
+    # LIKE wildcards in the query are matched literally
+    response = client.get("/api/sweets/search?name=0%25", headers=auth_headers)
+    assert [sweet["name"] for sweet in response.json()] == ["100% Cocoa"]
+
+
+def test_search_sweets_memory_backend(auth_headers, admin_headers, monkeypatch):
+    """Test the in-memory index ranks, tolerates typos and follows catalog changes"""
+    monkeypatch.setattr(settings, "search_backend", "memory")
+    created = {}
+    for name, category in [
+        ("Gulab Jamun", "Traditional"),
+        ("Kala Jamun", "Traditional"),
+        ("Gulab Barfi", "Barfi"),
+        ("Chocolate Truffle", "Chocolate"),
+    ]:
+        response = client.post(
+            "/api/sweets/",
+            json={"name": name, "category": category, "price": 10.0, "quantity": 1},
+            headers=admin_headers
+        )
+        created[name] = response.json()["id"]
+    
+    response = client.get("/api/sweets/search?name=gulab jamon", headers=auth_headers)
+    assert response.status_code == 200
+    assert [sweet["name"] for sweet in response.json()] == ["Gulab Jamun"]
+    
+    response = client.get("/api/sweets/search?name=choc", headers=auth_headers)
+    assert [sweet["name"] for sweet in response.json()] == ["Chocolate Truffle"]
+    
+    response = client.get("/api/sweets/search?name=jamun&category=trad", headers=auth_headers)
+    assert {sweet["name"] for sweet in response.json()} == {"Gulab Jamun", "Kala Jamun"}
+    
+    client.put(
+        f"/api/sweets/{created['Kala Jamun']}",
+        json={"name": "Kala Khatta"},
+        headers=admin_headers
+    )
+    response = client.get("/api/sweets/search?name=jamun", headers=auth_headers)
+    assert [sweet["name"] for sweet in response.json()] == ["Gulab Jamun"]
+
+
+def test_get_sweet_facets(auth_headers, admin_headers):
+    """Test facet counts and price histogram follow the search filters"""
+    for name, category, price, quantity in [
+        ("Kaju Katli", "Dry Fruit", 100.0, 5),
+        ("Kaju Roll", "Dry Fruit", 300.0, 0),
+        ("Kaju Barfi", "Traditional", 200.0, 2),
+        ("Rasgulla", "Bengali", 50.0, 9),
+    ]:
+        client.post(
+            "/api/sweets/",
+            json={"name": name, "category": category, "price": price, "quantity": quantity},
+            headers=admin_headers
+        )
+    
+    response = client.get("/api/sweets/facets?name=kaju&category=dry&buckets=5", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 2
+    assert data["in_stock"] == 1
+    # Category counts ignore the category filter itself
+    assert data["categories"] == [
+        {"category": "Dry Fruit", "count": 2, "in_stock": 1},
+        {"category": "Traditional", "count": 1, "in_stock": 1},
+    ]
+    assert [bucket["count"] for bucket in data["price_buckets"]] == [0, 1, 0, 0, 1]
+    assert data["price_buckets"][0]["min"] == 50.0
+    assert data["price_buckets"][-1]["max"] == 300.0
+    
+    etag = response.headers["etag"]
+    response = client.get(
+        "/api/sweets/facets?name=kaju&category=dry&buckets=5",
+        headers={**auth_headers, "If-None-Match": etag}
+    )
+    assert response.status_code == 304
+
+
+def test_suggest_sweets_weighted_by_orders(auth_headers, admin_headers):
+    """Test completions match word starts and rank by units ordered"""
+    ids = {}
+    for name, category in [
+        ("Gulab Jamun", "Traditional"),
+        ("Kala Jamun", "Traditional"),
+        ("Jalebi", "Traditional"),
+        ("Gur Chikki", "Jaggery"),
+    ]:
+        response = client.post(
+            "/api/sweets/",
+            json={"name": name, "category": category, "price": 10.0, "quantity": 50},
+            headers=admin_headers
+        )
+        ids[name] = response.json()["id"]
+    
+    response = client.get("/api/sweets/suggest?q=ja", headers=auth_headers)
+    assert response.status_code == 200
+    assert [s["text"] for s in response.json()] == ["Gulab Jamun", "Jaggery", "Jalebi", "Kala Jamun"]
+    
+    client.post(
+        "/api/orders/",
+        json={
+            "total_amount": 30.0,
+            "customer_name": "Test User",
+            "order_items": [{
+                "sweet_id": ids["Kala Jamun"], "sweet_name": "Kala Jamun",
+                "selected_quantity": "1kg", "quantity": 3, "price": 10.0
+            }]
+        },
+        headers=auth_headers
+    )
+    
+    # Ranking follows orders once the popularity counts expire
+    response = client.get("/api/sweets/suggest?q=JAM&limit=1", headers=auth_headers)
+    assert response.json() == [{"text": "Gulab Jamun", "kind": "sweet", "sweet_id": ids["Gulab Jamun"]}]
+    popularity_cache.clear()
+    response = client.get("/api/sweets/suggest?q=JAM&limit=1", headers=auth_headers)
+    assert response.json() == [{"text": "Kala Jamun", "kind": "sweet", "sweet_id": ids["Kala Jamun"]}]
+    
+    response = client.get("/api/sweets/suggest?q=trad", headers=auth_headers)
+    assert response.json() == [{"text": "Traditional", "kind": "category", "sweet_id": None}]
+
+
+def test_get_sweet_public_with_etag(admin_headers):
+    """Test a single sweet is served anonymously with conditional GET support"""
+    create_response = client.post(
+        "/api/sweets/",
+        json={"name": "Public Sweet", "category": "Test", "price": 10.0, "quantity": 5},
+        headers=admin_headers
+    )
+    sweet_id = create_response.json()["id"]
+    
+    response = client.get(f"/api/sweets/{sweet_id}")
+    assert response.status_code == 200
+    assert response.json()["name"] == "Public Sweet"
+    assert "public" in response.headers["cache-control"]
+    
+    response = client.get(f"/api/sweets/{sweet_id}", headers={"If-None-Match": response.headers["etag"]})
+    assert response.status_code == 304
+    
+    response = client.get("/api/sweets/search?name=public")
+    assert response.status_code == 200
+    assert [sweet["name"] for sweet in response.json()] == ["Public Sweet"]
+    
+    # Writes stay protected
+    response = client.post("/api/sweets/", json={"name": "X", "category": "Y", "price": 1.0, "quantity": 1})
+    assert response.status_code == 401
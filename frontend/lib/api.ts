@@ -65,6 +65,25 @@ interface OrderCreate {
   order_items: OrderItem[];
 }
 
+interface OrderFilters {
+  status?: string;
+  created_from?: string;
+  created_to?: string;
+  email?: string;
+  phone?: string;
+  min_total?: number;
+  user_id?: number;
+  cursor?: string;
+  limit?: number;
+}
+
+interface OrderPage {
+  orders: Order[];
+  total: number;
+  nextCursor?: string;
+  prevCursor?: string;
+}
+
 class ApiClient {
   private token: string | null = null;
 
@@ -203,14 +222,19 @@ class ApiClient {
     return this.handleResponse(response);
   }
 
-  async createOrder(orderData: OrderCreate): Promise<Order> {
+  async createOrder(orderData: OrderCreate, idempotencyKey?: string): Promise<Order> {
     console.log('Creating order with data:', orderData);
     console.log('API URL:', `${API_BASE_URL}/api/orders/`);
     console.log('Headers:', this.getHeaders());
     
+    // Reuse the same key when retrying one checkout so the server replays instead of ordering twice
+    const headers = idempotencyKey
+      ? { ...this.getHeaders(), 'Idempotency-Key': idempotencyKey }
+      : this.getHeaders();
+    
     const response = await fetch(`${API_BASE_URL}/api/orders/`, {
       method: 'POST',
-      headers: this.getHeaders(),
+      headers,
       body: JSON.stringify(orderData),
     });
     
@@ -228,12 +252,24 @@ class ApiClient {
     return this.handleResponse(response);
   }
 
-  async getAllOrders(): Promise<Order[]> {
-    const response = await fetch(`${API_BASE_URL}/api/orders/admin`, {
+  async getAllOrders(filters: OrderFilters = {}): Promise<OrderPage> {
+    const searchParams = new URLSearchParams();
+    
+    Object.entries(filters).forEach(([key, value]) => {
+      if (value !== undefined && value !== '') searchParams.append(key, value.toString());
+    });
+
+    const response = await fetch(`${API_BASE_URL}/api/orders/admin?${searchParams}`, {
       headers: this.getHeaders(),
     });
     
-    return this.handleResponse(response);
+    const orders: Order[] = await this.handleResponse(response);
+    return {
+      orders,
+      total: Number(response.headers.get('X-Total-Count') ?? orders.length),
+      nextCursor: response.headers.get('X-Next-Cursor') ?? undefined,
+      prevCursor: response.headers.get('X-Prev-Cursor') ?? undefined,
+    };
   }
 
   async getOrder(orderId: number): Promise<Order> {
@@ -259,4 +295,4 @@ class ApiClient {
 }
 
 export const apiClient = new ApiClient();
-export type { Sweet, User, LoginCredentials, RegisterData, Order, OrderCreate, OrderItem };
\ No newline at end of file
+export type { Sweet, User, LoginCredentials, RegisterData, Order, OrderCreate, OrderItem, OrderFilters, OrderPage };
\ No newline at end of file